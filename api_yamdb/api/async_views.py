@@ -0,0 +1,205 @@
+"""Асинхронные представления для чтения произведений, отзывов и комментариев.
+
+Под ASGI синхронные вьюсеты DRF целиком выполняются в потоке через
+`sync_to_async`. Эти представления работают в цикле событий, а в потоки
+уходят только запросы к БД: ORM Django 3.2 синхронный. Независимые
+запросы (страница и количество, произведение и его жанры, наличие
+родительского объекта) выполняются одновременно в потоках отдельного
+пула размером `ASYNC_DB_THREADS`. Каждый поток держит своё подключение
+к БД, поэтому подключений не больше, чем потоков; как и в синхронных
+запросах, до и после каждого запроса `close_old_connections()`
+закрывает подключения старше `CONN_MAX_AGE` и сломанные.
+
+Страницы строит пагинатор DRF из `DEFAULT_PAGINATION_CLASS`, поэтому
+ответы совпадают с ответами синхронных вьюсетов при постраничной
+пагинации. Кэш ответов, условные GET и keyset-пагинация здесь
+не поддерживаются.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Page
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from content.filters import TitlesFilter
+from content.models import Genre, Title
+from reviews.models import Comment, Review
+from .reviews.serializers import CommentSerializer, ReviewSerializer
+from .serializers import ReadOnlyTitleSerializer
+
+NOT_FOUND_MESSAGE = 'Not found.'
+
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='async-db'
+)
+
+
+def _call_and_release(func, *args):
+    # Как `request_started` и `request_finished` синхронного запроса.
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_query(func, *args):
+    """Выполнить запрос к БД в отдельном потоке пула.
+
+    Без привязки к общему потоку `thread_sensitive` запросы, собранные
+    в `asyncio.gather`, выполняются параллельно.
+    """
+    return await sync_to_async(
+        _call_and_release, thread_sensitive=False, executor=db_executor
+    )(func, *args)
+
+
+def fetch(queryset):
+    """Загрузить QuerySet, сохранив его для кэша prefetch."""
+    len(queryset)
+    return queryset
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=JSONEncoder)
+
+
+def not_found(message=NOT_FOUND_MESSAGE):
+    return json_response({'detail': message}, status=404)
+
+
+def read_only(view):
+    """Разрешить представлению только GET и HEAD."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def get_page_number(request, pagination):
+    """Номер страницы, если это целое положительное число, иначе None."""
+    number = request.query_params.get(pagination.page_query_param, 1)
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+async def paginate(request, queryset, serializer_class, *checks):
+    """Страница выдачи пагинатора `DEFAULT_PAGINATION_CLASS`.
+
+    Номер страницы проверяет, а ответ строит сам пагинатор DRF.
+    Количество объектов, страница и дополнительные проверки `checks`
+    выполняются одновременно. Возвращает ответ, готовый к отправке,
+    или None, если одна из проверок не прошла.
+    """
+    pagination = api_settings.DEFAULT_PAGINATION_CLASS()
+    request = pagination.request = Request(request)
+    page_size = pagination.get_page_size(request)
+    number = get_page_number(request, pagination)
+    try:
+        if number is None:
+            # Номер вроде `last` зависит от количества объектов,
+            # неверные номера отклоняет сам пагинатор.
+            _, *passed = await asyncio.gather(
+                run_query(pagination.paginate_queryset, queryset, request),
+                *(run_query(check) for check in checks)
+            )
+        else:
+            offset = (number - 1) * page_size
+            count, objects, *passed = await asyncio.gather(
+                run_query(queryset.count),
+                run_query(list, queryset[offset:offset + page_size]),
+                *(run_query(check) for check in checks)
+            )
+            paginator = pagination.django_paginator_class(
+                objects, page_size
+            )
+            paginator.count = count
+            try:
+                paginator.validate_number(number)
+            except InvalidPage as error:
+                raise NotFound(pagination.invalid_page_message.format(
+                    page_number=number, message=str(error)
+                ))
+            pagination.page = Page(objects, number, paginator)
+    except NotFound as error:
+        return not_found(error.detail)
+    if not all(passed):
+        return None
+    response = pagination.get_paginated_response(
+        serializer_class(pagination.page, many=True).data
+    )
+    return json_response(response.data, status=response.status_code)
+
+
+@read_only
+async def title_list(request):
+    """Список произведений с фильтрами `TitlesFilter`."""
+    filterset = TitlesFilter(
+        request.GET,
+        queryset=Title.objects.select_related(
+            'category', 'pending_rating'
+        ).prefetch_related('genre').order_by('name', 'id'),
+        request=request
+    )
+    if not filterset.is_valid():
+        return json_response(filterset.errors, status=400)
+    # Фильтры по слагам могут загрузить кэш `content.slugs` из БД.
+    queryset = await run_query(lambda: filterset.qs)
+    return await paginate(request, queryset, ReadOnlyTitleSerializer)
+
+
+@read_only
+async def title_detail(request, title_id):
+    """Произведение; его строка и жанры читаются одновременно."""
+    titles, genres = await asyncio.gather(
+        run_query(list, Title.objects.select_related(
+            'category', 'pending_rating'
+        ).filter(pk=title_id)),
+        run_query(fetch, Genre.objects.filter(title=title_id))
+    )
+    if not titles:
+        return not_found()
+    title = titles[0]
+    title._prefetched_objects_cache = {'genre': genres}
+    return json_response(ReadOnlyTitleSerializer(title).data)
+
+
+@read_only
+async def review_list(request, title_id):
+    """Отзывы произведения от новых к старым."""
+    response = await paginate(
+        request,
+        Review.objects.filter(title_id=title_id).select_related(
+            'author'
+        ).order_by('-pub_date', '-id'),
+        ReviewSerializer,
+        Title.objects.filter(pk=title_id).exists
+    )
+    return response or not_found()
+
+
+@read_only
+async def comment_list(request, title_id, review_id):
+    """Комментарии к отзыву от новых к старым."""
+    response = await paginate(
+        request,
+        Comment.objects.filter(review_id=review_id).select_related(
+            'author'
+        ).order_by('-pub_date', '-id'),
+        CommentSerializer,
+        Review.objects.filter(pk=review_id, title_id=title_id).exists
+    )
+    return response or not_found()
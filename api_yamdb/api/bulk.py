@@ -0,0 +1,133 @@
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from content.bulk import (
+    NOT_FOUND_MESSAGE,
+    create_titles,
+    delete_titles,
+    update_titles,
+)
+from content.models import Title
+from .constants import BULK_MAX_ITEMS
+from .permissions import IsAdminOrForbidden
+from .serializers import BulkTitleSerializer, TitleSerializer
+
+BULK_LIST_MESSAGE = 'Expected a non-empty list of items.'
+BULK_SIZE_MESSAGE = (
+    f'Ensure this list has no more than {BULK_MAX_ITEMS} items.'
+)
+ID_REQUIRED_MESSAGE = 'This field is required.'
+
+
+def item_error(errors) -> dict:
+    if errors == {'id': [NOT_FOUND_MESSAGE]}:
+        return {'status': status.HTTP_404_NOT_FOUND, 'errors': errors}
+    return {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+
+
+class BulkTitleMixin:
+    """Пакетные создание, изменение и удаление произведений.
+
+    Элементы проверяются по отдельности, ошибки одних не мешают записи
+    других. Результаты возвращаются в порядке элементов запроса.
+    """
+
+    @action(
+        detail=False,
+        methods=['post', 'patch', 'delete'],
+        permission_classes=[IsAuthenticated, IsAdminOrForbidden]
+    )
+    def bulk(self, request):
+        """POST - список произведений, PATCH - список изменений с `id`,
+        DELETE - список id. Если часть элементов не записана,
+        статус ответа 207.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': [BULK_LIST_MESSAGE]})
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [BULK_SIZE_MESSAGE]})
+        handlers = {
+            'POST': (self.bulk_create_titles, status.HTTP_201_CREATED),
+            'PATCH': (self.bulk_update_titles, status.HTTP_200_OK),
+            'DELETE': (self.bulk_destroy_titles, status.HTTP_200_OK),
+        }
+        handler, success_status = handlers[request.method]
+        results = handler(items)
+        if any('errors' in result for result in results):
+            success_status = status.HTTP_207_MULTI_STATUS
+        return Response({'results': results}, status=success_status)
+
+    @staticmethod
+    def validate_bulk_items(items, partial=False):
+        """Проверенные данные по индексам и заготовка результатов."""
+        valid = {}
+        results = [None] * len(items)
+        for index, item in enumerate(items):
+            serializer = BulkTitleSerializer(data=item, partial=partial)
+            if not serializer.is_valid():
+                results[index] = item_error(serializer.errors)
+            elif partial and 'id' not in serializer.validated_data:
+                results[index] = item_error({'id': [ID_REQUIRED_MESSAGE]})
+            else:
+                valid[index] = serializer.validated_data
+        return valid, results
+
+    @staticmethod
+    def merge_bulk_results(valid, written, results, success_status):
+        """Дополнить результаты записанными произведениями.
+
+        Представления всех произведений строятся тремя запросами.
+        """
+        title_ids = {}
+        for index, outcome in zip(valid, written):
+            if isinstance(outcome, dict):
+                results[index] = item_error(outcome)
+            else:
+                title_ids[index] = outcome.pk
+        titles = Title.objects.filter(
+            pk__in=set(title_ids.values())
+        ).select_related('category').prefetch_related('genre')
+        data = {
+            title['id']: title
+            for title in TitleSerializer(titles, many=True).data
+        }
+        for index, title_id in title_ids.items():
+            results[index] = {'status': success_status, 'data': data[title_id]}
+        return results
+
+    def bulk_create_titles(self, items):
+        valid, results = self.validate_bulk_items(items)
+        written = create_titles(list(valid.values()))
+        return self.merge_bulk_results(
+            valid, written, results, status.HTTP_201_CREATED
+        )
+
+    def bulk_update_titles(self, items):
+        valid, results = self.validate_bulk_items(items, partial=True)
+        written = update_titles(list(valid.values()))
+        return self.merge_bulk_results(
+            valid, written, results, status.HTTP_200_OK
+        )
+
+    @staticmethod
+    def bulk_destroy_titles(items):
+        id_field = serializers.IntegerField()
+        ids = {}
+        results = [None] * len(items)
+        for index, item in enumerate(items):
+            try:
+                ids[index] = id_field.run_validation(item)
+            except ValidationError as error:
+                results[index] = item_error({'id': error.detail})
+        for index, outcome in zip(ids, delete_titles(list(ids.values()))):
+            if isinstance(outcome, dict):
+                results[index] = item_error(outcome)
+            else:
+                results[index] = {
+                    'status': status.HTTP_204_NO_CONTENT, 'id': outcome
+                }
+        return results
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import (
+    http_date,
+    parse_etags,
+    parse_http_date_safe,
+    quote_etag,
+)
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.cache import get_store
+
+TAG_VERSION_PREFIX = 'api:tag:'
+RESPONSE_PREFIX = 'api:response:'
+ANONYMOUS_ROLE = 'anonymous'
+# Тег, от которого зависят все ответы.
+ALL_TAG = 'all'
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов кэша.
+
+    Версия - отметка времени в наносекундах, записанная при последней
+    инвалидации. Если тег ещё не встречался или был вытеснен из кэша,
+    ему назначается новая версия, поэтому старые ответы не оживают.
+    """
+    store = get_store()
+    keys = [f'{TAG_VERSION_PREFIX}{tag}' for tag in tags]
+    versions = store.get_many(keys)
+    for index, version in enumerate(versions):
+        if version is None:
+            version = str(time.time_ns())
+            if not store.add(keys[index], version):
+                version = store.get(keys[index]) or version
+            versions[index] = version
+    return versions
+
+
+def invalidate(*tags) -> None:
+    """Сделать недействительными все ответы, зависящие от тегов."""
+    store = get_store()
+    version = str(time.time_ns())
+    for tag in tags:
+        store.set(f'{TAG_VERSION_PREFIX}{tag}', version)
+
+
+def invalidate_all() -> None:
+    """Сделать недействительными все ответы, например после импорта."""
+    invalidate(ALL_TAG)
+
+
+def get_role(user) -> str:
+    """Роль пользователя, от которой может зависеть ответ."""
+    if not user or not user.is_authenticated:
+        return ANONYMOUS_ROLE
+    if user.is_admin:
+        return user.RoleChoices.ADMIN
+    return user.role
+
+
+def build_response_key(request, versions) -> str:
+    query = sorted(request.query_params.lists())
+    raw = json.dumps(
+        [request.path, query, get_role(request.user), versions],
+        ensure_ascii=False
+    )
+    return RESPONSE_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def build_etag(request, key) -> str:
+    """Сильный ETag: ключ ответа плюс формат рендеринга."""
+    raw = f'{key}:{request.accepted_renderer.format}'
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def get_last_modified(versions):
+    """Время последнего изменения по версиям тегов, в секундах.
+
+    Пока идёт секунда последнего изменения, возвращает `None`: в ту же
+    секунду возможны новые записи, а дата с точностью до секунды их
+    не различает (RFC 7232, 2.2.2). Такие ответы проверяются по ETag.
+    """
+    last_modified = max(int(version) for version in versions) // 10 ** 9
+    if last_modified >= int(time.time()):
+        return None
+    return last_modified
+
+
+def is_not_modified(request, etag, last_modified) -> bool:
+    """Актуальна ли у клиента копия ответа (RFC 7232, раздел 6).
+
+    If-None-Match сравнивается с точным ETag и, если передан, заменяет
+    If-Modified-Since. Дата If-Modified-Since из будущего
+    недействительна и не учитывается.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or any(
+            tag[2:] == etag if tag.startswith('W/') else tag == etag
+            for tag in etags
+        )
+    since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+    )
+    return (
+        last_modified is not None and since is not None
+        and last_modified <= since <= time.time()
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+class CachedListMixin:
+    """Кэширование и условные GET для ответов list.
+
+    Вьюсет перечисляет в `get_cache_tags` ресурсы, от которых зависит
+    ответ. Сигналы из `api.signals` сдвигают версии этих тегов при
+    записи моделей, после чего закэшированные ответы больше не
+    находятся по ключу и истекают по таймауту.
+
+    Из тех же версий строятся заголовки ETag и Last-Modified. Ответ 304
+    отдаётся, только когда известно, что вьюсет ответил бы 200: если
+    ответ есть в кэше, это обходится без запросов к БД и без
+    сериализации, иначе запрос выполняется полностью.
+    """
+
+    def get_cache_tags(self):
+        raise NotImplementedError(
+            '`get_cache_tags()` must be implemented.'
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        versions = get_tag_versions([ALL_TAG, *self.get_cache_tags()])
+        key = build_response_key(request, versions)
+        etag = build_etag(request, key)
+        last_modified = get_last_modified(versions)
+        if not settings.API_CACHE_ENABLED:
+            response = handler(request, *args, **kwargs)
+        else:
+            response = self.get_stored_response(
+                key, handler, request, *args, **kwargs
+            )
+        if response.status_code != 200:
+            return response
+        if is_not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        return set_validators(response, etag, last_modified)
+
+    def get_stored_response(self, key, handler, request, *args, **kwargs):
+        store = get_store()
+        cached = store.get(key)
+        if cached is not None:
+            return Response(json.loads(cached))
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            store.set(
+                key,
+                json.dumps(response.data, cls=JSONEncoder),
+                settings.API_CACHE_TIMEOUT
+            )
+        return response
+
+
+class CachedResponseMixin(CachedListMixin):
+    """Кэширование ответов list и retrieve с инвалидацией по тегам."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,11 @@
+PAGINATION_QUERY_PARAM = 'pagination'
+KEYSET_PAGINATION_MODE = 'cursor'
+CURSOR_QUERY_PARAM = 'cursor'
+EXPORT_CHUNK_SIZE = 500
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+SEARCH_QUERY_MAX_LENGTH = 256
+RATE_LIMIT_KEY_PREFIX = 'throttle:'
+RATE_LIMIT_MAX_BUCKETS = 100000
+BULK_MAX_ITEMS = 1000
+STATS_QUERY_PARAM = 'stats'
+STATS_QUERY_VALUES = ('1', 'true')
@@ -0,0 +1,46 @@
+from rest_framework import serializers
+
+from content.constants import (
+    CATEGORY_SLUG_MAX_LENGTH,
+    GENRE_SLUG_MAX_LENGTH,
+)
+from leaderboards.constants import (
+    DEFAULT_LIMIT,
+    DEFAULT_TRENDING_DAYS,
+    MAX_LIMIT,
+    MAX_TRENDING_DAYS,
+)
+
+SINGLE_BOARD_MESSAGE = 'Use only one of genre, category and year.'
+
+
+class TopQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров рейтинга лучших произведений."""
+
+    genre = serializers.SlugField(
+        max_length=GENRE_SLUG_MAX_LENGTH, required=False
+    )
+    category = serializers.SlugField(
+        max_length=CATEGORY_SLUG_MAX_LENGTH, required=False
+    )
+    year = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT
+    )
+
+    def validate(self, attrs):
+        if len({'genre', 'category', 'year'} & set(attrs)) > 1:
+            raise serializers.ValidationError(SINGLE_BOARD_MESSAGE)
+        return attrs
+
+
+class TrendingQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров рейтинга популярных произведений."""
+
+    days = serializers.IntegerField(
+        min_value=1, max_value=MAX_TRENDING_DAYS,
+        default=DEFAULT_TRENDING_DAYS
+    )
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_LIMIT, default=DEFAULT_LIMIT
+    )
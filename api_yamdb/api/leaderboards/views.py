@@ -0,0 +1,94 @@
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from content.models import Category, Genre, Title
+from content.slugs import get_slug_cache
+from leaderboards.boards import (
+    category_board,
+    genre_board,
+    top_titles,
+    trending_titles,
+    year_board,
+)
+from leaderboards.constants import OVERALL_BOARD
+from ..serializers import ReadOnlyTitleSerializer
+from .serializers import TopQuerySerializer, TrendingQuerySerializer
+
+BOARDS = (
+    ('genre', Genre, genre_board),
+    ('category', Category, category_board),
+)
+
+
+def get_board(params):
+    """Рейтинг по параметрам запроса; `None` для неизвестного слага."""
+    if 'year' in params:
+        return year_board(params['year'])
+    for name, model, board in BOARDS:
+        if name in params:
+            group_id = get_slug_cache(model).resolve(
+                [params[name]]
+            ).get(params[name])
+            return None if group_id is None else board(group_id)
+    return OVERALL_BOARD
+
+
+def serialize_titles(title_ids) -> dict:
+    """Представления произведений по id, тремя запросами."""
+    titles = Title.objects.filter(pk__in=title_ids).select_related(
+        'category', 'pending_rating'
+    ).prefetch_related('genre')
+    return {
+        title['id']: title
+        for title in ReadOnlyTitleSerializer(titles, many=True).data
+    }
+
+
+class LeaderboardMixin:
+    """Рейтинги лучших и популярных произведений, см. `leaderboards`.
+
+    Ответы кэшируются вместе со списком произведений.
+    """
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """Лучшие произведения по байесовской оценке.
+
+        Параметры: `genre` или `category` (слаг) либо `year` - рейтинг
+        группы вместо общего, `limit` - длина рейтинга.
+        """
+        return self.get_cached_response(self.get_top, request)
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """Произведения с наибольшим числом отзывов за `days` дней."""
+        return self.get_cached_response(self.get_trending, request)
+
+    def get_top(self, request):
+        params = TopQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        board = get_board(params.validated_data)
+        entries = [] if board is None else top_titles(
+            board, params.validated_data['limit']
+        )
+        titles = serialize_titles([title_id for title_id, _ in entries])
+        return Response({'results': [
+            {**titles[title_id], 'weighted_rating': round(score, 3)}
+            for title_id, score in entries if title_id in titles
+        ]})
+
+    def get_trending(self, request):
+        params = TrendingQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        entries = trending_titles(
+            params.validated_data['days'], params.validated_data['limit']
+        )
+        titles = serialize_titles([title_id for title_id, _, _ in entries])
+        return Response({'results': [
+            {
+                **titles[title_id],
+                'recent_review_count': reviews,
+                'recent_rating': round(rating, 3),
+            }
+            for title_id, reviews, rating in entries if title_id in titles
+        ]})
@@ -0,0 +1,24 @@
+from rest_framework import status, views
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.metrics import registry
+from ..permissions import IsAdminOrForbidden
+
+
+class MetricsView(views.APIView):
+    """Гистограммы метрик запросов по маршрутам.
+
+    Метрики собирает `RequestMetricsMiddleware` для доли запросов
+    `REQUEST_METRICS_SAMPLE_RATE`; у каждого процесса они свои.
+    DELETE обнуляет накопленные гистограммы.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminOrForbidden]
+
+    def get(self, request):
+        return Response(registry.snapshot())
+
+    def delete(self, request):
+        registry.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
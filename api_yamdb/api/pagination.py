@@ -0,0 +1,149 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .constants import CURSOR_QUERY_PARAM
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (курсорная) пагинация по составному ключу сортировки.
+
+    Страница выбирается условием вида `(name, id) > (:name, :id)`
+    вместо OFFSET, а количество объектов не считается. Поэтому
+    дальние страницы обходятся так же дёшево, как первая.
+    Последнее поле `ordering` должно быть уникальным.
+    """
+
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = CURSOR_QUERY_PARAM
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(position, reverse)
+            )
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_fields(self):
+        """Поля ключа сортировки и признак убывания для каждого."""
+        return [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in self.ordering
+        ]
+
+    def get_ordering(self, reverse):
+        return [
+            field if descending == reverse else f'-{field}'
+            for field, descending in self.get_fields()
+        ]
+
+    def get_keyset_filter(self, position, reverse):
+        """Условие "строго после позиции" для составного ключа."""
+        keyset_filter = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.get_fields(), position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            keyset_filter |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return keyset_filter
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = cursor['p']
+            reverse = bool(cursor.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        position = [
+            self.get_position_value(instance, field)
+            for field, _ in self.get_fields()
+        ]
+        cursor = {'p': position, 'r': int(reverse)}
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, ensure_ascii=False).encode()
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_position_value(self, instance, field):
+        value = getattr(instance, field)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+
+class TitleKeysetPagination(KeysetPagination):
+    """Keyset-пагинация произведений по `(name, id)`."""
+
+    ordering = ('name', 'id')
+
+
+class PubDateKeysetPagination(KeysetPagination):
+    """Keyset-пагинация отзывов и комментариев по `(pub_date, id)`,
+    от новых к старым.
+    """
+
+    ordering = ('-pub_date', '-id')
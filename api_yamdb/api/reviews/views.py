@@ -5,17 +5,31 @@ from django.db import models
 
 from content.models import Title
 from reviews.models import Review, Comment
+from api.cache import CachedResponseMixin
+from api.pagination import PubDateKeysetPagination
 from api.permissions import IsAdminAuthorModeratorOrReadOnly
+from api.throttling import TokenBucketThrottle
+from api.viewsets import KeysetPaginationMixin
 from .serializers import CommentSerializer, ReviewSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    CachedResponseMixin, KeysetPaginationMixin, viewsets.ModelViewSet
+):
     """Вьюсет для работы с отзывами на произведения."""
 
     serializer_class = ReviewSerializer
     permission_classes = [IsAdminAuthorModeratorOrReadOnly]
+    keyset_pagination_class = PubDateKeysetPagination
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'review'
+    throttle_idents = ('user',)
     http_method_names = ["get", "post", "patch", "delete", "head", "options"]
 
+    def get_cache_tags(self) -> list:
+        """Отзывы зависят от произведения и его рейтинга."""
+        return [f'title:{self.kwargs.get("title_id")}']
+
     def get_title(self) -> Title:
         """Получение произведения по ID."""
         return get_object_or_404(Title, id=self.kwargs.get("title_id"))
@@ -45,13 +59,23 @@ class ReviewViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    CachedResponseMixin, KeysetPaginationMixin, viewsets.ModelViewSet
+):
     """Вьюсет для работы с комментариями к отзывам."""
 
     serializer_class = CommentSerializer
     permission_classes = [IsAdminAuthorModeratorOrReadOnly]
+    keyset_pagination_class = PubDateKeysetPagination
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'comment'
+    throttle_idents = ('user',)
     http_method_names = ["get", "post", "patch", "delete", "head", "options"]
 
+    def get_cache_tags(self) -> list:
+        """Комментарии зависят только от своего отзыва."""
+        return [f'review:{self.kwargs.get("review_id")}']
+
     def get_review(self) -> Review:
         """Получение отзыва по ID."""
         return get_object_or_404(Review, id=self.kwargs.get("review_id"))
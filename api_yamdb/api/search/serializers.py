@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+from search.models import SearchDocument
+from api.constants import SEARCH_QUERY_MAX_LENGTH
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров поискового запроса."""
+
+    q = serializers.CharField(max_length=SEARCH_QUERY_MAX_LENGTH)
+    type = serializers.ChoiceField(
+        choices=SearchDocument.KindChoices.choices, required=False
+    )
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    """Сериализатор найденного документа."""
+
+    type = serializers.CharField(source="kind")
+    id = serializers.IntegerField(source="object_id")
+    rank = serializers.FloatField(source="search_rank")
+
+    class Meta:
+        """Мета-класс для настройки сериализатора результатов поиска."""
+
+        model = SearchDocument
+        fields = (
+            "type", "id", "title_id", "review_id", "heading", "body", "rank"
+        )
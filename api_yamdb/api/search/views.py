@@ -0,0 +1,25 @@
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+
+from search.backends import SearchResults, get_backend
+from .serializers import SearchQuerySerializer, SearchResultSerializer
+
+
+class SearchView(generics.ListAPIView):
+    """Ранжированный поиск по произведениям, отзывам и комментариям.
+
+    Выдача строится поисковым движком и отдаётся стандартным
+    пагинатором: считается только число совпадений и текущая страница.
+    """
+
+    serializer_class = SearchResultSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self) -> SearchResults:
+        """Возвращает ленивую выдачу по параметрам `q` и `type`."""
+        params = SearchQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        kind = params.validated_data.get("type")
+        return get_backend().search(
+            params.validated_data["q"], [kind] if kind else None
+        )
@@ -1,6 +1,61 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
+from content.constants import (
+    CATEGORY_SLUG_MAX_LENGTH,
+    GENRE_SLUG_MAX_LENGTH,
+    TITLE_NAME_MAX_LENGTH,
+)
 from content.models import Category, Genre, Title
+from content.slugs import get_slug_cache
+from content.validators import validate_year
+from reviews.pending import is_deferred
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """Слаг жанра или категории, разрешаемый через кэш `content.slugs`.
+
+    Вместо запроса к БД возвращает объект только с `pk` и слагом,
+    остальные поля отложены: этого достаточно для записи внешнего
+    ключа и связей many-to-many. Объект мог быть удалён другим
+    процессом после загрузки кэша, поэтому сериализатор, записавший
+    его, проверяет `get_deleted_errors` при ошибке целостности.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'slug')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, (str, int)):
+            self.fail('invalid')
+        slug = str(data)
+        queryset = self.get_queryset()
+        pk = get_slug_cache(queryset.model).resolve(
+            [slug], queryset.db
+        ).get(slug)
+        if pk is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=slug)
+        return queryset.model.from_db(queryset.db, ('id', 'slug'), (pk, slug))
+
+    def get_deleted_errors(self, objects) -> list:
+        """Ошибки `does_not_exist` для объектов, которых уже нет в БД.
+
+        Если такие нашлись, кэш слагов устарел: он сбрасывается, чтобы
+        следующий запрос получил ошибку ещё при валидации.
+        """
+        queryset = self.get_queryset()
+        existing = set(queryset.filter(
+            pk__in=[obj.pk for obj in objects]
+        ).values_list('pk', flat=True))
+        message = self.error_messages['does_not_exist']
+        errors = [
+            message.format(slug_name=self.slug_field, value=obj.slug)
+            for obj in objects if obj.pk not in existing
+        ]
+        if errors:
+            get_slug_cache(queryset.model).invalidate()
+        return errors
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -19,27 +74,102 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
+class TitleStatsSerializer(serializers.Serializer):
+    """Агрегаты произведений жанра или категории (сериализатор)"""
+    title_count = serializers.IntegerField()
+    rating = serializers.FloatField(allow_null=True)
+    rating_count = serializers.IntegerField()
+
+
+class CategoryWithStatsSerializer(CategorySerializer):
+    """Категории с агрегатами произведений (сериализатор)"""
+    stats = TitleStatsSerializer(read_only=True, allow_null=True)
+
+
+class GenreWithStatsSerializer(GenreSerializer):
+    """Жанры с агрегатами произведений (сериализатор)"""
+    stats = TitleStatsSerializer(read_only=True, allow_null=True)
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Произведение (сериализатор)"""
-    genre = serializers.SlugRelatedField(
-        slug_field='slug', many=True, queryset=Genre.objects.all()
-    )
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all()
-    )
+    genre = CachedSlugRelatedField(many=True, queryset=Genre.objects.all())
+    category = CachedSlugRelatedField(queryset=Category.objects.all())
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating')
+
+    def save(self, **kwargs):
+        """Сохранить произведение.
+
+        Кэшированный жанр или категория могли быть удалены другим
+        процессом: тогда вместо ошибки целостности (500) возвращается
+        `does_not_exist` у соответствующего поля.
+        """
+        try:
+            with transaction.atomic(using=Title.objects.db):
+                return super().save(**kwargs)
+        except IntegrityError:
+            errors = self.get_deleted_errors()
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+
+    def get_deleted_errors(self) -> dict:
+        related = {
+            'genre': self.validated_data.get('genre', []),
+            'category': [self.validated_data.get('category')],
+        }
+        errors = {}
+        for name, objects in related.items():
+            field = self.fields[name]
+            field = getattr(field, 'child_relation', field)
+            objects = [obj for obj in objects if obj is not None]
+            field_errors = field.get_deleted_errors(objects) if objects else []
+            if field_errors:
+                errors[name] = field_errors
+        return errors
 
 
 class ReadOnlyTitleSerializer(serializers.ModelSerializer):
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    """Произведение для чтения (сериализатор)
+
+    При отложенном пересчёте рейтинга добавляет `rating_pending_since` -
+    время, с которого рейтинг ждёт пересчёта, или `null`. Для него
+    произведения читаются с `select_related('pending_rating')`.
+    """
+    rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
+    rating_pending_since = serializers.DateTimeField(
+        source='pending_rating.marked_at', read_only=True
+    )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not is_deferred():
+            del fields['rating_pending_since']
+        return fields
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    """Элемент пакетной записи произведений.
+
+    Жанры и категория принимаются слагами без обращения к БД: их
+    разрешает `content.bulk` сразу для всего пакета.
+    """
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=TITLE_NAME_MAX_LENGTH)
+    year = serializers.IntegerField(validators=[validate_year])
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=GENRE_SLUG_MAX_LENGTH)
+    )
+    category = serializers.SlugField(max_length=CATEGORY_SLUG_MAX_LENGTH)
@@ -0,0 +1,94 @@
+"""Инвалидация кэша ответов API при изменении моделей.
+
+Версии тегов сдвигаются после фиксации транзакции записи: иначе
+параллельный GET мог бы прочитать старые строки и закэшировать их
+под новой версией.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from content.models import Category, Genre, Title, TitleGenre
+from content.signals import titles_bulk_changed
+from reviews.models import Comment, Review
+from reviews.pending import ratings_recomputed
+from .cache import invalidate
+
+
+def title_tags(*title_ids):
+    return ['titles'] + [
+        f'title:{title_id}' for title_id in title_ids if title_id
+    ]
+
+
+def invalidate_on_commit(using, *tags) -> None:
+    transaction.on_commit(lambda: invalidate(*tags), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, instance, using, **kwargs):
+    invalidate_on_commit(using, 'categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, instance, using, **kwargs):
+    invalidate_on_commit(using, 'genres')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, using, **kwargs):
+    invalidate_on_commit(using, *title_tags(instance.pk))
+
+
+@receiver(titles_bulk_changed, sender=Title)
+def invalidate_bulk_titles(sender, title_ids, using, **kwargs):
+    invalidate_on_commit(using, *title_tags(*title_ids))
+
+
+@receiver(ratings_recomputed, sender=Title)
+def invalidate_recomputed_titles(sender, title_ids, using, **kwargs):
+    invalidate_on_commit(using, *title_tags(*title_ids))
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def invalidate_title_genre(sender, instance, using, **kwargs):
+    invalidate_on_commit(using, *title_tags(instance.title_id))
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            using, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_on_commit(using, *title_tags(instance.pk))
+        return
+    # Изменение со стороны жанра: затронуты произведения из pk_set,
+    # а при очистке - все произведения жанра.
+    if action == 'pre_clear':
+        instance._cleared_title_ids = list(
+            instance.title_set.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        invalidate_on_commit(using, *title_tags(*instance.__dict__.pop(
+            '_cleared_title_ids', ()
+        )))
+    elif action.startswith('post_'):
+        invalidate_on_commit(using, *title_tags(*pk_set))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, using, **kwargs):
+    invalidate_on_commit(
+        using, *title_tags(instance.title_id), f'review:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, using, **kwargs):
+    invalidate_on_commit(using, f'review:{instance.review_id}')
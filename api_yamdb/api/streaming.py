@@ -0,0 +1,33 @@
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def iter_chunks(queryset, chunk_size):
+    """Объекты выборки порциями, по возрастанию первичного ключа.
+
+    Каждая порция - отдельный запрос `pk > последний pk LIMIT n`,
+    поэтому prefetch_related работает, а память не растёт с размером
+    выборки.
+    """
+    last_pk = None
+    queryset = queryset.order_by('pk')
+    while True:
+        page = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk
+        )
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def iter_ndjson(queryset, serializer_class, chunk_size, context=None):
+    """Строки NDJSON: по одному сериализованному объекту на строку."""
+    for chunk in iter_chunks(queryset, chunk_size):
+        data = serializer_class(chunk, many=True, context=context).data
+        yield ''.join(
+            json.dumps(item, cls=JSONEncoder, ensure_ascii=False) + '\n'
+            for item in data
+        )
@@ -0,0 +1,200 @@
+"""Ограничение частоты запросов алгоритмом token bucket.
+
+У каждой пары «область + идентификатор» (IP, username из тела запроса,
+id пользователя) своё ведро на `capacity` запросов, которое равномерно
+наполняется за период. Лимиты задаются настройкой `RATE_LIMITS`.
+
+При `REDIS_ENABLED = True` ведра хранятся в Redis и обновляются одним
+Lua-скриптом, поэтому лимит общий для всех процессов. Без Redis или
+при его недоступности используются ведра в памяти процесса.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+from users.constants import USERNAME_MAX_LENGTH
+from users.services.redis_config import redis_client
+from .constants import RATE_LIMIT_KEY_PREFIX, RATE_LIMIT_MAX_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Наполнить ведро за прошедшее время и забрать из него один токен.
+# Возвращает 0, если запрос разрешён, иначе время ожидания в мс.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+local elapsed = math.max(0, now - updated_at)
+tokens = math.min(capacity, tokens + elapsed * refill_rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / refill_rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate))
+return wait
+"""
+
+
+class Rate(NamedTuple):
+    """Размер ведра и скорость его наполнения в токенах в секунду."""
+
+    capacity: int
+    refill_rate: float
+
+
+def parse_rate(rate: str) -> Rate:
+    """Разобрать лимит вида `5/min` в формате DRF."""
+    number, period = rate.split('/')
+    capacity = int(number)
+    return Rate(capacity, capacity / RATE_PERIODS[period[0]])
+
+
+class MemoryRateLimiter:
+    """Ведра в памяти процесса.
+
+    Число ведер ограничено, первыми вытесняются давно не использованные.
+    """
+
+    def __init__(self, max_size: int, clock=time.monotonic) -> None:
+        self._max_size = max_size
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, rate: Rate) -> float:
+        """Забрать токен; вернуть 0 или время ожидания в секундах."""
+        with self._lock:
+            now = self._clock()
+            tokens, updated_at = self._buckets.get(key, (rate.capacity, now))
+            tokens = min(
+                rate.capacity,
+                tokens + max(0, now - updated_at) * rate.refill_rate
+            )
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate.refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_size:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisRateLimiter:
+    """Ведра в Redis, одно обращение к серверу на проверку."""
+
+    def __init__(self, client) -> None:
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self, key: str, rate: Rate) -> float:
+        wait = self._script(
+            keys=[key], args=[rate.capacity, rate.refill_rate, time.time()]
+        )
+        return int(wait) / 1000
+
+
+class RateLimiter:
+    """Выбор хранилища ведер: Redis с откатом на память процесса."""
+
+    def __init__(self, client, max_size: int) -> None:
+        self._redis_limiter = RedisRateLimiter(client)
+        self._memory_limiter = MemoryRateLimiter(max_size)
+
+    def acquire(self, key: str, rate: Rate) -> float:
+        key = f'{RATE_LIMIT_KEY_PREFIX}{key}'
+        if settings.REDIS_ENABLED:
+            try:
+                return self._redis_limiter.acquire(key, rate)
+            except RedisError as error:
+                logger.warning(
+                    'Redis is unavailable, rate limit is local: %s', error
+                )
+        return self._memory_limiter.acquire(key, rate)
+
+    def clear(self) -> None:
+        """Очистить ведра в памяти процесса."""
+        self._memory_limiter.clear()
+
+
+rate_limiter = RateLimiter(redis_client, RATE_LIMIT_MAX_BUCKETS)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Лимит POST-запросов по областям вьюсета.
+
+    Ограничивается создание: регистрация, получение токена, публикация
+    отзывов и комментариев. Правка и удаление своих объектов лимит
+    не расходуют.
+
+    Вьюсет задаёт `throttle_scope` и кортеж `throttle_idents` из
+    `ip`, `username` и `user`; лимит берётся из `RATE_LIMITS` по ключу
+    `<scope>_<ident>`. Идентификаторы проверяются по порядку до первого
+    отказа, поэтому запрос сверх лимита по IP отклоняется без разбора
+    тела и без расхода токенов других ведер.
+    """
+
+    def __init__(self) -> None:
+        self._wait = None
+
+    def allow_request(self, request, view) -> bool:
+        if request.method != 'POST':
+            return True
+        scope = view.throttle_scope
+        for ident_name in view.throttle_idents:
+            rate = settings.RATE_LIMITS.get(f'{scope}_{ident_name}')
+            if rate is None:
+                continue
+            ident = getattr(self, f'get_{ident_name}_ident')(request)
+            if ident is None:
+                continue
+            wait = rate_limiter.acquire(
+                f'{scope}:{ident_name}:{ident}', parse_rate(rate)
+            )
+            if wait:
+                self._wait = wait
+                return False
+        return True
+
+    def wait(self) -> Optional[int]:
+        if self._wait is None:
+            return None
+        return math.ceil(self._wait)
+
+    def get_ip_ident(self, request) -> Optional[str]:
+        return self.get_ident(request)
+
+    @staticmethod
+    def get_username_ident(request) -> Optional[str]:
+        if not isinstance(request.data, dict):
+            return None
+        username = request.data.get('username')
+        if not username or not isinstance(username, str):
+            return None
+        return username[:USERNAME_MAX_LENGTH].lower()
+
+    @staticmethod
+    def get_user_ident(request) -> Optional[str]:
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return str(request.user.pk)
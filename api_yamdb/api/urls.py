@@ -15,6 +15,9 @@ from .reviews.views import (
     ReviewViewSet,
     CommentViewSet,
 )
+from .metrics.views import MetricsView
+from .search.views import SearchView
+from . import async_views
 
 
 router_v1 = routers.DefaultRouter()
@@ -54,4 +57,16 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SignUpView.as_view()),
     path('v1/auth/token/', TokenObtainView .as_view()),
+    path('v1/search/', SearchView.as_view()),
+    path('v1/metrics/', MetricsView.as_view()),
+    path('v1/async/titles/', async_views.title_list),
+    path('v1/async/titles/<int:title_id>/', async_views.title_detail),
+    path(
+        'v1/async/titles/<int:title_id>/reviews/',
+        async_views.review_list
+    ),
+    path(
+        'v1/async/titles/<int:title_id>/reviews/<int:review_id>/comments/',
+        async_views.comment_list
+    ),
 ]
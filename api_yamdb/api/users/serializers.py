@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import Q
 from rest_framework import serializers
 from api.users.validators import (
     ConfirmationCodeValidator, username_validator
@@ -55,13 +57,20 @@ class SignUpSerializer(serializers.ModelSerializer):
     ], max_length=USERNAME_MAX_LENGTH)
 
     def create(self, validated_data) -> User:
-        """Create user and triggers email verification process."""
-        self.user = super().create(validated_data)
+        """Create user and triggers email verification process.
+
+        The user and the outbox email are saved in one transaction,
+        so a failed signup leaves neither of them.
+        """
         try:
-            confirmation_code = verification_service.generate(
-                self.user.username
-            )
-            verification_service.send_code(self.user.email, confirmation_code)
+            with transaction.atomic():
+                self.user = super().create(validated_data)
+                confirmation_code = verification_service.generate(
+                    self.user.username
+                )
+                verification_service.send_code(
+                    self.user.email, confirmation_code
+                )
             return self.user
 
         except UsernameEmptyError as error:
@@ -69,8 +78,6 @@ class SignUpSerializer(serializers.ModelSerializer):
                 'username': [error.message]
             })
         except EmailSendError as error:
-            if self.user.id:
-                self.user.delete()
             raise serializers.ValidationError({
                 'email': [error.message]
             })
@@ -91,27 +98,30 @@ class SignUpSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, attrs):
-        """Validate other logic."""
+        """Validate other logic.
+
+        All conflicts are resolved from one query over
+        username OR email, it returns at most two users.
+        """
         email = attrs.get('email')
         username = attrs.get('username')
+        conflicts = list(User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ).values_list('username', 'email'))
 
-        if User.objects.filter(username=username, email=email).exists():
+        if (username, email) in conflicts:
             raise serializers.ValidationError(
                 f'User with mail {email}'
                 f' and username {username} already exist',
                 code='user_exists'
             )
 
-        if User.objects.filter(
-                email=email
-        ).exclude(username=username).exists():
+        if any(found_email == email for _, found_email in conflicts):
             raise serializers.ValidationError(
                 {'email': 'Email already exists'}
             )
 
-        if User.objects.filter(
-                username=username
-        ).exclude(email=email).exists():
+        if any(found_username == username for found_username, _ in conflicts):
             raise serializers.ValidationError(
                 {'username': 'Username already exists'}
             )
@@ -148,7 +158,8 @@ class TokenObtainSerializer(serializers.Serializer):
             - When code format is incorrect
 
     Returns:
-        dict: Validated data containing username and confirmation code
+        dict: Validated data containing username, confirmation code
+        and the user, fetched once for the whole request
     """
 
     username = serializers.CharField(
@@ -160,8 +171,9 @@ class TokenObtainSerializer(serializers.Serializer):
     )
 
     def validate_username(self, value):
-        """Validate username by exist user."""
-        if not User.objects.filter(username=value).exists():
+        """Validate username by exist user and keep the user."""
+        self.user = User.objects.filter(username=value).first()
+        if self.user is None:
             raise serializers.ValidationError(
                 'Username not exist', code='username_not_found'
             )
@@ -175,6 +187,7 @@ class TokenObtainSerializer(serializers.Serializer):
         if verification_service.check_code(
                 code=confirmation_code, username=username
         ):
+            attrs['user'] = self.user
             return attrs
 
         raise serializers.ValidationError(
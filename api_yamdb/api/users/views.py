@@ -6,7 +6,6 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework import status
 from rest_framework.serializers import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
 
 from api.users.serializers import (
@@ -14,8 +13,11 @@ from api.users.serializers import (
     TokenObtainSerializer,
     UserViewSerializer
 )
+from users.tokens import RoleAccessToken
 from ..permissions import IsAdminOrForbidden
+from ..throttling import TokenBucketThrottle
 from users.models import User
+from users.services.auth_version_service import auth_version_service
 
 
 class PublicAPIView(views.APIView):
@@ -45,12 +47,19 @@ class SignUpView(PublicAPIView):
     Permissions:
         - AllowAny: Endpoint is public
 
+    Throttling:
+        - Limited per client IP and per requested username
+
     Returns:
         Response with status 200 and user data on success
         Response with status 200 if user already exists
         Response with validation errors otherwise
     """
 
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'signup'
+    throttle_idents = ('ip', 'username')
+
     def post(self, request: Request) -> Response:
         """Process user registration request.
 
@@ -99,11 +108,19 @@ class TokenObtainView(PublicAPIView):
     Permissions:
         - AllowAny: Endpoint is public
 
+    Throttling:
+        - Limited per client IP and per requested username, so
+          confirmation codes can not be brute-forced
+
     Returns:
         Response with JWT token on success
         Response with error details on failure
     """
 
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'token'
+    throttle_idents = ('ip', 'username')
+
     def post(self, request: Request) -> Response:
         """Process token generation request.
 
@@ -124,11 +141,10 @@ class TokenObtainView(PublicAPIView):
         serializer = TokenObtainSerializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
-            username = serializer.validated_data.get('username')
-            user = User.objects.get(username=username)
-            refresh = RefreshToken.for_user(user)
+            user = serializer.validated_data['user']
+            auth_version_service.remember(user.pk, user.auth_version)
             return Response(
-                {'token': str(refresh.access_token)},
+                {'token': str(RoleAccessToken.for_user(user))},
                 status=status.HTTP_200_OK
             )
 
@@ -199,6 +215,9 @@ class UserViewSet(ModelViewSet):
                400: Validation errors on update
         """
         user = request.user
+        if getattr(user, 'from_token', False):
+            # User built from token claims has no profile fields.
+            user = User.objects.get(pk=user.pk)
         if request.method == 'GET':
             serializer = self.get_serializer(instance=user)
             return Response(serializer.data)
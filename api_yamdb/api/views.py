@@ -1,55 +1,111 @@
+from django.http import StreamingHttpResponse
 from rest_framework import filters, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 
-from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
 
 from content.filters import TitlesFilter
 from content.models import Category, Genre, Title
 
-from .permissions import IsAdminOrReadOnly
-from .viewsets import CreateDestroyListViewSet
+from .bulk import BulkTitleMixin
+from .cache import CachedListMixin, CachedResponseMixin
+from .leaderboards.views import LeaderboardMixin
+from .constants import EXPORT_CHUNK_SIZE, NDJSON_CONTENT_TYPE
+from .pagination import TitleKeysetPagination
+from .permissions import IsAdminOrForbidden, IsAdminOrReadOnly
+from .streaming import iter_ndjson
+from .viewsets import (
+    CreateDestroyListViewSet,
+    KeysetPaginationMixin,
+    StatsMixin,
+)
 
 
 from .serializers import (
     CategorySerializer,
+    CategoryWithStatsSerializer,
     GenreSerializer,
+    GenreWithStatsSerializer,
     TitleSerializer,
     ReadOnlyTitleSerializer,
 )
 
 
-class CategoryViewSet(CreateDestroyListViewSet):
+class CategoryViewSet(
+    StatsMixin, CachedListMixin, CreateDestroyListViewSet
+):
     """Вьюсет для категорий"""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    stats_serializer_class = CategoryWithStatsSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def get_cache_tags(self):
+        return ['categories', *self.get_stats_cache_tags()]
+
 
-class GenreViewSet(CreateDestroyListViewSet):
+class GenreViewSet(StatsMixin, CachedListMixin, CreateDestroyListViewSet):
     """Вьюсет для жанров"""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    stats_serializer_class = GenreWithStatsSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def get_cache_tags(self):
+        return ['genres', *self.get_stats_cache_tags()]
+
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    BulkTitleMixin,
+    LeaderboardMixin,
+    CachedResponseMixin,
+    KeysetPaginationMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для произведения"""
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')
-    ).order_by('name')
+    queryset = Title.objects.select_related(
+        'category', 'pending_rating'
+    ).prefetch_related('genre').order_by('name')
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
+    keyset_pagination_class = TitleKeysetPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_cache_tags(self):
+        if self.action == 'retrieve':
+            title_tag = f'title:{self.kwargs[self.lookup_field]}'
+        else:
+            title_tag = 'titles'
+        return [title_tag, 'categories', 'genres']
+
     def get_serializer_class(self):
-        if self.action in ('retrieve', 'list'):
+        if self.action in ('retrieve', 'list', 'export'):
             return ReadOnlyTitleSerializer
         return TitleSerializer
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated, IsAdminOrForbidden]
+    )
+    def export(self, request):
+        """Весь отфильтрованный каталог одним потоковым ответом NDJSON"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            iter_ndjson(
+                queryset,
+                self.get_serializer_class(),
+                EXPORT_CHUNK_SIZE,
+                self.get_serializer_context()
+            ),
+            content_type=NDJSON_CONTENT_TYPE
+        )
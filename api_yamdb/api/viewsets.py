@@ -1,5 +1,13 @@
 from rest_framework import mixins, viewsets
 
+from .constants import (
+    CURSOR_QUERY_PARAM,
+    KEYSET_PAGINATION_MODE,
+    PAGINATION_QUERY_PARAM,
+    STATS_QUERY_PARAM,
+    STATS_QUERY_VALUES,
+)
+
 
 class CreateDestroyListViewSet(
     mixins.CreateModelMixin,
@@ -8,3 +16,62 @@ class CreateDestroyListViewSet(
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class KeysetPaginationMixin:
+    """Включает keyset-пагинацию по запросу клиента.
+
+    По умолчанию используется постраничная пагинация из настроек.
+    Параметр `?pagination=cursor` (или уже полученный `cursor`)
+    переключает список на `keyset_pagination_class`.
+    """
+
+    keyset_pagination_class = None
+
+    def keyset_pagination_requested(self) -> bool:
+        params = self.request.query_params
+        return (
+            params.get(PAGINATION_QUERY_PARAM) == KEYSET_PAGINATION_MODE
+            or CURSOR_QUERY_PARAM in params
+        )
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.keyset_pagination_class is not None
+            and self.keyset_pagination_requested()
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+
+class StatsMixin:
+    """Добавляет в список агрегаты произведений по запросу клиента.
+
+    Параметр `?stats=true` переключает список на
+    `stats_serializer_class` и подгружает агрегаты `stats` тем же
+    запросом. Агрегаты меняются вместе с произведениями и отзывами,
+    поэтому такой ответ кэшируется и с тегом `titles`.
+    """
+
+    stats_serializer_class = None
+
+    def stats_requested(self) -> bool:
+        return self.request.query_params.get(
+            STATS_QUERY_PARAM
+        ) in STATS_QUERY_VALUES
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.stats_requested():
+            queryset = queryset.select_related('stats')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.stats_requested():
+            return self.stats_serializer_class
+        return super().get_serializer_class()
+
+    def get_stats_cache_tags(self):
+        return ['titles'] if self.stats_requested() else []
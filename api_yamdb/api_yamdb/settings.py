@@ -32,10 +32,13 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
     'content.apps.ContentConfig',
     'core.apps.CoreConfig',
-    'reviews.apps.ReviewsConfig'
+    'reviews.apps.ReviewsConfig',
+    'search.apps.SearchConfig',
+    'leaderboards.apps.LeaderboardsConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -101,7 +104,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedUserJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5
@@ -112,15 +115,101 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Token bucket limits of write requests as '<requests>/<period>' per
+# '<scope>_<ident>'. A missing scope is not limited. Buckets are kept
+# in Redis when REDIS_ENABLED, in the worker process otherwise.
+RATE_LIMITS = {
+    'signup_ip': '10/min',
+    'signup_username': '3/min',
+    'token_ip': '20/min',
+    'token_username': '5/min',
+    'review_user': '10/min',
+    'comment_user': '30/min',
+}
+
 
 AUTH_USER_MODEL = 'users.User'
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 DEFAULT_FROM_EMAIL = 'YAmdb@example.com'
+# Queue emails in the outbox table and deliver them with the
+# send_outbox_emails command instead of sending during the request.
+EMAIL_OUTBOX_ENABLED = False
 
 # Redis settings
 REDIS_ENABLED = False
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+REDIS_DB = int(os.getenv('REDIS_DB', 0))
+REDIS_PASSWORD = os.getenv('REDIS_PASSWORD') or None
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.5))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(
+    os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', 0.5)
+)
+REDIS_RETRIES = int(os.getenv('REDIS_RETRIES', 3))
+REDIS_RETRY_BACKOFF_BASE = float(os.getenv('REDIS_RETRY_BACKOFF_BASE', 0.01))
+REDIS_RETRY_BACKOFF_CAP = float(os.getenv('REDIS_RETRY_BACKOFF_CAP', 0.2))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+
+# Verification code store used without Redis: 'memory' keeps codes in the
+# worker process, 'sqlite' shares them between processes through a file.
+VERIFICATION_CODE_STORE = os.getenv('VERIFICATION_CODE_STORE', 'memory')
+VERIFICATION_CODE_STORE_PATH = os.getenv(
+    'VERIFICATION_CODE_STORE_PATH', BASE_DIR / 'verification_codes.sqlite3'
+)
+VERIFICATION_CODE_STORE_MAX_SIZE = int(
+    os.getenv('VERIFICATION_CODE_STORE_MAX_SIZE', 10000)
+)
+
+# Cache settings
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+API_CACHE_ENABLED = True
+API_CACHE_TIMEOUT = 60 * 5
+
+# Threads running database queries of api.async_views. Every thread
+# keeps its own connection.
+ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', 10))
+
+# Seconds a process trusts its genre and category slug cache before
+# checking the shared version key (see content.slugs).
+SLUG_CACHE_CHECK_INTERVAL = float(
+    os.getenv('SLUG_CACHE_CHECK_INTERVAL', 1)
+)
+
+# Share of requests measured by core.middleware.RequestMetricsMiddleware,
+# from 0 (off) to 1 (every request).
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.getenv('REQUEST_METRICS_SAMPLE_RATE', 0)
+)
+# Add the Server-Timing header with SQL counts and timings to sampled
+# responses. It exposes internals to every client, so keep it off in
+# production and read /api/v1/metrics/ instead.
+REQUEST_METRICS_SERVER_TIMING = False
+
+# Bayesian prior of the title leaderboards: a title is ranked as if it
+# also had LEADERBOARD_PRIOR_WEIGHT reviews scored LEADERBOARD_PRIOR_MEAN.
+# Run `manage.py rebuild_leaderboards` after changing them.
+LEADERBOARD_PRIOR_MEAN = float(os.getenv('LEADERBOARD_PRIOR_MEAN', 5.5))
+LEADERBOARD_PRIOR_WEIGHT = int(os.getenv('LEADERBOARD_PRIOR_WEIGHT', 10))
+
+# Mark reviewed titles in reviews.PendingRating and recompute their
+# ratings with the recompute_ratings command instead of updating them
+# during the request. A title waiting longer than RATING_MAX_STALENESS
+# seconds is recomputed by its next review write. Requires a store shared
+# by all processes (REDIS_ENABLED or a non-local CACHES backend), otherwise
+# the reviews.E001 check fails and ratings are updated during the request.
+RATING_DEFERRED_ENABLED = False
+RATING_MAX_STALENESS = float(os.getenv('RATING_MAX_STALENESS', 5))
+
+# Search settings
+# Use the SQLite FTS5 table when available, the Python index otherwise.
+SEARCH_FTS5_ENABLED = True
 
 # Internationalization
 
@@ -0,0 +1,251 @@
+"""Пакетная запись произведений.
+
+Слаги жанров и категорий всех элементов пакета разрешаются через кэш
+`content.slugs` без запросов к БД, произведения и их связи с жанрами
+записываются через `bulk_create`/`bulk_update` в одной транзакции.
+Элементы с ошибками не записываются, ошибки возвращаются для каждого из них.
+
+`bulk_create` и `bulk_update` не отправляют `post_save`, поэтому
+агрегаты `content.stats` пересчитываются здесь же, а после записи
+отправляется сигнал `titles_bulk_changed`.
+"""
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+)
+from django.db.models import Max
+
+from .constants import BULK_BATCH_SIZE, BULK_CREATE_ATTEMPTS
+from .models import Category, Genre, Title, TitleGenre
+from .signals import titles_bulk_changed
+from .slugs import get_slug_cache
+from .stats import (
+    refresh_category_stats,
+    refresh_genre_stats,
+    refresh_title_stats,
+)
+
+UNKNOWN_SLUG_MESSAGE = 'Object with slug={slug} does not exist.'
+NOT_FOUND_MESSAGE = 'Not found.'
+TITLE_FIELDS = ('name', 'year', 'description')
+
+
+def resolve_slugs(model, slugs, using=DEFAULT_DB_ALIAS) -> dict:
+    """Id объектов по слагам из кэша `content.slugs`."""
+    return get_slug_cache(model).resolve(slugs, using)
+
+
+class SlugResolver:
+    """Id жанров и категорий для всех элементов пакета."""
+
+    def __init__(self, items, using) -> None:
+        self.genre_ids = resolve_slugs(Genre, (
+            slug for item in items for slug in item.get('genre', ())
+        ), using)
+        self.category_ids = resolve_slugs(Category, (
+            item['category'] for item in items if 'category' in item
+        ), using)
+
+    def get_errors(self, item) -> dict:
+        errors = {}
+        unknown = [
+            slug for slug in item.get('genre', ())
+            if slug not in self.genre_ids
+        ]
+        if unknown:
+            errors['genre'] = [
+                UNKNOWN_SLUG_MESSAGE.format(slug=slug) for slug in unknown
+            ]
+        if 'category' in item and item['category'] not in self.category_ids:
+            errors['category'] = [
+                UNKNOWN_SLUG_MESSAGE.format(slug=item['category'])
+            ]
+        return errors
+
+    def get_genre_links(self, title_id, slugs) -> list:
+        return [
+            TitleGenre(title_id=title_id, genre_id=self.genre_ids[slug])
+            for slug in dict.fromkeys(slugs)
+        ]
+
+
+def get_last_id(model, using) -> int:
+    """Наибольший id, выданный таблице модели.
+
+    Первичные ключи Django на SQLite - AUTOINCREMENT: id удалённых
+    строк не выдаются повторно, а наибольший выданный id хранится
+    в `sqlite_sequence`. Иначе id удалённого последним произведения
+    достался бы новому вместе с его тегами кэша и отметками.
+    """
+    last_id = model.objects.using(using).aggregate(
+        last_id=Max('pk')
+    )['last_id'] or 0
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT seq FROM sqlite_sequence WHERE name = %s',
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            last_id = max(last_id, row[0])
+    return last_id
+
+
+def assign_ids(titles, using) -> bool:
+    """Назначить id новым произведениям, если БД не возвращает их.
+
+    `bulk_create` на SQLite не заполняет первичные ключи, а они нужны
+    для связей с жанрами. Вставка явных id сдвигает `sqlite_sequence`,
+    поэтому следующие произведения, созданные по одному, их не повторят.
+    Возвращает True, если id назначены.
+    """
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        return False
+    last_id = get_last_id(Title, using)
+    for offset, title in enumerate(titles, start=1):
+        title.pk = last_id + offset
+    return True
+
+
+def insert_titles(pending, resolver, using) -> None:
+    """Записать произведения и их связи с жанрами.
+
+    Параллельная пакетная запись может прочитать тот же наибольший id
+    и занять назначенные id раньше: тогда вставка завершается
+    `IntegrityError`, транзакция откатывается, и id назначаются заново.
+    """
+    titles = [title for title, _ in pending]
+    for attempt in range(1, BULK_CREATE_ATTEMPTS + 1):
+        try:
+            with transaction.atomic(using=using):
+                assigned = assign_ids(titles, using)
+                Title.objects.using(using).bulk_create(
+                    titles, batch_size=BULK_BATCH_SIZE
+                )
+                TitleGenre.objects.using(using).bulk_create([
+                    link for title, slugs in pending
+                    for link in resolver.get_genre_links(title.pk, slugs)
+                ], batch_size=BULK_BATCH_SIZE)
+                refresh_title_stats([title.pk for title in titles], using)
+            return
+        except IntegrityError:
+            if not assigned or attempt == BULK_CREATE_ATTEMPTS:
+                raise
+
+
+def create_titles(items, using=DEFAULT_DB_ALIAS) -> list:
+    """Создать произведения из проверенных данных.
+
+    Возвращает список той же длины, что и `items`: созданное
+    произведение или словарь ошибок элемента.
+    """
+    resolver = SlugResolver(items, using)
+    results = []
+    pending = []
+    for item in items:
+        errors = resolver.get_errors(item)
+        if errors:
+            results.append(errors)
+            continue
+        title = Title(
+            name=item['name'],
+            year=item['year'],
+            description=item.get('description'),
+            category_id=resolver.category_ids[item['category']],
+        )
+        pending.append((title, item['genre']))
+        results.append(title)
+    if not pending:
+        return results
+    insert_titles(pending, resolver, using)
+    titles_bulk_changed.send(
+        sender=Title, title_ids=[title.pk for title, _ in pending],
+        using=using
+    )
+    return results
+
+
+def apply_changes(title, item, resolver) -> set:
+    """Перенести изменения элемента в произведение, вернуть поля."""
+    fields = {field for field in TITLE_FIELDS if field in item}
+    for field in fields:
+        setattr(title, field, item[field])
+    if 'category' in item:
+        title.category_id = resolver.category_ids[item['category']]
+        fields.add('category')
+    return fields
+
+
+def update_titles(items, using=DEFAULT_DB_ALIAS) -> list:
+    """Изменить произведения по `id` элементов.
+
+    Переданные жанры заменяют текущие. Возвращает список той же длины,
+    что и `items`: изменённое произведение или словарь ошибок.
+    """
+    titles = Title.objects.using(using).in_bulk(
+        [item['id'] for item in items]
+    )
+    resolver = SlugResolver(items, using)
+    results = []
+    changed = {}
+    fields = set()
+    genres = {}
+    for item in items:
+        title = titles.get(item['id'])
+        errors = (
+            resolver.get_errors(item) if title
+            else {'id': [NOT_FOUND_MESSAGE]}
+        )
+        if errors:
+            results.append(errors)
+            continue
+        fields |= apply_changes(title, item, resolver)
+        if 'genre' in item:
+            genres[title.pk] = item['genre']
+        changed[title.pk] = title
+        results.append(title)
+    if not changed:
+        return results
+    links = TitleGenre.objects.using(using)
+    with transaction.atomic(using=using):
+        if fields:
+            Title.objects.using(using).bulk_update(
+                changed.values(), sorted(fields), batch_size=BULK_BATCH_SIZE
+            )
+        stale_genre_ids = set(links.filter(
+            title_id__in=genres, genre__isnull=False
+        ).values_list('genre_id', flat=True))
+        if genres:
+            links.filter(title_id__in=genres).delete()
+            links.bulk_create([
+                link for title_id, slugs in genres.items()
+                for link in resolver.get_genre_links(title_id, slugs)
+            ], batch_size=BULK_BATCH_SIZE)
+        refresh_title_stats(list(changed), using)
+        refresh_genre_stats(stale_genre_ids, using)
+        refresh_category_stats({
+            title.loaded_category_id for title in changed.values()
+        } - {None}, using)
+    titles_bulk_changed.send(
+        sender=Title, title_ids=list(changed), using=using
+    )
+    return results
+
+
+def delete_titles(ids, using=DEFAULT_DB_ALIAS) -> list:
+    """Удалить произведения по id.
+
+    Возвращает список той же длины: id удалённого произведения или
+    словарь ошибок. Удаление идёт через QuerySet, поэтому отзывы и
+    комментарии удаляются каскадно, а `post_delete` отправляется.
+    """
+    titles = Title.objects.using(using).filter(pk__in=ids)
+    existing = set(titles.values_list('pk', flat=True))
+    if existing:
+        with transaction.atomic(using=using):
+            titles.delete()
+    return [
+        title_id if title_id in existing else {'id': [NOT_FOUND_MESSAGE]}
+        for title_id in ids
+    ]
@@ -7,3 +7,7 @@ CATEGORY_SLUG_MAX_LENGTH = 50
 TITLE_NAME_MAX_LENGTH = 256
 
 FIRST_YEAR_OF_MOVIES = 1895
+
+BULK_BATCH_SIZE = 500
+# Попыток пакетной вставки, если id уже заняты параллельной записью.
+BULK_CREATE_ATTEMPTS = 3
@@ -1,6 +1,14 @@
+from django.db import connections
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from .models import TitleGenre
+from .slugs import category_slugs, genre_slugs
+
+# Верхняя граница диапазона для поиска по префиксу: при двоичном
+# сравнении строк (BINARY в SQLite) любая строка, начинающаяся
+# с префикса, меньше префикса с этим символом в конце.
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
 
 
 class TitlesFilter(filters.FilterSet):
@@ -9,15 +17,42 @@ class TitlesFilter(filters.FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
+    name_prefix = filters.CharFilter(method='filter_name_prefix')
+    genre = filters.CharFilter(method='filter_genre')
+    category = filters.CharFilter(method='filter_category')
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category',)
+
+    def filter_name_prefix(self, queryset, name, value):
+        """Поиск по началу названия с учётом регистра.
+
+        LIKE в SQLite не учитывает регистр и не использует индекс,
+        поэтому там префикс ищется диапазоном по `title_name_idx`:
+        сравнение строк в SQLite двоичное. На других БД диапазон
+        при локальных правилах сравнения может терять строки, и
+        используется `startswith`; в PostgreSQL его обслуживает индекс
+        `title_name_pattern_idx` с varchar_pattern_ops.
+        """
+        if connections[queryset.db].vendor == 'sqlite':
+            return queryset.filter(
+                name__gte=value, name__lt=value + PREFIX_UPPER_BOUND
+            )
+        return queryset.filter(name__startswith=value)
+
+    def filter_genre(self, queryset, name, value):
+        """Жанр по части слага без учёта регистра.
+
+        Подходящие id берутся из кэша `content.slugs`, поэтому таблица
+        жанров в запрос не попадает.
+        """
+        return queryset.filter(pk__in=TitleGenre.objects.filter(
+            genre_id__in=genre_slugs.search(value)
+        ).values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        """Категория по части слага без учёта регистра, см. жанры."""
+        return queryset.filter(
+            category_id__in=category_slugs.search(value)
+        )
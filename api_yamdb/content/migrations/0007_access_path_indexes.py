@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 04:48
+
+import content.validators
+from django.db import migrations, models
+
+# Поиск `icontains` в PostgreSQL строится как UPPER("name") LIKE UPPER(%s),
+# поэтому триграммный индекс строится по тому же выражению.
+TRIGRAM_INDEXES = (
+    ('title_name_trgm_idx', 'content_title', 'name'),
+    ('category_slug_trgm_idx', 'content_category', 'slug'),
+    ('genre_slug_trgm_idx', 'content_genre', 'slug'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.PositiveSmallIntegerField(db_index=True, validators=[content.validators.validate_year], verbose_name='Год выхода'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name'], name='title_name_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
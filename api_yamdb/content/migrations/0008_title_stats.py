@@ -0,0 +1,42 @@
+# Generated by Django 3.2 on 2026-10-18 05:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('title_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('rating_count', models.PositiveIntegerField(default=0, verbose_name='Количество оценок')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Рейтинг')),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='content.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreStats',
+            fields=[
+                ('title_count', models.PositiveIntegerField(default=0, verbose_name='Количество произведений')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('rating_count', models.PositiveIntegerField(default=0, verbose_name='Количество оценок')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Рейтинг')),
+                ('genre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='content.genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Статистика жанра',
+                'verbose_name_plural': 'Статистика жанров',
+            },
+        ),
+    ]
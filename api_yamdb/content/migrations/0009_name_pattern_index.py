@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Слаги жанров и категорий ищутся в кэше `content.slugs`, поэтому
+# их триграммные индексы не используются ни одним запросом.
+SLUG_TRIGRAM_INDEXES = (
+    ('category_slug_trgm_idx', 'content_category', 'slug'),
+    ('genre_slug_trgm_idx', 'content_genre', 'slug'),
+)
+# `startswith` в PostgreSQL - LIKE 'префикс%', который при локальных
+# правилах сравнения обслуживает только индекс с varchar_pattern_ops.
+NAME_PATTERN_INDEX = 'title_name_pattern_idx'
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in SLUG_TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {NAME_PATTERN_INDEX} '
+        'ON content_title (name varchar_pattern_ops)'
+    )
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {NAME_PATTERN_INDEX}')
+    for name, table, column in SLUG_TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_title_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
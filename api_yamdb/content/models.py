@@ -1,6 +1,9 @@
+from django.apps import apps
 from django.db import models
-
-from django.db.models import Avg
+from django.db.models import (
+    Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum, Value
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 from .validators import validate_year
 
@@ -55,6 +58,59 @@ class Genre(models.Model):
         return self.name
 
 
+def rating_expression(rating_sum, rating_count):
+    """Выражение для среднего рейтинга по сумме и количеству оценок.
+
+    Если оценок нет, результат - NULL.
+    """
+    return ExpressionWrapper(
+        Cast(rating_sum, FloatField()) / NullIf(rating_count, Value(0)),
+        output_field=FloatField()
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с обслуживанием счётчиков рейтинга."""
+
+    def apply_rating_delta(self, title_id, score_delta, count_delta):
+        """Атомарно изменить счётчики рейтинга произведения.
+
+        Обновление выполняется одним UPDATE на F-выражениях, поэтому
+        параллельные записи отзывов не теряют изменения друг друга.
+        """
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('rating_count') + count_delta
+        return self.filter(pk=title_id).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=rating_expression(new_sum, new_count),
+        )
+
+    def rebuild_ratings(self):
+        """Пересчитать счётчики рейтинга по таблице отзывов.
+
+        Используется для исправления расхождений, например после
+        массового импорта в обход сигналов.
+        """
+        Review = apps.get_model('reviews', 'Review')
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        score_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            Value(0)
+        )
+        score_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            Value(0)
+        )
+        updated = self.update(rating_sum=score_sum, rating_count=score_count)
+        self.update(rating=rating_expression(
+            F('rating_sum'), F('rating_count')
+        ))
+        return updated
+
+
 class Title(models.Model):
     """Произведение"""
     name = models.CharField(
@@ -63,7 +119,8 @@ class Title(models.Model):
     )
     year = models.PositiveSmallIntegerField(
         'Год выхода',
-        validators=[validate_year]
+        validators=[validate_year],
+        db_index=True
     )
     description = models.TextField(
         'Описание',
@@ -81,15 +138,47 @@ class Title(models.Model):
         blank=True, null=True,
         on_delete=models.SET_NULL
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        blank=True, null=True,
+        editable=False
+    )
 
-    @property
-    def rating(self):
-        return self.reviews.aggregate(Avg("score", default=0))
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=('name',), name='title_name_idx')
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запомнить загруженную из БД категорию."""
+        instance = super().from_db(db, field_names, values)
+        if 'category_id' in field_names:
+            instance.remember_category()
+        return instance
+
+    def remember_category(self) -> None:
+        self._loaded_category_id = self.category_id
+
+    @property
+    def loaded_category_id(self):
+        """Категория на момент загрузки или сохранения."""
+        return getattr(self, '_loaded_category_id', None)
 
     def __str__(self) -> str:
         return self.name
@@ -114,3 +203,62 @@ class TitleGenre(models.Model):
 
     def __str__(self) -> str:
         return f'{self.title}, жанр <-> {self.genre}'
+
+
+class TitleStats(models.Model):
+    """Агрегаты произведений группы: количество и рейтинг по отзывам"""
+    title_count = models.PositiveIntegerField(
+        'Количество произведений',
+        default=0
+    )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        blank=True, null=True
+    )
+
+    class Meta:
+        abstract = True
+
+
+class GenreStats(TitleStats):
+    """Агрегаты произведений жанра"""
+    genre = models.OneToOneField(
+        Genre,
+        verbose_name='Жанр',
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        verbose_name = 'Статистика жанра'
+        verbose_name_plural = 'Статистика жанров'
+
+    def __str__(self) -> str:
+        return f'{self.genre}: {self.title_count}'
+
+
+class CategoryStats(TitleStats):
+    """Агрегаты произведений категории"""
+    category = models.OneToOneField(
+        Category,
+        verbose_name='Категория',
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE
+    )
+
+    class Meta:
+        verbose_name = 'Статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+
+    def __str__(self) -> str:
+        return f'{self.category}: {self.title_count}'
@@ -0,0 +1,91 @@
+"""Сигналы приложения content.
+
+`titles_bulk_changed` отправляется после пакетной записи произведений
+через `bulk_create`/`bulk_update`, которые не вызывают `post_save`.
+Аргументы: `title_ids` - id созданных или изменённых произведений,
+`using` - алиас БД.
+
+Здесь же обработчики, сбрасывающие кэш слагов `content.slugs` при
+записи жанров и категорий и поддерживающие агрегаты `content.stats`
+при изменении состава жанров и категорий.
+"""
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import Signal, receiver
+
+from .models import Category, Genre, Title, TitleGenre
+from .slugs import get_slug_cache
+from .stats import create_stats, refresh_category_stats, refresh_genre_stats
+
+titles_bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_slugs(sender, using, **kwargs):
+    # До фиксации другие процессы перечитали бы старую таблицу.
+    transaction.on_commit(get_slug_cache(sender).invalidate, using=using)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def create_group_stats(sender, instance, created, using, **kwargs):
+    if created:
+        create_stats(sender, [instance.pk], using)
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_category_stats(sender, instance, created, using,
+                                 **kwargs):
+    """Пересчитать категории нового произведения или сменившего её."""
+    loaded = instance.loaded_category_id
+    if created or loaded != instance.category_id:
+        refresh_category_stats(
+            {loaded, instance.category_id} - {None}, using
+        )
+    instance.remember_category()
+
+
+@receiver(pre_delete, sender=Title)
+def remember_title_genres(sender, instance, using, **kwargs):
+    # После удаления связи с жанрами уже обнулены (SET_NULL).
+    instance._stats_genre_ids = list(TitleGenre.objects.using(using).filter(
+        title_id=instance.pk, genre__isnull=False
+    ).values_list('genre_id', flat=True))
+
+
+@receiver(post_delete, sender=Title)
+def refresh_deleted_title_stats(sender, instance, using, **kwargs):
+    refresh_genre_stats(instance.__dict__.pop('_stats_genre_ids', ()), using)
+    if instance.category_id is not None:
+        refresh_category_stats([instance.category_id], using)
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def refresh_title_genre_stats(sender, instance, using, **kwargs):
+    if instance.genre_id is not None:
+        refresh_genre_stats([instance.genre_id], using)
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def refresh_changed_genre_stats(sender, instance, action, reverse, pk_set,
+                                using, **kwargs):
+    if reverse:
+        if action.startswith('post_'):
+            refresh_genre_stats([instance.pk], using)
+        return
+    if action == 'pre_clear':
+        instance._cleared_genre_ids = list(
+            instance.genre.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        refresh_genre_stats(
+            instance.__dict__.pop('_cleared_genre_ids', ()), using
+        )
+    elif action.startswith('post_'):
+        refresh_genre_stats(pk_set, using)
@@ -0,0 +1,139 @@
+"""Кэш соответствия слагов и id жанров и категорий.
+
+Жанров и категорий мало, и меняются они редко, а слаги разрешаются
+при каждой записи произведения и в фильтрах списка. Каждый процесс
+держит таблицы слагов в памяти и перечитывает их целиком, когда
+меняется версия в общем хранилище `core.cache.get_store()`. Версию
+сдвигают сигналы `content.signals` после фиксации записи жанров
+и категорий, так что изменения, сделанные другими процессами, видны
+не позже чем через `SLUG_CACHE_CHECK_INTERVAL` секунд.
+
+Если хранилище видно только своему процессу (`is_store_shared()`
+ложно), версии нет, и таблица перечитывается каждые
+`SLUG_CACHE_CHECK_INTERVAL` секунд. В обоих режимах неизвестный слаг
+перед отказом проверяется по свежей таблице: новый жанр или категория
+доступны сразу.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from core.cache import get_store, is_store_shared
+from .models import Category, Genre
+
+VERSION_PREFIX = 'content:slugs:'
+
+
+class SlugCache:
+    """Слаги и id объектов одной модели в памяти процесса."""
+
+    def __init__(self, model) -> None:
+        self.model = model
+        self.version_key = f'{VERSION_PREFIX}{model._meta.label_lower}'
+        self._ids = None
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get_version(self):
+        """Общая версия таблицы или None, если общего хранилища нет."""
+        if not is_store_shared():
+            return None
+        store = get_store()
+        version = store.get(self.version_key)
+        if version is None:
+            version = str(time.time_ns())
+            if not store.add(self.version_key, version):
+                version = store.get(self.version_key) or version
+        return version
+
+    def load(self, reload=False) -> dict:
+        """Прочитать таблицу слагов из БД, если кэш устарел.
+
+        С `reload=True` таблица перечитывается без проверки версии.
+        """
+        now = time.monotonic()
+        if (
+            not reload
+            and self._ids is not None
+            and now - self._checked < settings.SLUG_CACHE_CHECK_INTERVAL
+        ):
+            return self._ids
+        version = self.get_version()
+        with self._lock:
+            if (
+                reload
+                or self._ids is None
+                or version is None
+                or version != self._version
+            ):
+                ids = dict(self.model._default_manager.values_list(
+                    'slug', 'pk'
+                ))
+                if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+                    # Незафиксированные объекты не должны попасть в кэш.
+                    return ids
+                self._ids = ids
+                self._version = version
+            self._checked = now
+            return self._ids
+
+    def resolve(self, slugs, using=DEFAULT_DB_ALIAS) -> dict:
+        """Id объектов по слагам; неизвестных слагов в ответе нет."""
+        slugs = set(slugs)
+        if not slugs:
+            return {}
+        if using != DEFAULT_DB_ALIAS:
+            return dict(self.model._default_manager.using(using).filter(
+                slug__in=slugs
+            ).values_list('slug', 'pk'))
+        ids = self.load()
+        if not slugs <= ids.keys():
+            # Слаг мог появиться в другом процессе после загрузки.
+            ids = self.load(reload=True)
+        return {slug: ids[slug] for slug in slugs if slug in ids}
+
+    def search(self, value) -> list:
+        """Id объектов, в слаге которых есть `value` без учёта регистра."""
+        value = value.lower()
+        return [
+            pk for slug, pk in self.load().items() if value in slug.lower()
+        ]
+
+    def invalidate(self) -> None:
+        """Сдвинуть версию: все процессы перечитают таблицу."""
+        if is_store_shared():
+            get_store().set(self.version_key, str(time.time_ns()))
+        with self._lock:
+            self._ids = None
+
+
+genre_slugs = SlugCache(Genre)
+category_slugs = SlugCache(Category)
+
+
+def get_slug_cache(model) -> SlugCache:
+    for slug_cache in (genre_slugs, category_slugs):
+        if slug_cache.model is model:
+            return slug_cache
+    raise LookupError(f'Слаги модели {model.__name__} не кэшируются.')
+
+
+def warm_slug_caches() -> None:
+    """Загрузить слаги при старте процесса.
+
+    Вызывается из `wsgi.py` и `asgi.py`. Если БД ещё не создана или
+    недоступна, кэш загрузится при первом обращении.
+    """
+    try:
+        for slug_cache in (genre_slugs, category_slugs):
+            slug_cache.load()
+    except DatabaseError:
+        pass
+
+
+def invalidate_slug_caches() -> None:
+    for slug_cache in (genre_slugs, category_slugs):
+        slug_cache.invalidate()
@@ -0,0 +1,141 @@
+"""Агрегаты произведений по жанрам и категориям.
+
+Таблицы `GenreStats` и `CategoryStats` хранят количество произведений
+группы и сумму и количество оценок их отзывов. Оценки отзывов
+переносятся в агрегаты приращениями (`apply_rating_delta`) тем же
+UPDATE на F-выражениях, что и счётчики произведения. Изменения состава
+групп (создание и удаление произведений, смена категории и жанров)
+пересчитывают агрегаты затронутых групп одним UPDATE с подзапросами.
+`rebuild_stats` пересчитывает все агрегаты и создаёт недостающие строки.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import (
+    Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+)
+from django.db.models.functions import Coalesce
+
+from .models import (
+    Category,
+    CategoryStats,
+    Genre,
+    GenreStats,
+    Title,
+    TitleGenre,
+    rating_expression,
+)
+
+STATS_MODELS = {Genre: GenreStats, Category: CategoryStats}
+
+
+def aggregate(rows, expression):
+    return Coalesce(
+        Subquery(rows.annotate(total=expression).values('total')), Value(0)
+    )
+
+
+def refresh_group_stats(stats, rows, fields, ids, using) -> int:
+    """Пересчитать агрегаты групп.
+
+    `rows` - строки произведений группы с `OuterRef('pk')` на группу,
+    `fields` - пути к id, сумме и количеству оценок произведения.
+    """
+    title_field, sum_field, count_field = fields
+    queryset = stats.objects.using(using)
+    if ids is not None:
+        queryset = queryset.filter(pk__in=set(ids))
+    rating_sum = aggregate(rows, Sum(sum_field))
+    rating_count = aggregate(rows, Sum(count_field))
+    return queryset.update(
+        title_count=aggregate(rows, Count(title_field, distinct=True)),
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=rating_expression(rating_sum, rating_count),
+    )
+
+
+def refresh_genre_stats(genre_ids=None, using=DEFAULT_DB_ALIAS) -> int:
+    """Пересчитать агрегаты жанров, при `None` - всех.
+
+    Связь произведения с жанром может повторяться, поэтому суммируются
+    строки произведений жанра, а не строки связей: так каждое
+    произведение учитывается один раз, как и в `apply_rating_delta`.
+    """
+    rows = Title.objects.using(using).filter(
+        pk__in=TitleGenre.objects.using(using).filter(
+            genre=OuterRef(OuterRef('pk'))
+        ).values('title')
+    ).annotate(
+        # Все произведения жанра - одна группа без GROUP BY.
+        group=Value(1, output_field=IntegerField())
+    ).order_by().values('group')
+    return refresh_group_stats(
+        GenreStats, rows, ('pk', 'rating_sum', 'rating_count'),
+        genre_ids, using
+    )
+
+
+def refresh_category_stats(category_ids=None, using=DEFAULT_DB_ALIAS) -> int:
+    """Пересчитать агрегаты категорий, при `None` - всех."""
+    rows = Title.objects.using(using).filter(
+        category=OuterRef('pk')
+    ).order_by().values('category')
+    return refresh_group_stats(
+        CategoryStats, rows, ('pk', 'rating_sum', 'rating_count'),
+        category_ids, using
+    )
+
+
+def refresh_title_stats(title_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Пересчитать агрегаты текущих жанров и категорий произведений."""
+    refresh_genre_stats(TitleGenre.objects.using(using).filter(
+        title_id__in=title_ids, genre__isnull=False
+    ).values_list('genre_id', flat=True), using)
+    refresh_category_stats(Title.objects.using(using).filter(
+        pk__in=title_ids, category__isnull=False
+    ).values_list('category_id', flat=True), using)
+
+
+def apply_rating_delta(title_id, score_delta, count_delta,
+                       using=DEFAULT_DB_ALIAS) -> None:
+    """Перенести изменение оценок произведения в агрегаты его групп."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    changes = {
+        'rating_sum': new_sum,
+        'rating_count': new_count,
+        'rating': rating_expression(new_sum, new_count),
+    }
+    GenreStats.objects.using(using).filter(
+        pk__in=TitleGenre.objects.using(using).filter(
+            title_id=title_id
+        ).values('genre_id')
+    ).update(**changes)
+    CategoryStats.objects.using(using).filter(
+        pk__in=Title.objects.using(using).filter(
+            pk=title_id
+        ).values('category_id')
+    ).update(**changes)
+
+
+def create_stats(group, group_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Создать пустые агрегаты для новых жанров или категорий."""
+    stats = STATS_MODELS[group]
+    stats.objects.using(using).bulk_create(
+        [stats(pk=pk) for pk in group_ids], ignore_conflicts=True
+    )
+
+
+def create_missing_stats(using=DEFAULT_DB_ALIAS) -> None:
+    for group in STATS_MODELS:
+        create_stats(group, group.objects.using(using).filter(
+            stats__isnull=True
+        ).values_list('pk', flat=True), using)
+
+
+def rebuild_stats(using=DEFAULT_DB_ALIAS) -> dict:
+    """Пересчитать все агрегаты, например после импорта данных."""
+    create_missing_stats(using)
+    return {
+        'genres': refresh_genre_stats(using=using),
+        'categories': refresh_category_stats(using=using),
+    }
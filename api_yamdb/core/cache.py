@@ -0,0 +1,108 @@
+"""Общее key-value хранилище для кэшей проекта.
+
+При `REDIS_ENABLED = True` данные хранятся в Redis через
+`users.services.redis_config.redis_client`, иначе - в кэше Django
+из настройки `CACHES` (по умолчанию local-memory).
+Значения - строки, поэтому оба бэкенда взаимозаменяемы.
+
+Кэш local-memory виден только своему процессу. Данные, которые
+должны видеть все процессы (версии авторизации, версии кэшей),
+доверяются хранилищу, только если `is_store_shared()`.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+class DjangoCacheStore:
+    """Хранилище поверх кэша Django."""
+
+    def __init__(self, backend) -> None:
+        self._cache = backend
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def get_many(self, keys):
+        values = self._cache.get_many(keys)
+        return [values.get(key) for key in keys]
+
+    def set(self, key, value, timeout=None) -> None:
+        self._cache.set(key, value, timeout)
+
+    def add(self, key, value, timeout=None) -> bool:
+        return self._cache.add(key, value, timeout)
+
+    def delete(self, key) -> None:
+        self._cache.delete(key)
+
+
+class RedisStore:
+    """Хранилище поверх клиента Redis.
+
+    Ошибки Redis не пробрасываются: кэш не должен ломать API,
+    поэтому чтение возвращает промах, а запись пропускается.
+    """
+
+    def __init__(self, client) -> None:
+        self._redis = client
+
+    def get(self, key):
+        try:
+            return self._redis.get(key)
+        except RedisError as error:
+            logger.warning('Redis get failed: %s', error)
+            return None
+
+    def get_many(self, keys):
+        try:
+            return self._redis.mget(keys)
+        except RedisError as error:
+            logger.warning('Redis mget failed: %s', error)
+            return [None] * len(keys)
+
+    def set(self, key, value, timeout=None) -> None:
+        try:
+            self._redis.set(key, value, ex=timeout)
+        except RedisError as error:
+            logger.warning('Redis set failed: %s', error)
+
+    def add(self, key, value, timeout=None) -> bool:
+        try:
+            return bool(self._redis.set(key, value, ex=timeout, nx=True))
+        except RedisError as error:
+            logger.warning('Redis set failed: %s', error)
+            return False
+
+    def delete(self, key) -> None:
+        try:
+            self._redis.delete(key)
+        except RedisError as error:
+            logger.warning('Redis delete failed: %s', error)
+
+
+def get_store():
+    """Хранилище, выбранное настройкой `REDIS_ENABLED`."""
+    if getattr(settings, 'REDIS_ENABLED', False):
+        from users.services.redis_config import redis_client
+        return RedisStore(redis_client)
+    return DjangoCacheStore(cache)
+
+
+def is_store_shared() -> bool:
+    """Видят ли записи `get_store()` другие процессы."""
+    if getattr(settings, 'REDIS_ENABLED', False):
+        return True
+    return (
+        settings.CACHES['default']['BACKEND']
+        not in PROCESS_LOCAL_CACHE_BACKENDS
+    )
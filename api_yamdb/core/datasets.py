@@ -0,0 +1,127 @@
+"""Описание CSV-наборов данных из static/data.
+
+Порядок DATASETS учитывает зависимости внешних ключей: каждая таблица
+загружается после тех, на которые она ссылается. Заголовки CSV
+совпадают с именами колонок моделей (`category_id`, `author_id`, ...).
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections
+from django.db.models import Model
+
+from content.models import Category, Genre, Title, TitleGenre
+from reviews.models import Comment, Review
+from users.models import User
+
+CSV_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+class Dataset(NamedTuple):
+    """CSV-файл, модель и колонки файла в порядке выгрузки."""
+
+    file_name: str
+    model: type
+    columns: tuple
+
+    def get_fields(self, columns):
+        """Поля модели для колонок CSV в порядке заголовка."""
+        fields = {
+            field.attname: field for field in self.model._meta.concrete_fields
+        }
+        unknown = [column for column in columns if column not in fields]
+        if unknown:
+            raise ValueError(
+                f'{self.file_name}: неизвестные колонки {", ".join(unknown)}'
+            )
+        return [fields[column] for column in columns]
+
+    def parse_row(self, fields, values) -> dict:
+        """Значения строки CSV, приведённые к типам полей."""
+        return {
+            field.attname: parse_value(field, value)
+            for field, value in zip(fields, values)
+        }
+
+    def build_object(self, data) -> Model:
+        """Экземпляр модели из разобранной строки CSV."""
+        if self.model is User:
+            data.setdefault('password', make_password(None))
+        return self.model(**data)
+
+
+DATASETS = (
+    Dataset(
+        'users.csv', User,
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name')
+    ),
+    Dataset('category.csv', Category, ('id', 'name', 'slug')),
+    Dataset('genre.csv', Genre, ('id', 'name', 'slug')),
+    Dataset('titles.csv', Title, ('id', 'name', 'year', 'category_id')),
+    Dataset('genre_title.csv', TitleGenre, ('id', 'title_id', 'genre_id')),
+    Dataset(
+        'review.csv', Review,
+        ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date')
+    ),
+    Dataset(
+        'comments.csv', Comment,
+        ('id', 'review_id', 'text', 'author_id', 'pub_date')
+    ),
+)
+
+
+def get_dataset(file_name) -> Dataset:
+    """Набор данных по имени файла."""
+    for dataset in DATASETS:
+        if dataset.file_name == file_name:
+            return dataset
+    raise ValueError(f'Неизвестный файл {file_name}')
+
+
+def parse_value(field, value):
+    """Значение из CSV в тип поля; пустая строка - NULL для null-полей."""
+    if value == '' and field.null:
+        return None
+    return field.to_python(value)
+
+
+def format_value(value):
+    """Значение поля в формате файлов static/data."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc)
+        return value.isoformat(timespec='milliseconds').replace(
+            '+00:00', 'Z'
+        )
+    return value
+
+
+@contextmanager
+def preserve_auto_dates(model):
+    """Отключить auto_now/auto_now_add, чтобы сохранить даты из файла."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def reset_sequences(models, using='default') -> None:
+    """Сдвинуть счётчики первичных ключей после вставки явных id."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
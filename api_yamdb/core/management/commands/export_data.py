@@ -0,0 +1,99 @@
+import csv
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+from core.datasets import DATASETS, format_value
+
+CSV_FORMAT = 'csv'
+NDJSON_FORMAT = 'ndjson'
+DEFAULT_CHUNK_SIZE = 2000
+
+FORMATTER = '%(asctime)s — %(levelname)s — %(message)s'
+
+logging.basicConfig(level=logging.INFO, format=FORMATTER)
+
+
+class Command(BaseCommand):
+    """Команда потоковой выгрузки данных в CSV или NDJSON"""
+
+    help = (
+        'Выгружает таблицы в формате файлов static/data (CSV) или NDJSON, '
+        'читая их серверным курсором порциями по --chunk-size строк.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', type=Path, default=Path('export'),
+            help='Каталог для файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--format', choices=(CSV_FORMAT, NDJSON_FORMAT),
+            default=CSV_FORMAT, help='Формат файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из БД за один раз.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных из DATABASES.'
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        output_dir.mkdir(parents=True, exist_ok=True)
+        export_format = options['format']
+        for dataset in DATASETS:
+            path = output_dir / (
+                Path(dataset.file_name).stem + '.' + export_format
+            )
+            started = time.perf_counter()
+            rows = self.export_dataset(
+                dataset, path, export_format,
+                options['chunk_size'], options['database']
+            )
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            logging.info(
+                f'Таблица {dataset.model._meta.db_table} выгружена в '
+                f'{path} — {rows} строк за {elapsed:.2f} с '
+                f'({rows / elapsed:.0f} строк/с)'
+            )
+
+    def export_dataset(self, dataset, path, export_format, chunk_size,
+                       using):
+        """Выгрузить таблицу построчно во временный файл и переименовать.
+
+        Неполный файл не заменит снимок предыдущей выгрузки.
+        """
+        rows = dataset.model._default_manager.using(using).order_by(
+            'pk'
+        ).values_list(*dataset.columns).iterator(chunk_size=chunk_size)
+        partial = path.with_name(path.name + '.part')
+        count = 0
+        with open(partial, 'w', newline='', encoding='utf-8') as file:
+            if export_format == CSV_FORMAT:
+                writer = csv.writer(file)
+                writer.writerow(dataset.columns)
+                for row in rows:
+                    writer.writerow([format_value(value) for value in row])
+                    count += 1
+            else:
+                for row in rows:
+                    record = dict(zip(
+                        dataset.columns,
+                        (format_value(value) for value in row)
+                    ))
+                    file.write(json.dumps(
+                        record, cls=DjangoJSONEncoder, ensure_ascii=False
+                    ))
+                    file.write('\n')
+                    count += 1
+        os.replace(partial, path)
+        return count
@@ -1,19 +1,27 @@
-from django.core.management.base import BaseCommand
-import sqlite3
-import pandas as pd
-import os
+import csv
 import logging
+import os
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
 
-CSV_DIR = 'static/data'
-CSV_TO_TABLE = [
-    ('genre.csv', 'content_genre'),
-    ('category.csv', 'content_category'),
-    ('genre_title.csv', 'content_titlegenre'),
-    ('titles.csv', 'content_title'),
-    ('comments.csv', 'reviews_comment'),
-    ('review.csv', 'reviews_review'),
-    ('users.csv', 'users_user'),
-]
+from api.cache import invalidate_all
+from content.models import Title
+from content.slugs import invalidate_slug_caches
+from content.stats import rebuild_stats
+from core.datasets import (
+    CSV_DIR, DATASETS, preserve_auto_dates, reset_sequences
+)
+from core.models import ImportCheckpoint
+from core.parallel_import import ParallelImporter
+from leaderboards.boards import rebuild_leaderboards
+from search.indexing import rebuild_index
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
 
 FORMATTER = '%(asctime)s — %(levelname)s — %(message)s'
 
@@ -21,16 +29,114 @@ logging.basicConfig(level=logging.INFO, format=FORMATTER)
 
 
 class Command(BaseCommand):
-    """Команда импорта CSV файлов"""
+    """Команда потокового импорта CSV файлов через ORM"""
+
+    help = (
+        'Построчно читает CSV из static/data и загружает их через '
+        'bulk_create, по одной транзакции на таблицу.'
+    )
 
-    def handle(self, *args, **kwargs):
-        conn = sqlite3.connect('db.sqlite3')
-        for csv_file, table in CSV_TO_TABLE:
-            df = pd.read_csv(os.path.join(CSV_DIR, csv_file), delimiter=',')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном bulk_create.'
+        )
+        parser.add_argument(
+            '--data-dir', type=Path, default=CSV_DIR,
+            help='Каталог с CSV файлами.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных из DATABASES.'
+        )
+        parser.add_argument(
+            '--parallel', action='store_true',
+            help=(
+                'Делить файлы на фрагменты, разбирать их в пуле процессов '
+                'и продолжать прерванный импорт с места остановки.'
+            )
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов для режима --parallel.'
+        )
+        parser.add_argument(
+            '--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES,
+            help='Примерный размер фрагмента файла в режиме --parallel.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Забыть отметки прошлых запусков режима --parallel.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        parallel = None
+        if options['parallel']:
+            parallel = ParallelImporter(
+                workers=options['workers'],
+                chunk_bytes=options['chunk_bytes'],
+                batch_size=options['batch_size'],
+                using=using,
+            )
+            if options['restart']:
+                ImportCheckpoint.objects.using(using).all().delete()
+        loaded = []
+        for dataset in DATASETS:
+            path = options['data_dir'] / dataset.file_name
+            if not path.exists():
+                logging.warning(f'Файл {path} не найден, пропускаем')
+                continue
+            started = time.perf_counter()
             try:
-                df.to_sql(table, con=conn, if_exists='append', index=False)
-                logging.info(f'Файл {csv_file} загружен в таблицу: {table}')
-            except sqlite3.IntegrityError as err:
-                logging.error(err)
-        conn.commit()
-        conn.close()
+                if parallel:
+                    rows, skipped = parallel.import_dataset(dataset, path)
+                    if skipped:
+                        logging.info(
+                            f'Файл {dataset.file_name}: пропущено уже '
+                            f'загруженных фрагментов: {skipped}'
+                        )
+                else:
+                    rows = self.import_dataset(
+                        dataset, path, options['batch_size'], using
+                    )
+            except (DatabaseError, ValidationError, ValueError) as err:
+                logging.error(f'Файл {dataset.file_name} не загружен: {err}')
+                continue
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            loaded.append(dataset.model)
+            logging.info(
+                f'Файл {dataset.file_name} загружен в таблицу: '
+                f'{dataset.model._meta.db_table} — {rows} строк за '
+                f'{elapsed:.2f} с ({rows / elapsed:.0f} строк/с)'
+            )
+        reset_sequences(loaded, using)
+        Title.objects.using(using).rebuild_ratings()
+        rebuild_stats(using)
+        rebuild_leaderboards(using)
+        rebuild_index(using)
+        invalidate_slug_caches()
+        invalidate_all()
+
+    def import_dataset(self, dataset, path, batch_size, using):
+        """Загрузить один файл пачками в одной транзакции."""
+        manager = dataset.model._default_manager.db_manager(using)
+        rows = 0
+        with open(path, newline='', encoding='utf-8') as csv_file:
+            reader = csv.reader(csv_file)
+            fields = dataset.get_fields(next(reader))
+            with transaction.atomic(using=using), \
+                    preserve_auto_dates(dataset.model):
+                batch = []
+                for values in reader:
+                    batch.append(dataset.build_object(
+                        dataset.parse_row(fields, values)
+                    ))
+                    if len(batch) >= batch_size:
+                        manager.bulk_create(batch, batch_size=batch_size)
+                        rows += len(batch)
+                        batch = []
+                if batch:
+                    manager.bulk_create(batch, batch_size=batch_size)
+                    rows += len(batch)
+        return rows
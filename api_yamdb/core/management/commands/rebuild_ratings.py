@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from content.models import Title
+
+
+class Command(BaseCommand):
+    """Команда пересчёта счётчиков рейтинга произведений"""
+
+    help = 'Пересчитывает rating_sum, rating_count и rating по отзывам.'
+
+    def handle(self, *args, **kwargs):
+        updated = Title.objects.all().rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитан рейтинг произведений: {updated}'
+        ))
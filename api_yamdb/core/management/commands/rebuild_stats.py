@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from content.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    """Команда пересчёта агрегатов жанров и категорий"""
+
+    help = (
+        'Пересчитывает количество произведений и рейтинг жанров '
+        'и категорий по произведениям и отзывам.'
+    )
+
+    def handle(self, *args, **kwargs):
+        updated = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитана статистика жанров: {updated["genres"]}, '
+            f'категорий: {updated["categories"]}'
+        ))
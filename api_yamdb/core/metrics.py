@@ -0,0 +1,209 @@
+"""Метрики обработки запросов.
+
+Для выбранных запросов `core.middleware.RequestMetricsMiddleware`
+собирает число и время SQL-запросов, время представления, время
+рендеринга ответа и общее время. Метрики накапливаются в гистограммах
+по маршрутам в памяти процесса, откуда их читает эндпоинт
+`/api/v1/metrics/`, а при `REQUEST_METRICS_SERVER_TIMING` ещё и
+отдаются клиенту в заголовке `Server-Timing`.
+
+Метрики текущего запроса лежат в contextvar `current_metrics`.
+SQL-запросы учитывает обёртка `record_query`, установленная в каждое
+подключение к БД: `sync_to_async` копирует контекст в потоки, поэтому
+учитываются и запросы асинхронных представлений из пула
+`api.async_views.db_executor`.
+"""
+import bisect
+import contextvars
+import threading
+import time
+
+DURATION_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+QUANTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+
+current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+def to_ms(seconds) -> float:
+    return seconds * 1000
+
+
+class RequestMetrics:
+    """Метрики одного запроса."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        # Запросы одного асинхронного запроса идут из нескольких потоков.
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_started = None
+        self.view_finished = None
+        self.rendered = None
+        self.finished = None
+        self.action = None
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """Обёртка `execute_wrapper`, считающая запросы и их время."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.db_time += duration
+
+    def mark_rendered(self, response) -> None:
+        """Колбэк `add_post_render_callback`: ответ отрендерен."""
+        self.rendered = time.perf_counter()
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+        if self.view_started is not None and self.view_finished is None:
+            # Ответ без отложенного рендеринга готов вместе с представлением.
+            self.view_finished = self.finished
+
+    @property
+    def view_time(self) -> float:
+        if self.view_started is None:
+            return 0.0
+        return self.view_finished - self.view_started
+
+    @property
+    def render_time(self) -> float:
+        if self.view_finished is None or self.rendered is None:
+            return 0.0
+        return self.rendered - self.view_finished
+
+    @property
+    def total_time(self) -> float:
+        return self.finished - self.started
+
+    def as_observation(self) -> dict:
+        return {
+            'total_ms': to_ms(self.total_time),
+            'view_ms': to_ms(self.view_time),
+            'db_ms': to_ms(self.db_time),
+            'render_ms': to_ms(self.render_time),
+            'queries': self.queries,
+        }
+
+    def server_timing(self) -> str:
+        """Значение заголовка `Server-Timing`."""
+        return ', '.join((
+            f'db;dur={to_ms(self.db_time):.1f};desc="{self.queries} queries"',
+            f'view;dur={to_ms(self.view_time):.1f}',
+            f'render;dur={to_ms(self.render_time):.1f}',
+            f'total;dur={to_ms(self.total_time):.1f}',
+        ))
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка подключений, учитывающая запрос в метриках контекста."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.sql_wrapper(execute, sql, params, many, context)
+
+
+def instrument_connection(sender, connection, **kwargs) -> None:
+    """Установить `record_query` в новое подключение к БД.
+
+    Обёртка ставится первой: `execute_wrapper()` снимает при выходе
+    последнюю обёртку списка.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class Histogram:
+    """Гистограмма с фиксированными верхними границами корзин.
+
+    Квантили оцениваются верхней границей корзины, в которую они
+    попадают; для последней корзины - наибольшим значением.
+    """
+
+    def __init__(self, bounds) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, quantile) -> float:
+        rank = quantile * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                return self.max
+        return 0.0
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = []
+        for bound, count in zip((*self.bounds, '+Inf'), self.counts):
+            cumulative += count
+            buckets.append([bound, cumulative])
+        snapshot = {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.count, 3) if self.count else 0.0,
+            'max': round(self.max, 3),
+        }
+        for name, quantile in QUANTILES:
+            snapshot[name] = round(self.quantile(quantile), 3)
+        snapshot['buckets'] = buckets
+        return snapshot
+
+
+class MetricsRegistry:
+    """Гистограммы метрик по маршрутам."""
+
+    def __init__(self) -> None:
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_histograms() -> dict:
+        histograms = {
+            name: Histogram(DURATION_BUCKETS_MS)
+            for name in ('total_ms', 'view_ms', 'db_ms', 'render_ms')
+        }
+        histograms['queries'] = Histogram(QUERY_COUNT_BUCKETS)
+        return histograms
+
+    def observe(self, route, metrics: RequestMetrics) -> None:
+        with self._lock:
+            histograms = self._routes.get(route)
+            if histograms is None:
+                histograms = self._routes[route] = self.create_histograms()
+            for name, value in metrics.as_observation().items():
+                histograms[name].observe(value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    name: histogram.snapshot()
+                    for name, histogram in histograms.items()
+                }
+                for route, histograms in sorted(self._routes.items())
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+registry = MetricsRegistry()
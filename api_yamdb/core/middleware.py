@@ -0,0 +1,114 @@
+"""Мидлварь метрик запросов, см. `core.metrics`."""
+import asyncio
+import random
+import time
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+
+from .metrics import RequestMetrics, current_metrics, registry
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+
+def get_route(request, metrics):
+    """Имя маршрута и действие, например `titles-list:list`."""
+    match = request.resolver_match
+    if match is None:
+        return None
+    name = match.url_name or match.route
+    return f'{name}:{metrics.action or request.method.lower()}'
+
+
+def is_sampled() -> bool:
+    sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+    return bool(sample_rate) and random.random() < sample_rate
+
+
+class RequestMetricsMiddleware:
+    """Метрики SQL, сериализации и представления для доли запросов.
+
+    Доля задаётся настройкой `REQUEST_METRICS_SAMPLE_RATE` (от 0 до 1).
+    Запросы вне выборки проходят без изменений, поэтому при нулевой доле
+    мидлварь почти ничего не стоит. Заголовок `Server-Timing` раскрывает
+    число и время SQL-запросов, поэтому добавляется только при
+    `REQUEST_METRICS_SERVER_TIMING`.
+
+    Работает и в синхронном, и в асинхронном режиме: под ASGI запрос
+    и хуки представления остаются в цикле событий, без перехода
+    в поток `sync_to_async`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+            self.process_template_response = (
+                self.aprocess_template_response
+            )
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not is_sampled():
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, metrics, response)
+
+    async def __acall__(self, request):
+        if not is_sampled():
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, metrics, response)
+
+    @staticmethod
+    def finish(request, metrics, response):
+        metrics.finish()
+        route = get_route(request, metrics)
+        if route is not None:
+            registry.observe(route, metrics)
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response[SERVER_TIMING_HEADER] = metrics.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            # Вьюсеты DRF знают действие для каждого метода.
+            actions = getattr(view_func, 'actions', None) or {}
+            metrics.action = actions.get(request.method.lower())
+            metrics.view_started = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            # Ответы DRF рендерятся после этого шага, вне представления.
+            metrics.view_finished = time.perf_counter()
+            response.add_post_render_callback(metrics.mark_rendered)
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        return RequestMetricsMiddleware.process_view(
+            self, request, view_func, view_args, view_kwargs
+        )
+
+    async def aprocess_template_response(self, request, response):
+        return RequestMetricsMiddleware.process_template_response(
+            self, request, response
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-18 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Файл')),
+                ('signature', models.CharField(help_text='Размер и время изменения файла.', max_length=64, verbose_name='Версия файла')),
+                ('start', models.PositiveBigIntegerField(verbose_name='Начало фрагмента')),
+                ('end', models.PositiveBigIntegerField(verbose_name='Конец фрагмента')),
+                ('rows', models.PositiveIntegerField(verbose_name='Строк')),
+                ('completed_at', models.DateTimeField(auto_now_add=True, verbose_name='Загружен')),
+            ],
+            options={
+                'verbose_name': 'Фрагмент импорта',
+                'verbose_name_plural': 'Фрагменты импорта',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importcheckpoint',
+            constraint=models.UniqueConstraint(fields=('file_name', 'signature', 'start'), name='unique_import_checkpoint'),
+        ),
+    ]
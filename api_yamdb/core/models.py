@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class ImportCheckpoint(models.Model):
+    """Загруженный фрагмент CSV файла при параллельном импорте.
+
+    Фрагмент - диапазон байт `[start, end)` файла. Отметка создаётся в
+    той же транзакции, что и строки фрагмента, поэтому повторный запуск
+    пропускает ровно те фрагменты, которые уже в базе.
+    """
+    file_name = models.CharField('Файл', max_length=255)
+    signature = models.CharField(
+        'Версия файла',
+        max_length=64,
+        help_text='Размер и время изменения файла.'
+    )
+    start = models.PositiveBigIntegerField('Начало фрагмента')
+    end = models.PositiveBigIntegerField('Конец фрагмента')
+    rows = models.PositiveIntegerField('Строк')
+    completed_at = models.DateTimeField('Загружен', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Фрагмент импорта'
+        verbose_name_plural = 'Фрагменты импорта'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('file_name', 'signature', 'start'),
+                name='unique_import_checkpoint'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.file_name} [{self.start}, {self.end})'
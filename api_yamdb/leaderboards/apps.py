@@ -0,0 +1,14 @@
+"""Конфигурация приложения рейтингов произведений."""
+
+from django.apps import AppConfig
+
+
+class LeaderboardsConfig(AppConfig):
+    """Конфигурация приложения рейтингов."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'leaderboards'
+
+    def ready(self) -> None:
+        """Подключение сигналов приложения."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,215 @@
+"""Рейтинги лучших и популярных произведений.
+
+Лучшие произведения ранжируются по байесовской оценке
+`(C * m + сумма оценок) / (C + количество оценок)`: произведение
+считается имеющим ещё `C` отзывов со средней оценкой `m`
+(`LEADERBOARD_PRIOR_WEIGHT` и `LEADERBOARD_PRIOR_MEAN`), поэтому
+единственный отзыв с оценкой 10 не выводит произведение на первое
+место. Каждое произведение хранится в `LeaderboardEntry` в общем
+рейтинге, рейтинге своего года, категории и каждого жанра; запись
+отзыва обновляет оценку во всех его рейтингах одним UPDATE.
+
+Популярные произведения считаются по `TitleActivity` - количеству
+отзывов за последние дни. При отложенном пересчёте рейтинга
+(`reviews.pending`) оценки и активность пересчитываются для всей пачки
+произведений.
+"""
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from content.models import Title, TitleGenre
+from reviews.models import Review
+from .constants import MAX_TRENDING_DAYS, OVERALL_BOARD, SYNC_CHUNK_SIZE
+from .models import LeaderboardEntry, TitleActivity
+
+
+def genre_board(genre_id) -> str:
+    return f'genre:{genre_id}'
+
+
+def category_board(category_id) -> str:
+    return f'category:{category_id}'
+
+
+def year_board(year) -> str:
+    return f'year:{year}'
+
+
+def bayesian_score(rating_sum, rating_count) -> float:
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return (
+        (weight * settings.LEADERBOARD_PRIOR_MEAN + rating_sum)
+        / (weight + rating_count)
+    )
+
+
+def bayesian_expression(rating_sum, rating_count):
+    """`bayesian_score` как выражение для UPDATE."""
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return (
+        (Value(weight * settings.LEADERBOARD_PRIOR_MEAN) + rating_sum)
+        / (Value(float(weight)) + rating_count)
+    )
+
+
+def get_boards(title, genre_ids) -> list:
+    boards = [OVERALL_BOARD, year_board(title.year)]
+    if title.category_id is not None:
+        boards.append(category_board(title.category_id))
+    boards.extend(genre_board(genre_id) for genre_id in set(genre_ids))
+    return boards
+
+
+def sync_titles(title_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Заново разместить произведения во всех их рейтингах.
+
+    Нужна при создании произведения и при смене его года, категории
+    или жанров.
+    """
+    title_ids = list(title_ids)
+    titles = Title.objects.using(using).filter(pk__in=title_ids).only(
+        'year', 'category_id', 'rating_sum', 'rating_count'
+    )
+    genres = defaultdict(list)
+    for title_id, genre_id in TitleGenre.objects.using(using).filter(
+        title_id__in=title_ids, genre__isnull=False
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    entries = [
+        LeaderboardEntry(
+            board=board, title_id=title.pk,
+            score=bayesian_score(title.rating_sum, title.rating_count)
+        )
+        for title in titles
+        for board in get_boards(title, genres[title.pk])
+    ]
+    with transaction.atomic(using=using):
+        LeaderboardEntry.objects.using(using).filter(
+            title_id__in=title_ids
+        ).delete()
+        LeaderboardEntry.objects.using(using).bulk_create(
+            entries, batch_size=SYNC_CHUNK_SIZE
+        )
+
+
+def remove_board(board, using=DEFAULT_DB_ALIAS) -> None:
+    LeaderboardEntry.objects.using(using).filter(board=board).delete()
+
+
+def update_scores(title_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Пересчитать оценки произведений по их счётчикам рейтинга."""
+    title = Title.objects.using(using).filter(pk=OuterRef('title_id'))
+    LeaderboardEntry.objects.using(using).filter(
+        title_id__in=title_ids
+    ).update(
+        score=Subquery(title.values(score=bayesian_expression(
+            F('rating_sum'), F('rating_count')
+        ))[:1])
+    )
+
+
+def prune_activity(using=DEFAULT_DB_ALIAS) -> int:
+    """Удалить активность старше `MAX_TRENDING_DAYS` дней."""
+    since = timezone.localdate() - datetime.timedelta(days=MAX_TRENDING_DAYS)
+    deleted, _ = TitleActivity.objects.using(using).filter(
+        day__lt=since
+    ).delete()
+    return deleted
+
+
+def record_activity(title_id, day, score_delta, count_delta,
+                    using=DEFAULT_DB_ALIAS) -> None:
+    """Учесть изменение отзывов произведения за день.
+
+    Строка дня создаётся только новым отзывом: при каскадном удалении
+    произведения его отзывы удаляются позже выборки его активности,
+    и созданная строка ссылалась бы на удалённое произведение.
+    При создании строки удаляются дни, вышедшие за `MAX_TRENDING_DAYS`.
+    """
+    if not score_delta and not count_delta:
+        return
+    activity = TitleActivity.objects.using(using).filter(
+        title_id=title_id, day=day
+    )
+    changes = {
+        'review_count': F('review_count') + count_delta,
+        'score_sum': F('score_sum') + score_delta,
+    }
+    if activity.update(**changes) or count_delta <= 0:
+        return
+    TitleActivity.objects.using(using).bulk_create(
+        [TitleActivity(title_id=title_id, day=day)], ignore_conflicts=True
+    )
+    activity.update(**changes)
+    prune_activity(using)
+
+
+def top_titles(board, limit, using=DEFAULT_DB_ALIAS) -> list:
+    """Id и оценки первых `limit` произведений рейтинга."""
+    return list(LeaderboardEntry.objects.using(using).filter(
+        board=board
+    ).order_by('-score', 'title_id').values_list(
+        'title_id', 'score'
+    )[:limit])
+
+
+def trending_titles(days, limit, using=DEFAULT_DB_ALIAS) -> list:
+    """Произведения с наибольшим числом отзывов за последние `days` дней.
+
+    Возвращает id, количество отзывов и их среднюю оценку за этот срок.
+    """
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    rows = TitleActivity.objects.using(using).filter(
+        day__gte=since
+    ).values('title_id').annotate(
+        reviews=Sum('review_count'), score_sum=Sum('score_sum')
+    ).filter(reviews__gt=0).order_by(
+        '-reviews', '-score_sum', 'title_id'
+    ).values_list('title_id', 'reviews', 'score_sum')[:limit]
+    return [
+        (title_id, reviews, score_sum / reviews)
+        for title_id, reviews, score_sum in rows
+    ]
+
+
+def rebuild_activity(title_ids=None, using=DEFAULT_DB_ALIAS) -> int:
+    """Пересчитать активность произведений по отзывам, при `None` - всех."""
+    since = timezone.now() - datetime.timedelta(days=MAX_TRENDING_DAYS)
+    reviews = Review.objects.using(using).filter(pub_date__gte=since)
+    activity = TitleActivity.objects.using(using).all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+        activity = activity.filter(title_id__in=title_ids)
+    rows = reviews.annotate(day=TruncDate('pub_date')).values(
+        'title_id', 'day'
+    ).annotate(
+        review_count=Count('pk'), score_sum=Sum('score')
+    ).order_by()
+    rows = [TitleActivity(**row) for row in rows]
+    activity.delete()
+    if title_ids is not None:
+        prune_activity(using)
+    TitleActivity.objects.using(using).bulk_create(
+        rows, batch_size=SYNC_CHUNK_SIZE
+    )
+    return len(rows)
+
+
+def rebuild_leaderboards(using=DEFAULT_DB_ALIAS) -> dict:
+    """Построить рейтинги и активность заново, например после импорта."""
+    LeaderboardEntry.objects.using(using).all().delete()
+    title_ids = list(Title.objects.using(using).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+    for start in range(0, len(title_ids), SYNC_CHUNK_SIZE):
+        sync_titles(title_ids[start:start + SYNC_CHUNK_SIZE], using)
+    return {
+        'titles': len(title_ids),
+        'activity': rebuild_activity(using=using),
+    }
@@ -0,0 +1,11 @@
+BOARD_MAX_LENGTH = 32
+OVERALL_BOARD = 'all'
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+DEFAULT_TRENDING_DAYS = 7
+# Активность старше этого срока не хранится.
+MAX_TRENDING_DAYS = 90
+
+SYNC_CHUNK_SIZE = 1000
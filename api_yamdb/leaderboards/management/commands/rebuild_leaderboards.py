@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from leaderboards.boards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    """Команда перестроения рейтингов произведений"""
+
+    help = (
+        'Заново строит рейтинги лучших произведений и активность '
+        'для популярных. Нужна после загрузки данных в обход сигналов '
+        'и после смены параметров LEADERBOARD_PRIOR_*.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных из DATABASES.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            totals = rebuild_leaderboards(using)
+        self.stdout.write(self.style.SUCCESS(
+            f'Произведений в рейтингах: {totals["titles"]}, '
+            f'дней активности: {totals["activity"]}'
+        ))
@@ -0,0 +1,59 @@
+# Generated by Django 3.2 on 2026-10-18 05:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('content', '0008_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('review_count', models.IntegerField(default=0, verbose_name='Количество отзывов')),
+                ('score_sum', models.IntegerField(default=0, verbose_name='Сумма оценок')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='content.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Активность произведения',
+                'verbose_name_plural': 'Активность произведений',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=32, verbose_name='Рейтинг')),
+                ('score', models.FloatField(verbose_name='Взвешенная оценка')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='content.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleactivity',
+            index=models.Index(fields=['day'], name='title_activity_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleactivity',
+            constraint=models.UniqueConstraint(fields=('title', 'day'), name='unique_title_activity'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', '-score', 'title'], name='leaderboard_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'title'), name='unique_leaderboard_entry'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+"""Модели рейтингов произведений."""
+
+from django.db import models
+
+from content.models import Title
+from .constants import BOARD_MAX_LENGTH
+
+
+class LeaderboardEntry(models.Model):
+    """Произведение в рейтинге: общем, жанра, категории или года.
+
+    Индекс по рейтингу и убыванию оценки отдаёт первые K произведений
+    чтением K строк индекса, без сортировки всей таблицы.
+    """
+
+    board = models.CharField('Рейтинг', max_length=BOARD_MAX_LENGTH)
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries'
+    )
+    score = models.FloatField('Взвешенная оценка')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('board', 'title'), name='unique_leaderboard_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=('board', '-score', 'title'),
+                name='leaderboard_top_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.board}: {self.title_id}'
+
+
+class TitleActivity(models.Model):
+    """Количество и сумма оценок отзывов произведения за день."""
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='activity'
+    )
+    day = models.DateField('День')
+    review_count = models.IntegerField('Количество отзывов', default=0)
+    score_sum = models.IntegerField('Сумма оценок', default=0)
+
+    class Meta:
+        verbose_name = 'Активность произведения'
+        verbose_name_plural = 'Активность произведений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'day'), name='unique_title_activity'
+            )
+        ]
+        indexes = [
+            models.Index(fields=('day',), name='title_activity_day_idx')
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.title_id} {self.day}: {self.review_count}'
@@ -0,0 +1,88 @@
+"""Сигналы приложения рейтингов.
+
+Размещают произведения в рейтингах при изменении их года, категории
+и жанров и обновляют оценки и активность при записи отзывов.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from content.models import Category, Genre, Title, TitleGenre
+from content.signals import titles_bulk_changed
+from reviews.models import Review
+from reviews.pending import ratings_recomputed
+from reviews.signals import rating_changed
+from .boards import (
+    category_board,
+    genre_board,
+    rebuild_activity,
+    record_activity,
+    remove_board,
+    sync_titles,
+    update_scores,
+)
+
+
+@receiver(post_save, sender=Title)
+def sync_title(sender, instance, using, **kwargs):
+    sync_titles([instance.pk], using)
+
+
+@receiver(titles_bulk_changed, sender=Title)
+def sync_bulk_titles(sender, title_ids, using, **kwargs):
+    sync_titles(title_ids, using)
+
+
+@receiver(post_save, sender=TitleGenre)
+@receiver(post_delete, sender=TitleGenre)
+def sync_title_genre(sender, instance, using, **kwargs):
+    if instance.title_id is not None:
+        sync_titles([instance.title_id], using)
+
+
+@receiver(m2m_changed, sender=TitleGenre)
+def sync_title_genres(sender, instance, action, reverse, pk_set, using,
+                      **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            sync_titles([instance.pk], using)
+        return
+    # Изменение со стороны жанра: затронуты произведения из pk_set,
+    # а при очистке - все произведения жанра.
+    if action == 'pre_clear':
+        instance._leaderboard_title_ids = list(
+            instance.title_set.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        sync_titles(
+            instance.__dict__.pop('_leaderboard_title_ids', ()), using
+        )
+    elif action.startswith('post_'):
+        sync_titles(pk_set, using)
+
+
+@receiver(post_delete, sender=Genre)
+def remove_genre_board(sender, instance, using, **kwargs):
+    remove_board(genre_board(instance.pk), using)
+
+
+@receiver(post_delete, sender=Category)
+def remove_category_board(sender, instance, using, **kwargs):
+    remove_board(category_board(instance.pk), using)
+
+
+@receiver(rating_changed, sender=Review)
+def update_leaderboards(sender, review, title_id, score_delta, count_delta,
+                        using, **kwargs):
+    """Обновить оценку произведения и его активность за день отзыва."""
+    update_scores([title_id], using)
+    record_activity(
+        title_id, timezone.localdate(review.pub_date), score_delta,
+        count_delta, using
+    )
+
+
+@receiver(ratings_recomputed, sender=Title)
+def update_recomputed_leaderboards(sender, title_ids, using, **kwargs):
+    update_scores(title_ids, using)
+    rebuild_activity(title_ids, using)
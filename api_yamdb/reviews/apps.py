@@ -1,6 +1,7 @@
 """Конфигурация приложения для работы с отзывами."""
 
 from django.apps import AppConfig
+from django.core import checks
 
 
 class ReviewsConfig(AppConfig):
@@ -8,3 +9,9 @@ class ReviewsConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self) -> None:
+        """Подключение сигналов и проверок приложения."""
+        from . import signals  # noqa: F401
+        from .checks import check_deferred_rating_store
+        checks.register(check_deferred_rating_store)
@@ -0,0 +1,18 @@
+"""Проверки настроек приложения отзывов."""
+from django.conf import settings
+from django.core import checks
+
+from core.cache import is_store_shared
+
+
+def check_deferred_rating_store(app_configs, **kwargs) -> list:
+    """Отложенному пересчёту рейтинга нужно общее хранилище."""
+    if settings.RATING_DEFERRED_ENABLED and not is_store_shared():
+        return [checks.Error(
+            'RATING_DEFERRED_ENABLED требует хранилища, общего для всех '
+            'процессов: иначе веб-процессы не узнают о пересчёте '
+            'и отдают устаревший кэш ответов.',
+            hint='Включите REDIS_ENABLED или задайте в CACHES общий кэш.',
+            id='reviews.E001',
+        )]
+    return []
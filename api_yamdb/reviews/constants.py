@@ -1,2 +1,6 @@
 MIN_SCORE = 1
 MAX_SCORE = 10
+
+# Параметры команды recompute_ratings.
+RATING_RECOMPUTE_BATCH_SIZE = 500
+RATING_RECOMPUTE_INTERVAL = 0.3
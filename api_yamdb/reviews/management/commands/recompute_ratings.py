@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.constants import (
+    RATING_RECOMPUTE_BATCH_SIZE,
+    RATING_RECOMPUTE_INTERVAL,
+)
+from reviews.pending import recompute_batch
+
+
+class Command(BaseCommand):
+    """Команда отложенного пересчёта рейтинга произведений"""
+
+    help = (
+        'Пересчитывает рейтинг произведений, отмеченных отзывами при '
+        'RATING_DEFERRED_ENABLED. По умолчанию обрабатывает накопившиеся '
+        'отметки один раз, с --loop продолжает опрашивать очередь.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=RATING_RECOMPUTE_BATCH_SIZE,
+            help='Произведений, пересчитываемых за один раз.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Продолжать опрашивать очередь.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=RATING_RECOMPUTE_INTERVAL,
+            help='Секунд между опросами в режиме --loop.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных из DATABASES.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total = 0
+            while True:
+                recomputed = recompute_batch(
+                    options['batch_size'], options['database']
+                )
+                total += recomputed
+                if recomputed < options['batch_size']:
+                    break
+            if total:
+                self.stdout.write(f'Пересчитано произведений: {total}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
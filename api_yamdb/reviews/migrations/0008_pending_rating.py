@@ -0,0 +1,27 @@
+# Generated by Django 3.2 on 2026-10-18 05:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_title_stats'),
+        ('reviews', '0007_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRating',
+            fields=[
+                ('title', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='pending_rating', serialize=False, to='content.title', verbose_name='Произведение')),
+                ('marked_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Ожидает пересчёта с')),
+            ],
+            options={
+                'verbose_name': 'Пересчёт рейтинга',
+                'verbose_name_plural': 'Пересчёты рейтинга',
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from content.models import Title
 from users.models import User
@@ -53,6 +54,29 @@ class Review(models.Model):
                 fields=("title", "author"), name="unique_review"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("title", "-pub_date", "-id"),
+                name="review_title_pub_date_idx"
+            )
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запомнить загруженные из БД произведение и оценку."""
+        instance = super().from_db(db, field_names, values)
+        if {'title_id', 'score'}.issubset(field_names):
+            instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self) -> None:
+        """Сохранить текущие произведение и оценку как исходные."""
+        self._loaded_rating_state = (self.title_id, self.score)
+
+    @property
+    def loaded_rating_state(self):
+        """Произведение и оценка на момент загрузки или сохранения."""
+        return getattr(self, '_loaded_rating_state', None)
 
     def __str__(self) -> str:
         """Строка формата 'автор - произведение'."""
@@ -92,7 +116,48 @@ class Comment(models.Model):
 
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=("review", "-pub_date", "-id"),
+                name="comment_review_pub_date_idx"
+            )
+        ]
 
     def __str__(self) -> str:
         """Строка формата 'автор - отзыв'."""
         return f"{self.author} - {self.review}"
+
+
+class PendingRating(models.Model):
+    """Произведение, рейтинг которого ждёт пересчёта.
+
+    Используется при `RATING_DEFERRED_ENABLED`: запись отзыва только
+    добавляет сюда строку, а счётчики пересчитывает команда
+    `recompute_ratings`. Внешний ключ без ограничения в БД: строка может
+    появиться при каскадном удалении произведения вместе с отзывами
+    и тогда просто удаляется при следующем пересчёте.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        primary_key=True,
+        related_name="pending_rating",
+        verbose_name="Произведение",
+    )
+    marked_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Ожидает пересчёта с",
+    )
+
+    class Meta:
+        """Мета-класс для настройки очереди пересчёта рейтинга."""
+
+        verbose_name = "Пересчёт рейтинга"
+        verbose_name_plural = "Пересчёты рейтинга"
+
+    def __str__(self) -> str:
+        """Строка формата 'произведение - время отметки'."""
+        return f"{self.title_id} - {self.marked_at}"
@@ -0,0 +1,102 @@
+"""Отложенный пересчёт рейтинга произведений.
+
+При `RATING_DEFERRED_ENABLED` запись отзыва не обновляет счётчики
+произведения и агрегаты его групп, а только отмечает произведение
+в `PendingRating`. Повторная отметка уже отмеченного произведения
+ничего не меняет, поэтому частые отзывы на популярное произведение
+не конкурируют за его строку. Команда `recompute_ratings` забирает
+отмеченные произведения пачками и пересчитывает их рейтинг по отзывам.
+
+Отметка добавляется после фиксации транзакции отзыва: если пересчёт
+удалил отметку раньше, отзыв отметит произведение заново, а если
+позже - пересчёт уже увидит отзыв.
+
+Если произведение ждёт пересчёта дольше `RATING_MAX_STALENESS` секунд,
+например когда команда не запущена, следующая запись отзыва
+пересчитывает его сразу.
+
+После пересчёта отправляется сигнал `ratings_recomputed` с аргументами
+`title_ids` и `using`.
+
+Команда работает в отдельном процессе, и сброс кэша ответов после
+пересчёта доходит до веб-процессов только через общее хранилище.
+Поэтому без него (`core.cache.is_store_shared()`) режим выключен:
+рейтинг обновляется при записи отзыва, а проверка `reviews.E001`
+не даёт запустить проект с такой настройкой.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from content import stats
+from content.models import Title
+from core.cache import is_store_shared
+from .models import PendingRating
+
+ratings_recomputed = Signal()
+
+
+def is_deferred() -> bool:
+    """Включён ли отложенный пересчёт рейтинга."""
+    return settings.RATING_DEFERRED_ENABLED and is_store_shared()
+
+
+def recompute_titles(title_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Пересчитать рейтинг произведений и агрегаты их групп."""
+    Title.objects.using(using).filter(pk__in=title_ids).rebuild_ratings()
+    stats.refresh_title_stats(title_ids, using)
+    ratings_recomputed.send(sender=Title, title_ids=title_ids, using=using)
+
+
+def recompute_pending(pending, using=DEFAULT_DB_ALIAS) -> int:
+    """Снять отметки `pending` и пересчитать их произведения.
+
+    Отметки удаляются до пересчёта: отзыв, записанный после удаления,
+    отметит произведение заново.
+    """
+    with transaction.atomic(using=using):
+        title_ids = list(pending.values_list('title_id', flat=True))
+        if title_ids:
+            PendingRating.objects.using(using).filter(
+                title_id__in=title_ids
+            ).delete()
+            recompute_titles(title_ids, using)
+    return len(title_ids)
+
+
+def recompute_batch(batch_size, using=DEFAULT_DB_ALIAS) -> int:
+    """Пересчитать до `batch_size` давно отмеченных произведений."""
+    return recompute_pending(
+        PendingRating.objects.using(using).order_by(
+            'marked_at'
+        )[:batch_size],
+        using
+    )
+
+
+def mark_pending(title_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Отметить произведения и пересчитать просроченные."""
+    title_ids = [title_id for title_id in set(title_ids) if title_id]
+    PendingRating.objects.using(using).bulk_create(
+        [PendingRating(title_id=title_id) for title_id in title_ids],
+        ignore_conflicts=True
+    )
+    stale_since = timezone.now() - datetime.timedelta(
+        seconds=settings.RATING_MAX_STALENESS
+    )
+    stale = PendingRating.objects.using(using).filter(
+        title_id__in=title_ids, marked_at__lte=stale_since
+    )
+    if stale.exists():
+        recompute_pending(stale, using)
+
+
+def defer_rating(title_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Отметить произведения после фиксации текущей транзакции."""
+    title_ids = list(title_ids)
+    transaction.on_commit(
+        lambda: mark_pending(title_ids, using), using=using
+    )
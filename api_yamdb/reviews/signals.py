@@ -0,0 +1,79 @@
+"""Сигналы приложения отзывов.
+
+Поддерживают денормализованные счётчики рейтинга произведения
+и агрегаты его жанров и категории в актуальном состоянии при создании,
+изменении и удалении отзывов.
+
+После обновления счётчиков отправляется сигнал `rating_changed`.
+Аргументы: `review` - отзыв, `title_id` - произведение, `score_delta`
+и `count_delta` - изменение суммы и количества его оценок (нули, если
+счётчики пересчитаны заново), `using` - алиас БД.
+
+При отложенном пересчёте (`reviews.pending.is_deferred()`) отзыв только
+отмечает произведение для пересчёта, а вместо `rating_changed` после
+пересчёта отправляется `ratings_recomputed`.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from content import stats
+from content.models import Title
+from .models import Review
+from .pending import defer_rating, is_deferred
+
+rating_changed = Signal()
+
+
+def apply_rating_delta(review, title_id, score_delta, count_delta,
+                       using):
+    Title.objects.using(using).apply_rating_delta(
+        title_id, score_delta, count_delta
+    )
+    stats.apply_rating_delta(title_id, score_delta, count_delta, using)
+    rating_changed.send(
+        sender=Review, review=review, title_id=title_id,
+        score_delta=score_delta, count_delta=count_delta, using=using
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, using,
+                                **kwargs):
+    """Учесть новую или изменённую оценку в рейтинге произведения."""
+    loaded = instance.loaded_rating_state
+    if is_deferred():
+        if loaded != (instance.title_id, instance.score):
+            old_title_id = loaded[0] if loaded else None
+            defer_rating([instance.title_id, old_title_id], using)
+    elif created:
+        apply_rating_delta(
+            instance, instance.title_id, instance.score, 1, using
+        )
+    else:
+        if loaded is None:
+            Title.objects.using(using).filter(
+                pk=instance.title_id
+            ).rebuild_ratings()
+            stats.refresh_title_stats([instance.title_id], using)
+            rating_changed.send(
+                sender=Review, review=instance, title_id=instance.title_id,
+                score_delta=0, count_delta=0, using=using
+            )
+        elif loaded != (instance.title_id, instance.score):
+            old_title_id, old_score = loaded
+            apply_rating_delta(instance, old_title_id, -old_score, -1, using)
+            apply_rating_delta(
+                instance, instance.title_id, instance.score, 1, using
+            )
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, using, **kwargs):
+    """Исключить оценку удалённого отзыва из рейтинга произведения."""
+    if is_deferred():
+        defer_rating([instance.title_id], using)
+        return
+    apply_rating_delta(
+        instance, instance.title_id, -instance.score, -1, using
+    )
@@ -0,0 +1,14 @@
+"""Конфигурация приложения полнотекстового поиска."""
+
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    """Конфигурация приложения поиска."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+
+    def ready(self) -> None:
+        """Подключение сигналов приложения."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,327 @@
+"""Поисковые движки: FTS5 для SQLite и инвертированный индекс на Python.
+
+Оба движка хранят тексты в `SearchDocument`. FTS5 индексирует их
+триггерами сам, индекс на Python раскладывает каждый документ на
+слова в `SearchPosting` и ранжирует совпадения по BM25 в приложении.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Avg, Count
+
+from .constants import (
+    BM25_B,
+    BM25_K1,
+    BODY_WEIGHT,
+    FTS_TABLE,
+    HEADING_WEIGHT,
+    TERM_MAX_LENGTH,
+)
+from .models import SearchDocument, SearchPosting
+
+WORD_RE = re.compile(r'\w+')
+
+_fts_tables = {}
+
+
+def tokenize(text) -> list:
+    """Слова текста без регистра и диакритических знаков.
+
+    Нормализация индекса на Python: й и ё приводятся к и и е вместе
+    с латинскими буквами с диакритикой.
+    """
+    normalized = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(
+        char for char in normalized if not unicodedata.combining(char)
+    )
+    return [word[:TERM_MAX_LENGTH] for word in WORD_RE.findall(stripped)]
+
+
+def get_terms(heading, body) -> Counter:
+    """Взвешенные частоты слов документа."""
+    terms = Counter()
+    for word in tokenize(heading):
+        terms[word] += HEADING_WEIGHT
+    for word in tokenize(body):
+        terms[word] += BODY_WEIGHT
+    return terms
+
+
+def has_fts_table(connection) -> bool:
+    """Есть ли в БД таблица FTS5, созданная миграцией."""
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = %s",
+                [FTS_TABLE]
+            )
+            _fts_tables[key] = cursor.fetchone() is not None
+    return _fts_tables[key]
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    """Движок поиска для БД: FTS5, если он доступен, иначе Python."""
+    connection = connections[using]
+    if (
+        settings.SEARCH_FTS5_ENABLED
+        and connection.vendor == 'sqlite'
+        and has_fts_table(connection)
+    ):
+        return Fts5SearchBackend(using)
+    return InvertedIndexSearchBackend(using)
+
+
+class SearchResults:
+    """Ленивая выдача поиска для пагинатора.
+
+    Поддерживает `count()` и срезы, поэтому страница выдачи загружается
+    из индекса отдельно, без чтения всех совпадений.
+    """
+
+    def __init__(self):
+        self._count = None
+
+    def count(self) -> int:
+        if self._count is None:
+            self._count = self.get_count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, _ = item.indices(self.count())
+            return self.fetch(start, max(stop - start, 0))
+        results = self.fetch(item, 1)
+        if not results:
+            raise IndexError('Search result index out of range.')
+        return results[0]
+
+    def get_count(self) -> int:
+        raise NotImplementedError('`get_count()` must be implemented.')
+
+    def fetch(self, offset, limit) -> list:
+        raise NotImplementedError('`fetch()` must be implemented.')
+
+
+class BaseSearchBackend:
+    """Общая часть движков: запись документов в `SearchDocument`."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+
+    def update(self, kind, object_id, fields):
+        """Добавить документ в индекс или обновить его текст."""
+        fields['length'] = len(tokenize(fields['heading'])) + len(
+            tokenize(fields['body'])
+        )
+        document, _ = SearchDocument.objects.using(
+            self.using
+        ).update_or_create(kind=kind, object_id=object_id, defaults=fields)
+        return document
+
+    def remove(self, kind, object_ids):
+        """Убрать документы из индекса."""
+        SearchDocument.objects.using(self.using).filter(
+            kind=kind, object_id__in=object_ids
+        ).delete()
+
+    def index_documents(self, documents):
+        """Записать пачку новых документов при перестроении индекса."""
+        for document in documents:
+            document.length = len(tokenize(document.heading)) + len(
+                tokenize(document.body)
+            )
+        SearchDocument.objects.using(self.using).bulk_create(documents)
+
+    def clear(self):
+        """Удалить весь индекс."""
+        SearchDocument.objects.using(self.using).all().delete()
+
+    def search(self, query, kinds=None) -> SearchResults:
+        raise NotImplementedError('`search()` must be implemented.')
+
+
+class Fts5Results(SearchResults):
+    """Выдача FTS5: подсчёт и страницы считает SQLite."""
+
+    def __init__(self, match, kinds, using):
+        super().__init__()
+        self.match = match
+        self.kinds = kinds
+        self.using = using
+
+    def get_from_clause(self):
+        table = SearchDocument._meta.db_table
+        sql = (
+            f'FROM {FTS_TABLE} JOIN {table} document '
+            f'ON document.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s'
+        )
+        params = [self.match]
+        if self.kinds:
+            placeholders = ', '.join(['%s'] * len(self.kinds))
+            sql += f' AND document.kind IN ({placeholders})'
+            params.extend(self.kinds)
+        return sql, params
+
+    def get_count(self) -> int:
+        if not self.match:
+            return 0
+        sql, params = self.get_from_clause()
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {sql}', params)
+            return cursor.fetchone()[0]
+
+    def fetch(self, offset, limit) -> list:
+        if not self.match or not limit:
+            return []
+        sql, params = self.get_from_clause()
+        # bm25() тем меньше, чем лучше совпадение, поэтому знак меняется.
+        return list(SearchDocument.objects.db_manager(self.using).raw(
+            f'SELECT document.*, '
+            f'-bm25({FTS_TABLE}, %s, %s) AS search_rank {sql} '
+            f'ORDER BY search_rank DESC, document.id LIMIT %s OFFSET %s',
+            [HEADING_WEIGHT, BODY_WEIGHT, *params, limit, offset]
+        ))
+
+
+class Fts5SearchBackend(BaseSearchBackend):
+    """Поиск через виртуальную таблицу FTS5.
+
+    Слова запроса передаются без нормализации `tokenize`: строку
+    в кавычках FTS5 разбирает токенизатором таблицы, и слова приводятся
+    к тому же виду, что и проиндексированные. `tokenize` убирает
+    диакритические знаки у всех букв и превращает й в и, а `unicode61`
+    убирает их только у латинских.
+    """
+
+    def search(self, query, kinds=None) -> SearchResults:
+        # Слова берутся в кавычки, чтобы символы запроса не
+        # разбирались как операторы FTS5; пробел между ними - это AND.
+        words = {word.casefold(): word for word in WORD_RE.findall(query)}
+        match = ' '.join(f'"{word}"' for word in words.values())
+        return Fts5Results(match, kinds, self.using)
+
+
+class RankedResults(SearchResults):
+    """Выдача, ранжированная в приложении."""
+
+    def __init__(self, ranking, using):
+        super().__init__()
+        self.ranking = ranking
+        self.using = using
+
+    def get_count(self) -> int:
+        return len(self.ranking)
+
+    def fetch(self, offset, limit) -> list:
+        page = self.ranking[offset:offset + limit]
+        documents = SearchDocument.objects.using(self.using).in_bulk(
+            [document_id for document_id, _ in page]
+        )
+        results = []
+        for document_id, rank in page:
+            document = documents[document_id]
+            document.search_rank = rank
+            results.append(document)
+        return results
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    """Инвертированный индекс в таблице `SearchPosting` с ранжированием BM25.
+
+    Работает на любой БД: нужен только индекс по полю `term`.
+    """
+
+    def update(self, kind, object_id, fields):
+        document = super().update(kind, object_id, fields)
+        postings = SearchPosting.objects.using(self.using)
+        postings.filter(document=document).delete()
+        postings.bulk_create(self.build_postings(document))
+        return document
+
+    def index_documents(self, documents):
+        super().index_documents(documents)
+        # bulk_create на SQLite не возвращает первичные ключи.
+        kind = documents[0].kind
+        ids = dict(SearchDocument.objects.using(self.using).filter(
+            kind=kind,
+            object_id__in=[document.object_id for document in documents]
+        ).values_list('object_id', 'id'))
+        postings = []
+        for document in documents:
+            document.id = ids[document.object_id]
+            postings.extend(self.build_postings(document))
+        SearchPosting.objects.using(self.using).bulk_create(postings)
+
+    def clear(self):
+        SearchPosting.objects.using(self.using).all().delete()
+        super().clear()
+
+    @staticmethod
+    def build_postings(document):
+        return [
+            SearchPosting(document=document, term=term, frequency=frequency)
+            for term, frequency in get_terms(
+                document.heading, document.body
+            ).items()
+        ]
+
+    def search(self, query, kinds=None) -> SearchResults:
+        terms = list(dict.fromkeys(tokenize(query)))
+        documents = SearchDocument.objects.using(self.using)
+        if kinds:
+            documents = documents.filter(kind__in=kinds)
+        matches, lengths = self.get_matches(documents, terms)
+        if not matches:
+            return RankedResults([], self.using)
+        stats = documents.aggregate(
+            total=Count('pk'), average_length=Avg('length')
+        )
+        stats['containing'] = Counter(
+            term for found in matches.values() for term in found
+        )
+        ranking = [
+            (document_id, self.get_rank(found, lengths[document_id], stats))
+            for document_id, found in matches.items()
+            if len(found) == len(terms)
+        ]
+        ranking.sort(key=lambda item: (-item[1], item[0]))
+        return RankedResults(ranking, self.using)
+
+    def get_matches(self, documents, terms):
+        """Частоты искомых слов и длины документов, где они встречаются."""
+        matches = defaultdict(dict)
+        lengths = {}
+        if not terms:
+            return matches, lengths
+        postings = SearchPosting.objects.using(self.using).filter(
+            term__in=terms, document__in=documents
+        ).values_list('document_id', 'document__length', 'term', 'frequency')
+        for document_id, length, term, frequency in postings:
+            matches[document_id][term] = frequency
+            lengths[document_id] = length
+        return matches, lengths
+
+    @staticmethod
+    def get_rank(found, length, stats) -> float:
+        """Оценка BM25 документа по частотам найденных в нём слов."""
+        total = stats['total']
+        average_length = stats['average_length'] or 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        rank = 0.0
+        for term, frequency in found.items():
+            containing = stats['containing'][term]
+            idf = math.log(
+                1 + (total - containing + 0.5) / (containing + 0.5)
+            )
+            rank += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return rank
@@ -0,0 +1,14 @@
+HEADING_MAX_LENGTH = 256
+KIND_MAX_LENGTH = 16
+TERM_MAX_LENGTH = 64
+
+# Совпадение в заголовке весит как несколько совпадений в тексте.
+HEADING_WEIGHT = 4
+BODY_WEIGHT = 1
+
+# Параметры ранжирования BM25 для индекса на Python.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+FTS_TABLE = 'search_fts'
+INDEX_CHUNK_SIZE = 1000
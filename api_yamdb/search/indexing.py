@@ -0,0 +1,137 @@
+"""Преобразование моделей в поисковые документы."""
+from typing import Callable, NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS, models
+
+from content.models import Title
+from reviews.models import Comment, Review
+from .backends import get_backend
+from .constants import INDEX_CHUNK_SIZE
+from .models import SearchDocument
+
+
+def title_fields(title) -> dict:
+    return {
+        'title_id': title.pk,
+        'review_id': None,
+        'heading': title.name,
+        'body': title.description or '',
+    }
+
+
+def review_fields(review) -> dict:
+    return {
+        'title_id': review.title_id,
+        'review_id': None,
+        'heading': '',
+        'body': review.text,
+    }
+
+
+def comment_fields(comment) -> dict:
+    return {
+        'title_id': comment.review.title_id,
+        'review_id': comment.review_id,
+        'heading': '',
+        'body': comment.text,
+    }
+
+
+class IndexedModel(NamedTuple):
+    """Модель, тексты которой попадают в поисковый индекс."""
+
+    kind: str
+    model: type
+    get_fields: Callable
+    related: tuple = ()
+
+    def get_queryset(self, using) -> models.QuerySet:
+        return self.model._default_manager.using(using).select_related(
+            *self.related
+        ).order_by('pk')
+
+
+INDEXED_MODELS = (
+    IndexedModel(SearchDocument.KindChoices.TITLE, Title, title_fields),
+    IndexedModel(SearchDocument.KindChoices.REVIEW, Review, review_fields),
+    IndexedModel(
+        SearchDocument.KindChoices.COMMENT, Comment, comment_fields,
+        ('review',)
+    ),
+)
+
+
+def get_indexed_model(model):
+    for indexed in INDEXED_MODELS:
+        if indexed.model is model:
+            return indexed
+    raise LookupError(f'Модель {model.__name__} не индексируется.')
+
+
+def index_instance(instance, using=DEFAULT_DB_ALIAS) -> None:
+    """Добавить объект в индекс или обновить его документ."""
+    indexed = get_indexed_model(type(instance))
+    get_backend(using).update(
+        indexed.kind, instance.pk, indexed.get_fields(instance)
+    )
+
+
+def remove_instance(instance, using=DEFAULT_DB_ALIAS) -> None:
+    """Убрать объект из индекса."""
+    indexed = get_indexed_model(type(instance))
+    get_backend(using).remove(indexed.kind, [instance.pk])
+
+
+def build_document(indexed, instance) -> SearchDocument:
+    return SearchDocument(
+        kind=indexed.kind,
+        object_id=instance.pk,
+        **indexed.get_fields(instance)
+    )
+
+
+def index_objects(model, object_ids, using=DEFAULT_DB_ALIAS) -> None:
+    """Переиндексировать объекты после пакетной записи.
+
+    Документы удаляются и создаются заново пачками по
+    `INDEX_CHUNK_SIZE`, а не по одному, как в сигналах `post_save`.
+    """
+    indexed = get_indexed_model(model)
+    backend = get_backend(using)
+    object_ids = list(object_ids)
+    for start in range(0, len(object_ids), INDEX_CHUNK_SIZE):
+        chunk = object_ids[start:start + INDEX_CHUNK_SIZE]
+        backend.remove(indexed.kind, chunk)
+        documents = [
+            build_document(indexed, instance)
+            for instance in indexed.get_queryset(using).filter(pk__in=chunk)
+        ]
+        if documents:
+            backend.index_documents(documents)
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS) -> dict:
+    """Построить индекс заново по всем объектам.
+
+    Нужен после загрузки данных в обход сигналов (bulk_create,
+    update) и после смены движка поиска. Возвращает число
+    документов каждого типа.
+    """
+    backend = get_backend(using)
+    backend.clear()
+    totals = {}
+    for indexed in INDEXED_MODELS:
+        totals[indexed.kind] = 0
+        chunk = []
+        for instance in indexed.get_queryset(using).iterator(
+            chunk_size=INDEX_CHUNK_SIZE
+        ):
+            chunk.append(build_document(indexed, instance))
+            if len(chunk) >= INDEX_CHUNK_SIZE:
+                backend.index_documents(chunk)
+                totals[indexed.kind] += len(chunk)
+                chunk = []
+        if chunk:
+            backend.index_documents(chunk)
+            totals[indexed.kind] += len(chunk)
+    return totals
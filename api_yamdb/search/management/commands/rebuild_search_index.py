@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from search.indexing import rebuild_index
+
+
+class Command(BaseCommand):
+    """Команда перестроения поискового индекса"""
+
+    help = (
+        'Заново индексирует произведения, отзывы и комментарии. Нужна '
+        'после загрузки данных в обход сигналов и после смены движка.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных из DATABASES.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            totals = rebuild_index(using)
+        self.stdout.write(self.style.SUCCESS(
+            'Проиндексировано документов: ' + ', '.join(
+                f'{kind} - {total}' for kind, total in totals.items()
+            )
+        ))
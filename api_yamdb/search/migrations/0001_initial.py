@@ -0,0 +1,110 @@
+# Generated by Django 3.2 on 2026-10-18 04:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Внешнее содержимое FTS5 хранится в search_searchdocument, а индекс
+# поддерживается триггерами, поэтому любые записи в таблицу документов,
+# включая flush в тестах, сразу видны поиску.
+CREATE_FTS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "heading, body, content='search_searchdocument', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER search_fts_insert AFTER INSERT ON search_searchdocument "
+    "BEGIN "
+    "INSERT INTO search_fts(rowid, heading, body) "
+    "VALUES (new.id, new.heading, new.body); "
+    "END",
+    "CREATE TRIGGER search_fts_delete AFTER DELETE ON search_searchdocument "
+    "BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, heading, body) "
+    "VALUES ('delete', old.id, old.heading, old.body); "
+    "END",
+    "CREATE TRIGGER search_fts_update AFTER UPDATE ON search_searchdocument "
+    "BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, heading, body) "
+    "VALUES ('delete', old.id, old.heading, old.body); "
+    "INSERT INTO search_fts(rowid, heading, body) "
+    "VALUES (new.id, new.heading, new.body); "
+    "END",
+)
+DROP_FTS_STATEMENTS = (
+    'DROP TRIGGER IF EXISTS search_fts_update',
+    'DROP TRIGGER IF EXISTS search_fts_delete',
+    'DROP TRIGGER IF EXISTS search_fts_insert',
+    'DROP TABLE IF EXISTS search_fts',
+)
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_fts_table(apps, schema_editor):
+    if fts5_available(schema_editor.connection):
+        for statement in CREATE_FTS_STATEMENTS:
+            schema_editor.execute(statement)
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_FTS_STATEMENTS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('title', 'Произведение'), ('review', 'Отзыв'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Идентификатор объекта')),
+                ('title_id', models.PositiveIntegerField(verbose_name='Идентификатор произведения')),
+                ('review_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Идентификатор отзыва')),
+                ('heading', models.CharField(blank=True, max_length=256, verbose_name='Заголовок')),
+                ('body', models.TextField(blank=True, verbose_name='Текст')),
+                ('length', models.PositiveIntegerField(default=0, verbose_name='Количество слов')),
+            ],
+            options={
+                'verbose_name': 'Поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('frequency', models.PositiveIntegerField(verbose_name='Взвешенная частота')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='search.searchdocument', verbose_name='Документ')),
+            ],
+            options={
+                'verbose_name': 'Вхождение слова',
+                'verbose_name_plural': 'Вхождения слов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document'),
+        ),
+        migrations.AddIndex(
+            model_name='searchposting',
+            index=models.Index(fields=['term'], name='search_posting_term_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchposting',
+            constraint=models.UniqueConstraint(fields=('document', 'term'), name='unique_search_posting'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,79 @@
+"""Модели поискового индекса."""
+
+from django.db import models
+
+from .constants import HEADING_MAX_LENGTH, KIND_MAX_LENGTH, TERM_MAX_LENGTH
+
+
+class SearchDocument(models.Model):
+    """Проиндексированный текст произведения, отзыва или комментария.
+
+    На SQLite с FTS5 по этой таблице триггерами поддерживается
+    виртуальная таблица `search_fts`, на остальных БД слова документа
+    хранятся в `SearchPosting`.
+    """
+
+    class KindChoices(models.TextChoices):
+        TITLE = 'title', 'Произведение'
+        REVIEW = 'review', 'Отзыв'
+        COMMENT = 'comment', 'Комментарий'
+
+    kind = models.CharField(
+        'Тип',
+        max_length=KIND_MAX_LENGTH,
+        choices=KindChoices.choices
+    )
+    object_id = models.PositiveIntegerField('Идентификатор объекта')
+    title_id = models.PositiveIntegerField('Идентификатор произведения')
+    review_id = models.PositiveIntegerField(
+        'Идентификатор отзыва',
+        null=True,
+        blank=True
+    )
+    heading = models.CharField(
+        'Заголовок',
+        max_length=HEADING_MAX_LENGTH,
+        blank=True
+    )
+    body = models.TextField('Текст', blank=True)
+    length = models.PositiveIntegerField('Количество слов', default=0)
+
+    class Meta:
+        verbose_name = 'Поисковый документ'
+        verbose_name_plural = 'Поисковые документы'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('kind', 'object_id'), name='unique_search_document'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.kind} {self.object_id}'
+
+
+class SearchPosting(models.Model):
+    """Вхождение слова в документ для индекса на Python."""
+
+    document = models.ForeignKey(
+        SearchDocument,
+        on_delete=models.CASCADE,
+        related_name='postings',
+        verbose_name='Документ'
+    )
+    term = models.CharField('Слово', max_length=TERM_MAX_LENGTH)
+    frequency = models.PositiveIntegerField('Взвешенная частота')
+
+    class Meta:
+        verbose_name = 'Вхождение слова'
+        verbose_name_plural = 'Вхождения слов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('document', 'term'), name='unique_search_posting'
+            )
+        ]
+        indexes = [
+            models.Index(fields=('term',), name='search_posting_term_idx')
+        ]
+
+    def __str__(self) -> str:
+        return self.term
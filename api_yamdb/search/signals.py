@@ -0,0 +1,34 @@
+"""Сигналы приложения поиска.
+
+Поддерживают поисковый индекс в актуальном состоянии при создании,
+изменении и удалении произведений, отзывов и комментариев.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from content.models import Title
+from content.signals import titles_bulk_changed
+from reviews.models import Comment, Review
+from .indexing import index_instance, index_objects, remove_instance
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def update_search_document(sender, instance, using, **kwargs):
+    """Проиндексировать новый или изменённый текст."""
+    index_instance(instance, using)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def remove_search_document(sender, instance, using, **kwargs):
+    """Убрать удалённый объект из индекса."""
+    remove_instance(instance, using)
+
+
+@receiver(titles_bulk_changed, sender=Title)
+def update_search_documents(sender, title_ids, using, **kwargs):
+    """Проиндексировать произведения, записанные пакетом."""
+    index_objects(Title, title_ids, using)
@@ -1,7 +1,7 @@
 """Django admin panel settings."""
 from django.contrib import admin
 
-from .models import User
+from .models import EmailOutbox, User
 
 
 @admin.register(User)
@@ -9,3 +9,12 @@ class ModelNameAdmin(admin.ModelAdmin):
     """Basic admin class for model User."""
 
     list_display = ('email', 'role', 'username')
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin class for emails waiting in the outbox."""
+
+    list_display = ('recipient', 'subject', 'status', 'attempts',
+                    'next_attempt_at')
+    list_filter = ('status',)
@@ -7,3 +7,7 @@ class UsersConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self) -> None:
+        """Connect signals."""
+        from . import signals  # noqa: F401
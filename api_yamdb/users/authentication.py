@@ -0,0 +1,72 @@
+"""JWT authentication without a user lookup per request."""
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import is_store_shared
+from .constants import (
+    AUTH_VERSION_CLAIM,
+    DELETED_USER_VERSION,
+    ROLE_CLAIM,
+    SUPERUSER_CLAIM,
+    USERNAME_CLAIM,
+)
+from .models import User
+from .services.auth_version_service import auth_version_service
+from .tokens import USER_CLAIMS
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """Resolve request.user from token claims.
+
+    Tokens issued by RoleAccessToken carry everything permission checks
+    need. The user is built from the claims once the token version
+    matches the cached auth version of the user. Tokens without the
+    claims and cache misses fall back to the database lookup.
+
+    The cached version is trusted only when the store is shared between
+    processes (Redis or a shared Django cache). A process-local cache
+    never sees role changes and deletions made by other workers, so
+    then every request checks the version in the database.
+
+    The built user is not loaded from the database and has
+    from_token set, views that need the full profile must reload it.
+    """
+
+    def get_user(self, validated_token):
+        """Return user for validated token."""
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        shared = is_store_shared()
+        version = auth_version_service.get(user_id) if shared else None
+        if version is None:
+            user = super().get_user(validated_token)
+            if shared:
+                auth_version_service.remember(user.pk, user.auth_version)
+            self.check_version(validated_token, str(user.auth_version))
+            return user
+
+        self.check_version(validated_token, version)
+        user = User(
+            id=user_id,
+            username=validated_token[USERNAME_CLAIM],
+            role=validated_token[ROLE_CLAIM],
+            is_superuser=validated_token[SUPERUSER_CLAIM],
+            auth_version=validated_token[AUTH_VERSION_CLAIM],
+        )
+        user._state.adding = False
+        user.from_token = True
+        return user
+
+    def check_version(self, validated_token, version: str) -> None:
+        """Reject token of deleted user or issued before a role change."""
+        if version == DELETED_USER_VERSION:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+        if str(validated_token[AUTH_VERSION_CLAIM]) != version:
+            raise AuthenticationFailed(
+                'Token is outdated, obtain a new one', code='token_outdated'
+            )
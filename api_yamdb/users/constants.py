@@ -12,3 +12,22 @@ NOT_UNIQUE_MSG = 'already exists in the system. Please try another one.'
 EMAIL_NOT_UNIQUE_MSG = f'E - mail address {NOT_UNIQUE_MSG}'
 USERNAME_NOT_UNIQUE_MSG = f'Username {NOT_UNIQUE_MSG}'
 RESTRICTED_USERNAMES = {'me', 'admin', 'system'}
+AUTH_VERSION_KEY_PREFIX = 'auth:version:'
+DELETED_USER_VERSION = 'deleted'
+AUTH_STATE_FIELDS = ('role', 'is_superuser', 'is_active')
+USERNAME_CLAIM = 'username'
+ROLE_CLAIM = 'role'
+SUPERUSER_CLAIM = 'is_superuser'
+AUTH_VERSION_CLAIM = 'ver'
+CODE_MATCHED = 1
+CODE_MISMATCH = 0
+CODE_MISSING = -1
+CODE_STORE_MEMORY = 'memory'
+CODE_STORE_SQLITE = 'sqlite'
+MAX_EMAIL_SUBJECT_LENGTH = 255
+MAX_OUTBOX_STATUS_LENGTH = 16
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_LEASE_SECONDS = 300
+OUTBOX_POLL_INTERVAL = 5
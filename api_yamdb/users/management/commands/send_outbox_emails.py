@@ -0,0 +1,58 @@
+"""Command for delivering emails from the outbox."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.constants import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_RETRY_DELAY,
+)
+from users.services.email_outbox import OutboxSender
+
+
+class Command(BaseCommand):
+    """Send pending outbox emails in batches over one SMTP connection."""
+
+    help = (
+        'Sends pending emails from the outbox. Runs once by default, '
+        'with --loop keeps polling for new emails.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=OUTBOX_BATCH_SIZE,
+            help='Emails sent over one SMTP connection.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=OUTBOX_MAX_ATTEMPTS,
+            help='Attempts before an email is marked failed.'
+        )
+        parser.add_argument(
+            '--retry-delay', type=int, default=OUTBOX_RETRY_DELAY,
+            help='Delay before the first retry in seconds, doubled after '
+                 'every failed attempt.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=OUTBOX_POLL_INTERVAL,
+            help='Seconds between polls in --loop mode.'
+        )
+
+    def handle(self, *args, **options):
+        sender = OutboxSender(
+            batch_size=options['batch_size'],
+            max_attempts=options['max_attempts'],
+            retry_delay=options['retry_delay'],
+        )
+        while True:
+            sent, failed = sender.send_pending()
+            if sent or failed:
+                self.stdout.write(f'Sent: {sent}, failed: {failed}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -1,14 +1,52 @@
 """Models file.
 
-Contains User model.
+Contains User and EmailOutbox models.
 """
-from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db import models, transaction
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db.models import F
+from django.utils import timezone
 
 from .constants import (
+    AUTH_STATE_FIELDS,
     MAX_EMAIL_LENGTH,
+    MAX_EMAIL_SUBJECT_LENGTH,
+    MAX_OUTBOX_STATUS_LENGTH,
     MAX_ROLE_LENGTH, MAX_BIO_LENGTH
 )
+from .services.auth_version_service import auth_version_service
+
+
+class UserQuerySet(models.QuerySet):
+    """QuerySet that outdates access tokens on bulk access changes."""
+
+    def update(self, **kwargs):
+        """Update users, bumping auth version if access changes."""
+        if not kwargs.keys() & set(AUTH_STATE_FIELDS):
+            return super().update(**kwargs)
+        return self.bump_auth_version(**kwargs)
+
+    def bump_auth_version(self, **kwargs) -> int:
+        """Update users and bump their auth version.
+
+        New versions reach the cache after the commit.
+        Returns number of updated users.
+        """
+        with transaction.atomic(using=self.db):
+            user_ids = list(self.values_list('pk', flat=True))
+            updated = super().update(
+                auth_version=F('auth_version') + 1, **kwargs
+            )
+        auth_version_service.update_on_commit(
+            self.model._default_manager.using(self.db).filter(
+                pk__in=user_ids
+            )
+        )
+        return updated
+
+
+class AuthUserManager(UserManager.from_queryset(UserQuerySet)):
+    """UserManager with UserQuerySet methods."""
 
 
 class User(AbstractUser):
@@ -17,6 +55,7 @@ class User(AbstractUser):
     Added fields:
     - role
     - email is blank=False
+    - auth_version, bumped when access-relevant fields change
 
     Contains RoleChoices for choices
     """
@@ -45,6 +84,35 @@ class User(AbstractUser):
         blank=True,
         verbose_name='Биография'
     )
+    auth_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия доступа'
+    )
+
+    objects = AuthUserManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember access-relevant fields as loaded from the database."""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_auth_state()
+        return instance
+
+    def remember_auth_state(self) -> None:
+        """Store current access-relevant fields for change detection."""
+        self._loaded_auth_state = self.auth_state
+
+    @property
+    def auth_state(self) -> tuple:
+        """Return fields that token claims and permissions depend on."""
+        return tuple(getattr(self, field) for field in AUTH_STATE_FIELDS)
+
+    @property
+    def auth_state_changed(self) -> bool:
+        """Return bool if access-relevant fields changed since loading."""
+        loaded = getattr(self, '_loaded_auth_state', None)
+        return loaded is not None and loaded != self.auth_state
 
     @property
     def is_admin(self) -> bool:
@@ -60,3 +128,70 @@ class User(AbstractUser):
         """CLass meta with ordering by username."""
 
         ordering = ['username']
+
+
+class EmailOutbox(models.Model):
+    """Email waiting for delivery by send_outbox_emails command.
+
+    Signup commits a pending row instead of talking to SMTP, the worker
+    sends due rows in batches and reschedules failed ones with backoff.
+    """
+
+    class StatusChoices(models.TextChoices):
+        """Class choices for field status."""
+
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    recipient = models.EmailField(
+        max_length=MAX_EMAIL_LENGTH,
+        verbose_name='Получатель'
+    )
+    subject = models.CharField(
+        max_length=MAX_EMAIL_SUBJECT_LENGTH,
+        verbose_name='Тема'
+    )
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        max_length=MAX_EMAIL_LENGTH,
+        verbose_name='Отправитель'
+    )
+    status = models.CharField(
+        max_length=MAX_OUTBOX_STATUS_LENGTH,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попытки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    class Meta:
+        """Class meta with index for due emails."""
+
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_due_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,87 @@
+"""AuthVersionService for users.
+
+Contains:
+- Cached auth versions of users
+- Tombstones for deleted users
+"""
+from typing import Final, Optional
+
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import get_store
+from users.constants import AUTH_VERSION_KEY_PREFIX, DELETED_USER_VERSION
+
+
+class AuthVersionService:
+    """Service for tracking which access tokens are still current.
+
+    Every user has an auth version that is embedded in access tokens.
+    The version is mirrored in the cache store, so a token can be
+    checked against it without loading the user from the database.
+    Authentication relies on it only when the store is shared between
+    processes, see core.cache.is_store_shared.
+    A deleted user keeps a tombstone until its last token expires.
+
+    Changes are written after the transaction commits, reads only fill
+    missing entries. So a rolled back change never reaches the cache
+    and a version read before a change cannot overwrite it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the AuthVersionService.
+
+        Entries live as long as an access token, after that
+        every token carrying the version has expired anyway.
+        """
+        self._key_prefix: Final[str] = AUTH_VERSION_KEY_PREFIX
+        self._ttl: Final[int] = int(
+            api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        )
+
+    def _get_key(self, user_id) -> str:
+        return f'{self._key_prefix}{user_id}'
+
+    def get(self, user_id) -> Optional[str]:
+        """Return cached version of user or None on cache miss."""
+        return get_store().get(self._get_key(user_id))
+
+    def remember(self, user_id, version: int) -> None:
+        """Cache version of user read from database, unless cached."""
+        get_store().add(self._get_key(user_id), str(version), self._ttl)
+
+    def set_on_commit(self, user_id, version: int, using: str) -> None:
+        """Cache version of new user once transaction commits."""
+        transaction.on_commit(
+            lambda: get_store().set(
+                self._get_key(user_id), str(version), self._ttl
+            ),
+            using=using
+        )
+
+    def update_on_commit(self, queryset) -> None:
+        """Cache versions of queryset users once transaction commits.
+
+        Versions are read after the commit, so the cache holds what
+        other processes see in the database.
+        """
+        def update():
+            store = get_store()
+            for user_id, version in queryset.values_list(
+                'pk', 'auth_version'
+            ):
+                store.set(self._get_key(user_id), str(version), self._ttl)
+
+        transaction.on_commit(update, using=queryset.db)
+
+    def revoke_on_commit(self, user_id, using: str) -> None:
+        """Mark user as deleted once transaction commits."""
+        transaction.on_commit(
+            lambda: get_store().set(
+                self._get_key(user_id), DELETED_USER_VERSION, self._ttl
+            ),
+            using=using
+        )
+
+
+auth_version_service = AuthVersionService()
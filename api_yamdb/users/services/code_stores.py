@@ -0,0 +1,239 @@
+"""Code stores for VerificationService.
+
+Contains:
+- Redis store
+- In-process store with TTL and LRU eviction
+- SQLite file store shared between worker processes
+"""
+from collections import OrderedDict
+from typing import Final, Optional
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+from users.constants import (
+    CODE_MATCHED,
+    CODE_MISMATCH,
+    CODE_MISSING,
+    CODE_STORE_MEMORY,
+    CODE_STORE_SQLITE,
+)
+
+# Compare and delete the code in one round trip. Returns 1 when the code
+# matched and was deleted, 0 on mismatch and -1 when there is no code.
+CHECK_CODE_SCRIPT = """
+local stored = redis.call('GET', KEYS[1])
+if not stored then
+    return -1
+end
+if stored ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+
+class CodeStore:
+    """Interface of confirmation code storage.
+
+    check() compares and deletes the code atomically and returns
+    CODE_MATCHED, CODE_MISMATCH or CODE_MISSING. Expired codes are
+    reported as missing.
+    """
+
+    def set(self, key: str, code: str, ttl: int) -> None:
+        """Save code for key for ttl seconds."""
+        raise NotImplementedError('`set()` must be implemented.')
+
+    def check(self, key: str, code: str) -> int:
+        """Compare code and delete it on match."""
+        raise NotImplementedError('`check()` must be implemented.')
+
+    def delete(self, key: str) -> None:
+        """Delete code for key if any."""
+        raise NotImplementedError('`delete()` must be implemented.')
+
+
+class RedisCodeStore(CodeStore):
+    """Store codes in Redis with native TTL.
+
+    Errors of Redis are raised, VerificationService falls back to
+    the local store on them.
+    """
+
+    def __init__(self, redis_client, key_prefix: str) -> None:
+        """Initialize store with client and key prefix."""
+        self._redis = redis_client
+        self._key_prefix: Final[str] = key_prefix
+        self._check_script = redis_client.register_script(CHECK_CODE_SCRIPT)
+
+    def _get_key(self, key: str) -> str:
+        # Like verification:code:username
+        return f'{self._key_prefix}{key}'
+
+    def set(self, key: str, code: str, ttl: int) -> None:
+        self._redis.setex(self._get_key(key), ttl, code)
+
+    def check(self, key: str, code: str) -> int:
+        return self._check_script(keys=[self._get_key(key)], args=[code])
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self._get_key(key))
+
+
+class MemoryCodeStore(CodeStore):
+    """Store codes in process memory.
+
+    Codes expire after their TTL, the number of codes is capped and
+    the least recently used codes are evicted first. All operations
+    hold a lock, so the store is safe for threaded servers. Codes are
+    not shared between processes.
+    """
+
+    def __init__(self, max_size: int, clock=time.monotonic) -> None:
+        """Initialize store with size cap and clock for expiry."""
+        self._max_size: Final[int] = max_size
+        self._clock = clock
+        self._codes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _get_alive(self, key: str) -> Optional[str]:
+        entry = self._codes.get(key)
+        if entry is None:
+            return None
+        code, expires_at = entry
+        if expires_at <= self._clock():
+            del self._codes[key]
+            return None
+        self._codes.move_to_end(key)
+        return code
+
+    def set(self, key: str, code: str, ttl: int) -> None:
+        with self._lock:
+            self._codes[key] = (code, self._clock() + ttl)
+            self._codes.move_to_end(key)
+            while len(self._codes) > self._max_size:
+                self._codes.popitem(last=False)
+
+    def check(self, key: str, code: str) -> int:
+        with self._lock:
+            stored = self._get_alive(key)
+            if stored is None:
+                return CODE_MISSING
+            if stored != code:
+                return CODE_MISMATCH
+            del self._codes[key]
+            return CODE_MATCHED
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._codes.pop(key, None)
+
+
+class SQLiteCodeStore(CodeStore):
+    """Store codes in an SQLite file shared by worker processes.
+
+    For deployments with several processes and without Redis. Every
+    thread uses its own connection, checks run in an IMMEDIATE
+    transaction, so a code is matched by one request only.
+    """
+
+    def __init__(self, path, max_size: int) -> None:
+        """Initialize store with file path and size cap."""
+        self._path = str(path)
+        self._max_size: Final[int] = max_size
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS verification_code ('
+                'key TEXT PRIMARY KEY, code TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, used_at REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def set(self, key: str, code: str, ttl: int) -> None:
+        now = time.time()
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'DELETE FROM verification_code WHERE expires_at <= ?', (now,)
+            )
+            connection.execute(
+                'INSERT OR REPLACE INTO verification_code '
+                'VALUES (?, ?, ?, ?)',
+                (key, code, now + ttl, now)
+            )
+            connection.execute(
+                'DELETE FROM verification_code WHERE key IN ('
+                'SELECT key FROM verification_code '
+                'ORDER BY used_at DESC, rowid DESC LIMIT -1 OFFSET ?)',
+                (self._max_size,)
+            )
+        except sqlite3.Error:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def check(self, key: str, code: str) -> int:
+        now = time.time()
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT code FROM verification_code '
+                'WHERE key = ? AND expires_at > ?',
+                (key, now)
+            ).fetchone()
+            if row is None:
+                result = CODE_MISSING
+            elif row[0] != code:
+                connection.execute(
+                    'UPDATE verification_code SET used_at = ? WHERE key = ?',
+                    (now, key)
+                )
+                result = CODE_MISMATCH
+            else:
+                connection.execute(
+                    'DELETE FROM verification_code WHERE key = ?', (key,)
+                )
+                result = CODE_MATCHED
+        except sqlite3.Error:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def delete(self, key: str) -> None:
+        self._connect().execute(
+            'DELETE FROM verification_code WHERE key = ?', (key,)
+        )
+
+
+def build_local_code_store() -> CodeStore:
+    """Build store used without Redis from VERIFICATION_CODE_STORE."""
+    if settings.VERIFICATION_CODE_STORE == CODE_STORE_SQLITE:
+        return SQLiteCodeStore(
+            settings.VERIFICATION_CODE_STORE_PATH,
+            settings.VERIFICATION_CODE_STORE_MAX_SIZE
+        )
+    if settings.VERIFICATION_CODE_STORE == CODE_STORE_MEMORY:
+        return MemoryCodeStore(settings.VERIFICATION_CODE_STORE_MAX_SIZE)
+    raise ValueError(
+        f'Unknown VERIFICATION_CODE_STORE: '
+        f'{settings.VERIFICATION_CODE_STORE}'
+    )
@@ -0,0 +1,175 @@
+"""EmailOutbox service for users.
+
+Contains:
+- Enqueue email
+- Send due emails in batches
+"""
+from datetime import timedelta
+from smtplib import SMTPException
+from typing import Final
+import logging
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from users.constants import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_LEASE_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETRY_DELAY,
+)
+from users.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(
+    recipient: str, subject: str, body: str, from_email: str
+) -> EmailOutbox:
+    """Save email for delivery by the outbox worker."""
+    return EmailOutbox.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        from_email=from_email,
+    )
+
+
+class OutboxSender:
+    """Sender of pending outbox emails.
+
+    Every batch is sent over one SMTP connection. Claimed rows are
+    leased by moving next_attempt_at forward, so several workers do not
+    send the same email. A failed email is retried with exponential
+    backoff and marked failed after max_attempts.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        retry_delay: int = OUTBOX_RETRY_DELAY,
+    ) -> None:
+        """Initialize sender with batch size and retry policy."""
+        self._batch_size: Final[int] = batch_size
+        self._max_attempts: Final[int] = max_attempts
+        self._retry_delay: Final[int] = retry_delay
+
+    def claim_batch(self) -> list:
+        """Lease a batch of due pending emails."""
+        now = timezone.now()
+        with transaction.atomic():
+            due = EmailOutbox.objects.filter(
+                status=EmailOutbox.StatusChoices.PENDING,
+                next_attempt_at__lte=now
+            )
+            if db_connection.features.has_select_for_update_skip_locked:
+                emails = list(
+                    due.select_for_update(skip_locked=True)[:self._batch_size]
+                )
+                EmailOutbox.objects.filter(
+                    pk__in=[email.pk for email in emails]
+                ).update(next_attempt_at=self.lease_until(now))
+                return emails
+            return self.lease(list(due[:self._batch_size]), now)
+
+    def lease(self, emails: list, now) -> list:
+        """Lease emails still due, return the leased ones.
+
+        Without SKIP LOCKED another worker may have leased a selected
+        email meanwhile, the conditional update then changes no rows.
+        """
+        return [
+            email for email in emails
+            if EmailOutbox.objects.filter(
+                pk=email.pk,
+                status=EmailOutbox.StatusChoices.PENDING,
+                next_attempt_at__lte=now
+            ).update(next_attempt_at=self.lease_until(now))
+        ]
+
+    @staticmethod
+    def lease_until(now):
+        return now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+
+    def send_batch(self) -> tuple:
+        """Send one batch, return counts of sent and failed emails."""
+        emails = self.claim_batch()
+        if not emails:
+            return 0, 0
+        connection = get_connection()
+        if not self.open_connection(connection):
+            for email in emails:
+                self.mark_failed(email, 'SMTP connection failed')
+            return 0, len(emails)
+        sent = failed = 0
+        try:
+            for email in emails:
+                try:
+                    EmailMessage(
+                        subject=email.subject,
+                        body=email.body,
+                        from_email=email.from_email,
+                        to=[email.recipient],
+                        connection=connection,
+                    ).send()
+                except (SMTPException, OSError) as error:
+                    self.mark_failed(email, error)
+                    failed += 1
+                    # The connection may be broken after the error.
+                    connection.close()
+                    self.open_connection(connection)
+                else:
+                    self.mark_sent(email)
+                    sent += 1
+        finally:
+            connection.close()
+        return sent, failed
+
+    @staticmethod
+    def open_connection(connection) -> bool:
+        """Open SMTP connection, return False if server is unavailable."""
+        try:
+            connection.open()
+        except (SMTPException, OSError) as error:
+            logger.warning('SMTP connection failed: %s', error)
+            return False
+        return True
+
+    def send_pending(self) -> tuple:
+        """Send batches until no due emails left."""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.send_batch()
+            if not sent and not failed:
+                return total_sent, total_failed
+            total_sent += sent
+            total_failed += failed
+
+    def mark_sent(self, email: EmailOutbox) -> None:
+        EmailOutbox.objects.filter(pk=email.pk).update(
+            status=EmailOutbox.StatusChoices.SENT,
+            attempts=email.attempts + 1,
+            sent_at=timezone.now(),
+            last_error='',
+        )
+
+    def mark_failed(self, email: EmailOutbox, error) -> None:
+        attempts = email.attempts + 1
+        if attempts >= self._max_attempts:
+            status = EmailOutbox.StatusChoices.FAILED
+        else:
+            status = EmailOutbox.StatusChoices.PENDING
+        logger.warning(
+            'Email %s to %s failed (attempt %s): %s',
+            email.pk, email.recipient, attempts, error
+        )
+        EmailOutbox.objects.filter(pk=email.pk).update(
+            status=status,
+            attempts=attempts,
+            next_attempt_at=timezone.now() + timedelta(
+                seconds=self._retry_delay * 2 ** (attempts - 1)
+            ),
+            last_error=str(error),
+        )
@@ -2,13 +2,44 @@
 
 Contains setting:
 - Auto decode
+- Connection pool sized from settings
+- Socket timeouts
+- Retries with exponential backoff
+- Health checks of idle connections
 """
-from redis import Redis
+from django.conf import settings
+from redis import ConnectionPool, Redis
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
 
 
-redis_client = Redis(
-    host='localhost',
-    port=6379,
-    db=0,
-    decode_responses=True
-)
+def build_redis_pool() -> ConnectionPool:
+    """Build connection pool from REDIS_* settings.
+
+    Connection and timeout errors are retried with exponential
+    backoff, other errors are raised immediately.
+    """
+    return ConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(
+            ExponentialBackoff(
+                cap=settings.REDIS_RETRY_BACKOFF_CAP,
+                base=settings.REDIS_RETRY_BACKOFF_BASE
+            ),
+            settings.REDIS_RETRIES
+        ),
+        retry_on_error=[ConnectionError, TimeoutError],
+        decode_responses=True
+    )
+
+
+redis_pool = build_redis_pool()
+redis_client = Redis(connection_pool=redis_pool)
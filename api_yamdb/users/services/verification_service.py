@@ -9,15 +9,19 @@ Contains:
 from smtplib import SMTPException
 from string import digits
 from typing import Optional, Final
+import logging
 import secrets
 
 from django.core.mail import send_mail
 from django.conf import settings
-from redis import Redis
 from redis.exceptions import RedisError
 
+from .code_stores import CodeStore, RedisCodeStore, build_local_code_store
+from .email_outbox import enqueue_email
 from .redis_config import redis_client
 from users.constants import (
+    CODE_MATCHED,
+    CODE_MISMATCH,
     CODE_TTL,
     EMAIL_MESSAGE,
     EMAIL_SUBJECT,
@@ -26,14 +30,14 @@ from users.constants import (
 )
 from ..exceptions import (
     UsernameEmptyError,
-    CodeGenerateError,
     CodeCleanError,
-    CodeExpiredError,
     EmailSendError,
     CodeNotFoundError,
     InvalidCodeError
 )
 
+logger = logging.getLogger(__name__)
+
 
 class VerificationService:
     """Service for handling user verification through email confirmation codes.
@@ -45,13 +49,19 @@ class VerificationService:
     - Cleaning up expired codes
 
     The service uses Redis for storing confirmation codes with TTL.
+    Without Redis, or while it is unavailable, codes are kept in the
+    local store chosen by VERIFICATION_CODE_STORE.
     """
 
-    def __init__(self, redis_client) -> None:
+    def __init__(
+        self, redis_client, local_store: Optional[CodeStore] = None
+    ) -> None:
         """Initialize the VerificationService.
 
         Args:
             redis_client: Redis client instance for storing confirmation codes
+            local_store: Store used without Redis, built from settings
+                when not given
 
         The service is configured with:
         - Code length from MAX_CONFIRMATION_CODE_LENGTH
@@ -59,19 +69,18 @@ class VerificationService:
         - Key prefix from KEY_PREFIX
         - TTL from CODE_TTL
         - Use_redis bool param
-        - Redis config
-        - Local storage for saving code
+        - Redis store
+        - Local store for saving code
         """
         self._code_length: Final[int] = MAX_CONFIRMATION_CODE_LENGTH
         self._digits: Final[str] = digits
         self._code_ttl: Final[int] = CODE_TTL
-        self._key_prefix: Final[str] = KEY_PREFIX
         self.use_redis = (
             hasattr(settings, 'REDIS_ENABLED')
             and settings.REDIS_ENABLED
         )
-        self._redis: Redis = redis_client
-        self._local_storage = {}
+        self._redis_store = RedisCodeStore(redis_client, KEY_PREFIX)
+        self._local_store = local_store or build_local_code_store()
 
     def generate(self, username: str) -> Optional[str]:
         """Generate confirmation code.
@@ -82,35 +91,43 @@ class VerificationService:
             str - Generated confirmation code
         Raises:
             UsernameEmptyError: If username is empty
-            CodeGenerateError: If Redis operation fails
         """
         if not username:  # Username ist empty
             raise UsernameEmptyError()
-        try:
-            code = ''.join(secrets.choice(self._digits)
-                           for _ in range(self._code_length))
-            if self.use_redis:
-                key = f'{self._key_prefix}{username}'
-                # Like verification:code:123456
-                self._redis.setex(key, self._code_ttl, code)
+        code = ''.join(secrets.choice(self._digits)
+                       for _ in range(self._code_length))
+        if self.use_redis:
+            try:
                 # Save kode in redis with ttl.
+                self._redis_store.set(username, code, self._code_ttl)
                 return code
-            else:
-                self._local_storage[username] = code
-                return code
-
-        except RedisError as error:
-            raise CodeGenerateError() from error
+            except RedisError as error:
+                logger.warning(
+                    'Redis is unavailable, code is kept locally: %s', error
+                )
+        self._local_store.set(username, code, self._code_ttl)
+        return code
 
     def send_code(self, email: str, code: str) -> None:
         """Send confirmation code.
 
+        With EMAIL_OUTBOX_ENABLED the email is only saved to the outbox
+        and delivered later by send_outbox_emails command.
+
         Args:
             email: str - Email address to send code to
             code: str - Verification code to send
         Raises:
             EmailSendError: If sending email fails
         """
+        if settings.EMAIL_OUTBOX_ENABLED:
+            enqueue_email(
+                recipient=email,
+                subject=EMAIL_SUBJECT,
+                body=f'{EMAIL_MESSAGE}{code}',
+                from_email='Yamdb@example.com',
+            )
+            return
         try:
             send_mail(
                 subject=EMAIL_SUBJECT,
@@ -122,90 +139,61 @@ class VerificationService:
         except SMTPException as error:
             raise EmailSendError() from error
 
-    def _get_valid_key(self, username: str) -> str:
-        """Get Redis key for username and verify it's not expired.
-
-        Args:
-            username: Username to get key for
-        Returns:
-            str: Redis key if valid
-        Raises:
-            CodeExpiredError: If code has expired
-            CodeNotFoundError: If code not found
-        """
-        if self.use_redis:
-            key = f'{self._key_prefix}{username}'
-            ttl = self._redis.ttl(key)
-
-            if ttl == -2:  # Key does not exist
-                raise CodeNotFoundError()
-            if ttl <= 0:  # Key exists but expired
-                raise CodeExpiredError()
-            return key
-        else:
-            if username not in self._local_storage:
-                raise CodeNotFoundError()
-            return username
-
     def check_code(self, code: str, username: str) -> bool:
         """Check confirmation code.
 
+        Every store compares and deletes the code atomically, so a code
+        can be used only once even under concurrent requests. A code
+        missing in Redis is looked up in the local store, where it is
+        saved while Redis is unavailable.
+
         Args:
             username: str - Username to check code for
             code: str - Verification code to check
         Raises:
-            CodeExpiredError: If code has expired
-            CodeNotFoundError: If code not found
+            CodeNotFoundError: If code not found or expired
             InvalidCodeError: If code does not match
         Returns:
             bool - True if code is valid
         """
-        # Check TTL.
         if self.use_redis:
-            key = self._get_valid_key(username)
-            stored_code = self._redis.get(key)
-
-            if not stored_code:  # If code is empty
-                raise CodeNotFoundError()
-
-            if stored_code != code:
-                raise InvalidCodeError()
-
-            self._redis.delete(key)
-            return True
-        else:
-            stored_code = self._local_storage.get(username)
-            if not stored_code:
-                raise CodeNotFoundError()
-
-            if stored_code != code:
-                raise InvalidCodeError()
-
-            del self._local_storage[username]
+            try:
+                result = self._redis_store.check(username, code)
+            except RedisError as error:
+                logger.warning(
+                    'Redis is unavailable, checking local code: %s', error
+                )
+            else:
+                if result == CODE_MATCHED:
+                    self._local_store.delete(username)
+                    return True
+                if result == CODE_MISMATCH:
+                    raise InvalidCodeError()
+
+        result = self._local_store.check(username, code)
+        if result == CODE_MATCHED:
             return True
+        if result == CODE_MISMATCH:
+            raise InvalidCodeError()
+        raise CodeNotFoundError()
 
     def cleanup_old_codes(self, username: str) -> None:
         """Clean up verification codes for the given username.
 
         Removes any existing verification codes from Redis storage
-        for the specified username.
+        and the local store for the specified username.
 
         Args:
             username: Username to clean up codes for
         Raises:
             CodeCleanError: If Redis operation fails
         """
-        try:
-            if self.use_redis:
-                key = f'{self._key_prefix}{username}'
-                result = self._redis.delete(key)
-                if result is None:
-                    raise CodeCleanError("Redis operation failed")
-            else:
-                del self._local_storage[username]
-
-        except (RedisError, KeyError) as error:
-            raise CodeCleanError() from error
+        self._local_store.delete(username)
+        if self.use_redis:
+            try:
+                self._redis_store.delete(username)
+            except RedisError as error:
+                raise CodeCleanError() from error
 
 
 verification_service = VerificationService(redis_client)
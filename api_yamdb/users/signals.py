@@ -0,0 +1,29 @@
+"""Signals for users app.
+
+Keep auth versions of users current, so access tokens issued before
+a role change or a deletion stop working.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .services.auth_version_service import auth_version_service
+
+
+@receiver(post_save, sender=User)
+def update_auth_version(sender, instance, created, using, **kwargs):
+    """Bump auth version when role, superuser or active flag changed."""
+    if created:
+        auth_version_service.set_on_commit(
+            instance.pk, instance.auth_version, using
+        )
+    elif instance.auth_state_changed:
+        User.objects.using(using).filter(pk=instance.pk).bump_auth_version()
+        instance.auth_version += 1
+    instance.remember_auth_state()
+
+
+@receiver(post_delete, sender=User)
+def revoke_auth_version(sender, instance, using, **kwargs):
+    """Reject tokens of deleted user."""
+    auth_version_service.revoke_on_commit(instance.pk, using)
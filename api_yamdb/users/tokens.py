@@ -0,0 +1,37 @@
+"""Access tokens with claims used for permission checks."""
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .constants import (
+    AUTH_VERSION_CLAIM,
+    ROLE_CLAIM,
+    SUPERUSER_CLAIM,
+    USERNAME_CLAIM,
+)
+
+USER_CLAIMS = (
+    USERNAME_CLAIM, ROLE_CLAIM, SUPERUSER_CLAIM, AUTH_VERSION_CLAIM
+)
+
+
+class RoleAccessToken(AccessToken):
+    """Access token carrying username, role and auth version of user.
+
+    Together with the cached auth version these claims are enough to
+    resolve request.user without a database query.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        """Create token with user claims.
+
+        Tokens of inactive users get no claims, so they are always
+        checked against the database.
+        """
+        token = super().for_user(user)
+        if not user.is_active:
+            return token
+        token[USERNAME_CLAIM] = user.username
+        token[ROLE_CLAIM] = user.role
+        token[SUPERUSER_CLAIM] = user.is_superuser
+        token[AUTH_VERSION_CLAIM] = user.auth_version
+        return token
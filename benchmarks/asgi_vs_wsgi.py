@@ -0,0 +1,162 @@
+"""Compare read endpoints under WSGI and ASGI.
+
+Requests are sent straight to the WSGI and ASGI callables of the
+project, without a network server, so the numbers show the cost of the
+handler, the views and the database only. Every endpoint is measured
+three ways:
+
+- sync DRF view under WSGI (thread pool)
+- sync DRF view under ASGI (runs in a thread through sync_to_async)
+- async view from api.async_views under ASGI
+
+The configured database is used, load data first:
+
+    cd api_yamdb && python manage.py migrate && python manage.py import_csv
+    cd .. && python benchmarks/asgi_vs_wsgi.py --requests 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from common import setup_django, summarize
+
+
+def run_wsgi(application, path, requests, concurrency):
+    """Call the WSGI application from a pool of threads."""
+    from wsgiref.util import setup_testing_defaults
+
+    url = urlsplit(path)
+
+    def call():
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': url.path,
+            'QUERY_STRING': url.query,
+            'wsgi.input': io.BytesIO(),
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        started = time.perf_counter()
+        body = application(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        for _ in body:
+            pass
+        body.close()
+        if not statuses[0].startswith('200'):
+            raise RuntimeError(f'{path} answered {statuses[0]}')
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(lambda _: call(), range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run_asgi(application, path, requests, concurrency):
+    """Call the ASGI application with at most `concurrency` requests."""
+    url = urlsplit(path)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        messages = [{'type': 'http.request', 'body': b''}]
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        async with semaphore:
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            latency = time.perf_counter() - started
+        if statuses[0] != 200:
+            raise RuntimeError(f'{path} answered {statuses[0]}')
+        return latency
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(call() for _ in range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def get_endpoints():
+    from content.models import Title
+    from reviews.models import Review
+
+    title_id = Title.objects.values_list('pk', flat=True).first()
+    review = Review.objects.values('pk', 'title_id').first()
+    if title_id is None or review is None:
+        sys.exit('No titles or reviews in the database, run import_csv.')
+    return [
+        'titles/',
+        f'titles/{title_id}/',
+        f'titles/{review["title_id"]}/reviews/',
+        f'titles/{review["title_id"]}/reviews/{review["pk"]}/comments/',
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=10)
+    options = parser.parse_args()
+
+    settings = setup_django()
+    # The response cache would hide the cost of the sync views.
+    settings.API_CACHE_ENABLED = False
+
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+
+    wsgi_application = get_wsgi_application()
+    asgi_application = get_asgi_application()
+    print(
+        f'{"endpoint":<45} {"mode":<12} {"req/s":>8} '
+        f'{"p50, ms":>9} {"p99, ms":>9}'
+    )
+    for endpoint in get_endpoints():
+        runs = (
+            ('wsgi', run_wsgi(
+                wsgi_application, f'/api/v1/{endpoint}',
+                options.requests, options.concurrency
+            )),
+            ('asgi sync', asyncio.run(run_asgi(
+                asgi_application, f'/api/v1/{endpoint}',
+                options.requests, options.concurrency
+            ))),
+            ('asgi async', asyncio.run(run_asgi(
+                asgi_application, f'/api/v1/async/{endpoint}',
+                options.requests, options.concurrency
+            ))),
+        )
+        for mode, result in runs:
+            print(
+                f'{endpoint:<45} {mode:<12} {result["rps"]:>8.1f} '
+                f'{result["p50"]:>9.2f} {result["p99"]:>9.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import statistics
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+
+
+def setup_django(database=None):
+    """Configure Django for the project, optionally with another SQLite file.
+
+    Must be called before any project module is imported.
+    """
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+    import django
+    from django.conf import settings
+
+    if database is not None:
+        settings.DATABASES['default']['NAME'] = str(database)
+    django.setup()
+    return settings
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = round(percent / 100 * len(ordered)) - 1
+    index = max(0, min(len(ordered) - 1, index))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    """Throughput and latency percentiles in milliseconds."""
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+    }
@@ -0,0 +1,295 @@
+"""Load test of the main API endpoints.
+
+Seeds a synthetic dataset into a separate SQLite database, starts the
+project on a threaded local WSGI server and sends concurrent requests
+to every endpoint. Reports req/s, p50/p95/p99 latency and SQL queries
+per request, and compares them with a stored baseline:
+
+    python benchmarks/load_test.py --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --baseline benchmarks/baseline.json
+
+The exit status is 1 when an endpoint regressed against the baseline.
+The client and the server share one process, so absolute numbers are
+lower than on a real deployment; compare runs on the same machine.
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from urllib.parse import quote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from common import setup_django, summarize
+from seed import RANDOM_SEED, Scale, seed_database
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+DEFAULT_DATABASE = Path(tempfile.gettempdir()) / 'yamdb_benchmark.sqlite3'
+SAMPLE_SIZE = 50
+
+# Name, path template and the user the request is sent as.
+ENDPOINTS = (
+    ('titles', '/api/v1/titles/', None),
+    ('titles_far_page', '/api/v1/titles/?page={page}', None),
+    ('titles_cursor', '/api/v1/titles/?pagination=cursor', None),
+    ('titles_filter', '/api/v1/titles/?genre={genre}&year={year}', None),
+    ('title', '/api/v1/titles/{title}/', None),
+    ('reviews', '/api/v1/titles/{title}/reviews/', None),
+    ('comments', '/api/v1/titles/{title}/reviews/{review}/comments/', None),
+    ('categories', '/api/v1/categories/', None),
+    ('genres', '/api/v1/genres/', None),
+    ('search', '/api/v1/search/?q={word}', None),
+    ('users_me', '/api/v1/users/me/', 'user'),
+    ('users', '/api/v1/users/', 'admin'),
+)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under load, the client
+    # then waits a second for the retransmit.
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def count_queries(application):
+    """Report SQL queries of every request in a response header."""
+    from django.db import connection
+
+    def wrapper(environ, start_response):
+        queries = [0]
+
+        def counter(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        def counted_start_response(status, headers, exc_info=None):
+            headers.append((QUERY_COUNT_HEADER, str(queries[0])))
+            return start_response(status, headers, exc_info)
+
+        with connection.execute_wrapper(counter):
+            return application(environ, counted_start_response)
+
+    return wrapper
+
+
+def start_server():
+    from django.core.wsgi import get_wsgi_application
+
+    server = make_server(
+        '127.0.0.1', 0, count_queries(get_wsgi_application()),
+        server_class=ThreadingWSGIServer, handler_class=QuietHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_tokens():
+    from users.models import User
+    from users.tokens import RoleAccessToken
+
+    user = User.objects.filter(role=User.RoleChoices.USER).first()
+    admin = User.objects.filter(role=User.RoleChoices.ADMIN).first()
+    return {
+        name: str(RoleAccessToken.for_user(account))
+        for name, account in (('user', user), ('admin', admin))
+    }
+
+
+def build_paths(scale):
+    """Request paths of every endpoint, with random objects."""
+    from reviews.models import Review
+    from search.backends import tokenize
+
+    generator = random.Random(RANDOM_SEED)
+    reviews = list(Review.objects.order_by('pk').values_list(
+        'pk', 'title_id', 'text'
+    )[:scale.titles * scale.reviews_per_title:scale.reviews_per_title])
+    paths = {}
+    for name, template, _ in ENDPOINTS:
+        paths[name] = []
+        for _ in range(SAMPLE_SIZE):
+            review_id, title_id, text = generator.choice(reviews)
+            paths[name].append(template.format(
+                page=generator.randint(1, max(1, scale.titles // 5)),
+                genre=f'genre-{generator.randint(1, scale.genres)}',
+                year=generator.randint(1950, 2023),
+                title=title_id,
+                review=review_id,
+                word=quote(generator.choice(tokenize(text))),
+            ))
+    return paths
+
+
+def send(port, path, token):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    latency = time.perf_counter() - started
+    connection.close()
+    return (
+        latency, response.status,
+        int(response.getheader(QUERY_COUNT_HEADER, 0))
+    )
+
+
+def run_endpoint(port, paths, token, requests, concurrency, warmup):
+    for path in paths[:warmup]:
+        send(port, path, token)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(
+            lambda number: send(port, paths[number % len(paths)], token),
+            range(requests)
+        ))
+    result = summarize(
+        [latency for latency, _, _ in results],
+        time.perf_counter() - started
+    )
+    result['queries'] = sum(queries for _, _, queries in results) / requests
+    result['errors'] = sum(status >= 400 for _, status, _ in results)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Names and reasons of endpoints worse than in the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['errors'] > base.get('errors', 0):
+            regressions.append((name, f'{result["errors"]} errors'))
+        if result['queries'] > base['queries'] + 0.5:
+            regressions.append((
+                name,
+                f'queries {base["queries"]:.1f} -> {result["queries"]:.1f}'
+            ))
+        if result['p95'] > base['p95'] * (1 + tolerance):
+            regressions.append((
+                name, f'p95 {base["p95"]:.1f} -> {result["p95"]:.1f} ms'
+            ))
+        if result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append((
+                name, f'req/s {base["rps"]:.1f} -> {result["rps"]:.1f}'
+            ))
+    return regressions
+
+
+def print_results(results):
+    print(
+        f'{"endpoint":<16} {"req/s":>8} {"p50, ms":>9} {"p95, ms":>9} '
+        f'{"p99, ms":>9} {"queries":>8} {"errors":>7}'
+    )
+    for name, result in results.items():
+        print(
+            f'{name:<16} {result["rps"]:>8.1f} {result["p50"]:>9.2f} '
+            f'{result["p95"]:>9.2f} {result["p99"]:>9.2f} '
+            f'{result["queries"]:>8.2f} {result["errors"]:>7}'
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--database', type=Path, default=DEFAULT_DATABASE,
+        help='SQLite file for the synthetic dataset.'
+    )
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='Multiplier of users, genres and titles (1 = 2000 titles).'
+    )
+    parser.add_argument(
+        '--reseed', action='store_true',
+        help='Generate the dataset even if the database has one.'
+    )
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Requests per endpoint.')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='Requests per endpoint before measuring.')
+    parser.add_argument('--endpoint', action='append',
+                        help='Measure only these endpoints.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Keep the API response cache enabled.')
+    parser.add_argument('--baseline', type=Path,
+                        help='Compare with results saved earlier.')
+    parser.add_argument('--save-baseline', type=Path,
+                        help='Save results as the new baseline.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Allowed relative drop of req/s and growth of p95.'
+    )
+    return parser.parse_args()
+
+
+def prepare_database(scale, reseed):
+    from django.core.management import call_command
+
+    from content.models import Title
+
+    call_command('migrate', verbosity=0)
+    if reseed or Title.objects.count() != scale.titles:
+        started = time.perf_counter()
+        seed_database(scale)
+        print(
+            f'Seeded {scale.titles} titles, '
+            f'{scale.titles * scale.reviews_per_title} reviews in '
+            f'{time.perf_counter() - started:.1f} s'
+        )
+
+
+def main():
+    options = parse_args()
+    settings = setup_django(options.database)
+    settings.API_CACHE_ENABLED = options.cache
+    settings.ALLOWED_HOSTS = ['*']
+    scale = Scale().multiply(options.scale)
+    prepare_database(scale, options.reseed)
+
+    tokens = get_tokens()
+    paths = build_paths(scale)
+    server = start_server()
+    port = server.server_address[1]
+    results = {}
+    try:
+        for name, _, user in ENDPOINTS:
+            if options.endpoint and name not in options.endpoint:
+                continue
+            results[name] = run_endpoint(
+                port, paths[name], tokens.get(user), options.requests,
+                options.concurrency, options.warmup
+            )
+    finally:
+        server.shutdown()
+    print_results(results)
+
+    if options.save_baseline:
+        options.save_baseline.write_text(json.dumps(results, indent=2))
+    if options.baseline:
+        regressions = compare(
+            results, json.loads(options.baseline.read_text()),
+            options.tolerance
+        )
+        for name, reason in regressions:
+            print(f'REGRESSION {name}: {reason}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Synthetic dataset for the load tests.
+
+The data is generated with a fixed random seed, so every run with the
+same scale produces the same rows and the same request paths.
+"""
+import random
+from typing import NamedTuple
+
+WORDS = (
+    'ночь', 'город', 'река', 'звезда', 'дорога', 'война', 'мир', 'любовь',
+    'тайна', 'остров', 'время', 'песня', 'огонь', 'ветер', 'сад', 'море',
+    'детектив', 'история', 'легенда', 'путь', 'свет', 'тень', 'зима',
+    'лето', 'письмо', 'дом', 'мечта', 'капитан', 'король', 'память',
+)
+BATCH_SIZE = 1000
+RANDOM_SEED = 2024
+
+
+class Scale(NamedTuple):
+    """Number of objects of every kind in the dataset."""
+
+    users: int = 500
+    categories: int = 10
+    genres: int = 40
+    titles: int = 2000
+    genres_per_title: int = 2
+    reviews_per_title: int = 10
+    comments_per_review: int = 2
+
+    def multiply(self, factor):
+        """Scale row counts, keep the per-object fan-out."""
+        return self._replace(
+            users=max(self.reviews_per_title, round(self.users * factor)),
+            genres=max(self.genres_per_title, round(self.genres * factor)),
+            titles=max(1, round(self.titles * factor)),
+        )
+
+
+def sentence(generator, length):
+    return ' '.join(generator.choice(WORDS) for _ in range(length))
+
+
+def seed_database(scale):
+    """Replace all data with a synthetic dataset of the given scale."""
+    from django.core.management import call_command
+    from django.db import transaction
+
+    from content.models import Category, Genre, Title, TitleGenre
+    from content.slugs import invalidate_slug_caches
+    from content.stats import rebuild_stats
+    from leaderboards.boards import rebuild_leaderboards
+    from reviews.models import Comment, Review
+    from search.indexing import rebuild_index
+    from users.models import User
+
+    generator = random.Random(RANDOM_SEED)
+    call_command('flush', interactive=False, verbosity=0)
+    with transaction.atomic():
+        User.objects.bulk_create((
+            User(
+                id=number, username=f'user{number}',
+                email=f'user{number}@yamdb.fake',
+                role=User.RoleChoices.ADMIN if number == 1 else
+                User.RoleChoices.USER
+            )
+            for number in range(1, scale.users + 1)
+        ), batch_size=BATCH_SIZE)
+        Category.objects.bulk_create(
+            Category(id=number, name=f'Категория {number}',
+                     slug=f'category-{number}')
+            for number in range(1, scale.categories + 1)
+        )
+        Genre.objects.bulk_create(
+            Genre(id=number, name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(1, scale.genres + 1)
+        )
+        Title.objects.bulk_create((
+            Title(
+                id=number,
+                name=f'{sentence(generator, 2).capitalize()} {number}',
+                year=generator.randint(1950, 2023),
+                description=sentence(generator, 12),
+                category_id=generator.randint(1, scale.categories),
+            )
+            for number in range(1, scale.titles + 1)
+        ), batch_size=BATCH_SIZE)
+        TitleGenre.objects.bulk_create((
+            TitleGenre(title_id=title_id, genre_id=genre_id)
+            for title_id in range(1, scale.titles + 1)
+            for genre_id in generator.sample(
+                range(1, scale.genres + 1), scale.genres_per_title
+            )
+        ), batch_size=BATCH_SIZE)
+        Review.objects.bulk_create((
+            Review(
+                id=(title_id - 1) * scale.reviews_per_title + number + 1,
+                title_id=title_id,
+                author_id=author_id,
+                text=sentence(generator, 20),
+                score=generator.randint(1, 10),
+            )
+            for title_id in range(1, scale.titles + 1)
+            for number, author_id in enumerate(generator.sample(
+                range(1, scale.users + 1), scale.reviews_per_title
+            ))
+        ), batch_size=BATCH_SIZE)
+        reviews = scale.titles * scale.reviews_per_title
+        Comment.objects.bulk_create((
+            Comment(
+                review_id=review_id,
+                author_id=generator.randint(1, scale.users),
+                text=sentence(generator, 10),
+            )
+            for review_id in range(1, reviews + 1)
+            for _ in range(scale.comments_per_review)
+        ), batch_size=BATCH_SIZE)
+        # bulk_create bypasses the signals keeping ratings and search.
+        Title.objects.rebuild_ratings()
+        rebuild_stats()
+        rebuild_leaderboards()
+    rebuild_index()
+    invalidate_slug_caches()
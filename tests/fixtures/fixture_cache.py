@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import cache
+
+from api.throttling import rate_limiter
+from content.slugs import invalidate_slug_caches
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    rate_limiter.clear()
+    invalidate_slug_caches()
+    yield
+    cache.clear()
+    rate_limiter.clear()
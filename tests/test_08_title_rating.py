@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from content.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_counters_follow_reviews(self, admin_client,
+                                               user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'first', 2)
+        response = create_single_review(user_client, title_id, 'second', 9)
+        review_id = response.json()['id']
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (11, 2), (
+            'Проверьте, что при создании отзыва обновляются счётчики '
+            '`rating_sum` и `rating_count` произведения.'
+        )
+        assert title.rating == 5.5
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        response = user_client.patch(url, data={'score': 4})
+        assert response.status_code == HTTPStatus.OK
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (6, 2), (
+            'Проверьте, что при изменении оценки отзыва счётчики рейтинга '
+            'учитывают только разницу оценок.'
+        )
+
+        response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (2, 1)
+        assert title.rating == 2
+
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json().get('rating') == 2
+        assert 'rating_sum' not in response.json()
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'first', 3)
+        create_single_review(user_client, title_id, 'second', 8)
+        Title.objects.update(rating_sum=100, rating_count=1, rating=100)
+
+        call_command('rebuild_ratings')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (11, 2), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'счётчики рейтинга по отзывам.'
+        )
+        assert title.rating == 5.5
+        empty_title = Title.objects.get(pk=titles[1]['id'])
+        assert (empty_title.rating_sum, empty_title.rating_count) == (0, 0)
+        assert empty_title.rating is None
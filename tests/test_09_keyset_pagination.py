@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from content.models import Title
+from reviews.models import Review
+
+
+def walk_pages(client, url, key):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что keyset-пагинация не возвращает ключ `count`.'
+        )
+        pages.append([item[key] for item in data['results']])
+        url = data['next']
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/?pagination=cursor'
+    REVIEWS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/?pagination=cursor'
+    )
+
+    def test_01_titles_keyset_pages(self, client):
+        names = [
+            'Омега', 'Альфа', 'Бета', 'Альфа', 'Гамма', 'Дельта', 'Эпсилон'
+        ]
+        titles = [Title.objects.create(name=name, year=2000) for name in names]
+        expected = [
+            title.id for title in sorted(titles, key=lambda t: (t.name, t.id))
+        ]
+
+        pages = walk_pages(client, self.TITLES_URL, 'id')
+        assert [len(page) for page in pages] == [5, 2]
+        assert sum(pages, []) == expected, (
+            'Проверьте, что keyset-пагинация произведений упорядочивает '
+            'их по `(name, id)` без пропусков и повторов.'
+        )
+
+        first_page = client.get(self.TITLES_URL).json()
+        second_page = client.get(first_page['next']).json()
+        assert first_page['previous'] is None
+        previous_page = client.get(second_page['previous']).json()
+        assert previous_page['results'] == first_page['results']
+        assert previous_page['previous'] is None
+
+    def test_02_titles_keyset_skips_count(self, client):
+        for number in range(7):
+            Title.objects.create(name=f'Title {number}', year=2000)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что keyset-пагинация не выполняет запрос COUNT(*).'
+
+    def test_03_reviews_keyset_pages(self, client, django_user_model):
+        title = Title.objects.create(name='Title', year=2000)
+        reviews = [
+            Review.objects.create(
+                title=title,
+                text=f'review {number}',
+                score=5,
+                author=django_user_model.objects.create_user(
+                    username=f'user{number}',
+                    email=f'user{number}@yamdb.fake'
+                )
+            )
+            for number in range(6)
+        ]
+        Review.objects.filter(pk__in=[r.pk for r in reviews[:3]]).update(
+            pub_date=reviews[0].pub_date
+        )
+        expected = [
+            review.id for review in sorted(
+                Review.objects.all(), key=lambda r: (r.pub_date, r.id),
+                reverse=True
+            )
+        ]
+
+        pages = walk_pages(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title.id), 'id'
+        )
+        assert sum(pages, []) == expected, (
+            'Проверьте, что keyset-пагинация отзывов упорядочивает их по '
+            '`(pub_date, id)` от новых к старым.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_page_number_pagination_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json()
@@ -0,0 +1,46 @@
+import pytest
+
+from content.models import Category, Genre, Title
+
+
+def create_catalog(size):
+    genres = [
+        Genre.objects.create(name=f'Genre {number}', slug=f'genre-{number}')
+        for number in range(3)
+    ]
+    category = Category.objects.create(name='Category', slug='category')
+    for number in range(size):
+        title = Title.objects.create(
+            name=f'Title {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+    return Title.objects.first()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    # COUNT(*) для пагинации, страница произведений, жанры страницы.
+    LIST_QUERIES = 3
+    # Произведение с категорией, его жанры.
+    RETRIEVE_QUERIES = 2
+
+    @pytest.mark.parametrize('size', (1, 5))
+    def test_01_title_list_query_count(self, client, size,
+                                       django_assert_num_queries):
+        create_catalog(size)
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == size
+
+    def test_02_title_retrieve_query_count(self, client,
+                                           django_assert_num_queries):
+        title = create_catalog(1)
+        with django_assert_num_queries(self.RETRIEVE_QUERIES):
+            response = client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert len(response.json()['genre']) == 3
@@ -0,0 +1,107 @@
+import pytest
+from django.db import transaction
+
+from content.models import Category, Genre, Title
+from reviews.models import Comment, Review
+
+
+@pytest.fixture
+def title(user):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Title', year=2000, category=category)
+    title.genre.set([genre])
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_repeated_get_served_from_cache(self, client, title,
+                                               django_assert_num_queries):
+        urls = (
+            self.TITLES_URL,
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            expected = client.get(url).json()
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.json() == expected, (
+                f'Проверьте, что закэшированный ответ `{url}` совпадает '
+                'с исходным.'
+            )
+
+    def test_02_review_write_invalidates_title(self, client, title, user):
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(detail_url).json()['rating'] is None
+        assert client.get(reviews_url).json()['count'] == 0
+
+        review = Review.objects.create(
+            title=title, author=user, text='text', score=7
+        )
+
+        assert client.get(detail_url).json()['rating'] == 7
+        assert client.get(self.TITLES_URL).json()['results'][0]['rating'] == 7
+        assert client.get(reviews_url).json()['count'] == 1
+
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        assert client.get(comments_url).json()['count'] == 0
+        Comment.objects.create(review=review, author=user, text='comment')
+        assert client.get(comments_url).json()['count'] == 1
+
+    def test_03_related_writes_invalidate_titles(self, client, title):
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        client.get(self.TITLES_URL)
+        client.get(detail_url)
+
+        Category.objects.filter(pk=title.category_id).get().delete()
+        assert client.get(detail_url).json()['category'] is None
+        assert client.get(self.TITLES_URL).json()['results'][0][
+            'category'] is None
+
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        title.genre.add(comedy)
+        genres = {genre['slug'] for genre in client.get(detail_url).json()[
+            'genre']}
+        assert genres == {'drama', 'comedy'}
+
+    def test_04_cache_key_depends_on_role(self, client, admin_client, title):
+        client.get(self.TITLES_URL)
+        Title.objects.filter(pk=title.pk).update(name='Renamed')
+        assert client.get(self.TITLES_URL).json()['results'][0][
+            'name'] == 'Title'
+        assert admin_client.get(self.TITLES_URL).json()['results'][0][
+            'name'] == 'Renamed'
+
+    def test_05_invalidated_after_commit(self, client, title):
+        categories_url = '/api/v1/categories/'
+        assert client.get(categories_url).json()['count'] == 1
+        with transaction.atomic():
+            Category.objects.create(name='Книга', slug='books')
+            # Другие соединения ещё видят старые строки: ответ должен
+            # остаться прежним, а не закэшироваться под новой версией.
+            assert client.get(categories_url).json()['count'] == 1, (
+                'Проверьте, что кэш ответов сбрасывается только после '
+                'фиксации транзакции.'
+            )
+            transaction.set_rollback(True)
+        assert client.get(categories_url).json()['count'] == 1, (
+            'Проверьте, что откаченная запись не попадает в кэш ответов.'
+        )
+        with transaction.atomic():
+            Category.objects.create(name='Книга', slug='books')
+        assert client.get(categories_url).json()['count'] == 2
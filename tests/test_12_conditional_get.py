@@ -0,0 +1,131 @@
+import itertools
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.utils.http import http_date
+
+from content.models import Title
+from reviews.models import Review
+
+
+@pytest.fixture
+def later(monkeypatch):
+    """Часы модуля кэша на две секунды впереди последних изменений."""
+    monkeypatch.setattr('api.cache.time', SimpleNamespace(
+        time=lambda: time.time() + 2, time_ns=time.time_ns
+    ))
+
+
+@pytest.fixture
+def same_second(monkeypatch):
+    """Все изменения и запросы модуля кэша приходятся на одну секунду."""
+    now = int(time.time())
+    versions = itertools.count(now * 10 ** 9)
+    monkeypatch.setattr('api.cache.time', SimpleNamespace(
+        time=lambda: now + 0.5, time_ns=lambda: next(versions)
+    ))
+    return now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_if_none_match(self, client, user,
+                              django_assert_num_queries):
+        title = Title.objects.create(name='Title', year=2000)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'сильный ETag.'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что на GET-запрос с совпадающим `If-None-Match` '
+            'возвращается ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+        assert not response.content
+
+        Review.objects.create(title=title, author=user, text='t', score=3)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response['ETag'] != etag
+        assert response.json()['rating'] == 3
+
+    def test_02_if_modified_since(self, client, later):
+        title = Title.objects.create(name='Title', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url)
+        assert response.has_header('Last-Modified')
+        last_modified = response['Last-Modified']
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2015 00:00:00 GMT'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_etag_depends_on_role(self, client, admin_client):
+        title = Title.objects.create(name='Title', year=2000)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(url)['ETag'] != admin_client.get(url)['ETag']
+        assert 'Authorization' in client.get(url)['Vary']
+
+    def test_04_same_second_writes(self, client, user, same_second):
+        title = Title.objects.create(name='Title', year=2000)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url)
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдаётся, пока не закончилась '
+            'секунда последнего изменения.'
+        )
+        Review.objects.create(title=title, author=user, text='t', score=3)
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(same_second)
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись в ту же секунду не даёт ответа 304.'
+        )
+        assert response.json()['rating'] == 3
+
+    def test_05_invalid_conditions(self, client, later):
+        title = Title.objects.create(name='Title', year=2000)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        future = http_date(time.time() + 3600)
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=future)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что дата If-Modified-Since из будущего '
+            'не учитывается.'
+        )
+        last_modified = response['Last-Modified']
+        response = client.get(
+            url, HTTP_IF_NONE_MATCH='"other"',
+            HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что при обоих заголовках проверяется If-None-Match.'
+        )
+
+        missing_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=title.id + 1
+        )
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': '*'},
+            {'HTTP_IF_MODIFIED_SINCE': last_modified},
+        ):
+            response = client.get(missing_url, **headers)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что на запрос к отсутствующему объекту '
+                'не возвращается 304.'
+            )
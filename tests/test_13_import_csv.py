@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+
+from content.models import Category, Genre, Title, TitleGenre
+from reviews.models import Comment, Review
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCsv:
+
+    def test_01_import_static_data(self):
+        call_command('import_csv', batch_size=10)
+
+        assert User.objects.count() == 5
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 15
+        assert Title.objects.count() == 32
+        assert TitleGenre.objects.count() == 42
+        assert Review.objects.count() == 72, (
+            'Проверьте, что импорт корректно читает многострочные отзывы.'
+        )
+        assert Comment.objects.count() == 3
+
+        comment = Comment.objects.get(pk=1)
+        assert comment.pub_date.year == 2020, (
+            'Проверьте, что импорт сохраняет `pub_date` из файла.'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после импорта пересчитываются счётчики рейтинга.'
+        )
+
+        category = Category.objects.create(name='Новая', slug='new')
+        assert category.pk > 3, (
+            'Проверьте, что после импорта сдвигаются счётчики id.'
+        )
+
+    def test_02_failed_table_is_rolled_back(self, tmp_path):
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n2,Комедия,drama\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        call_command('import_csv', data_dir=tmp_path)
+
+        assert Genre.objects.count() == 0
+        assert Category.objects.count() == 1
+
+    def test_03_response_cache_invalidated(self, client, settings):
+        settings.API_CACHE_ENABLED = True
+        urls = ('/api/v1/categories/', '/api/v1/genres/', '/api/v1/titles/')
+        for url in urls:
+            assert client.get(url).json()['count'] == 0
+        call_command('import_csv', batch_size=10)
+        for url in urls:
+            assert client.get(url).json()['count'] > 0, (
+                f'Проверьте, что после импорта кэш ответа `{url}` сброшен.'
+            )
+        title = Title.objects.get(pk=1)
+        assert client.get(
+            f'/api/v1/titles/{title.pk}/reviews/'
+        ).json()['count'] == title.reviews.count()
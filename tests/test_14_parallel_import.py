@@ -0,0 +1,51 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from core.datasets import CSV_DIR
+from core.models import ImportCheckpoint
+from core.parallel_import import split_records
+from reviews.models import Review
+
+
+@pytest.mark.parametrize('chunk_bytes', (1, 500, 4000, 10 ** 9))
+def test_split_records_keeps_multiline_rows(chunk_bytes):
+    path = CSV_DIR / 'review.csv'
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        expected = list(csv.reader(csv_file))[1:]
+
+    rows = []
+    with open(path, 'rb') as csv_file:
+        for start, end in split_records(path, chunk_bytes):
+            csv_file.seek(start)
+            text = csv_file.read(end - start).decode('utf-8')
+            rows.extend(csv.reader(text.splitlines(keepends=True)))
+    assert rows == expected, (
+        'Проверьте, что фрагменты файла не разрывают многострочные записи.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ParallelImport:
+
+    def test_01_parallel_import_resumes(self):
+        options = {'parallel': True, 'workers': 2, 'chunk_bytes': 3000}
+        call_command('import_csv', **options)
+        assert Review.objects.count() == 72
+
+        checkpoint = ImportCheckpoint.objects.filter(
+            file_name='review.csv'
+        ).order_by('start').last()
+        assert checkpoint.rows > 0
+        checkpoint.delete()
+        Review.objects.order_by('-pk')[0].delete()
+
+        call_command('import_csv', **options)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный запуск догружает незавершённые '
+            'фрагменты и пропускает уже загруженные строки.'
+        )
+        assert ImportCheckpoint.objects.filter(
+            file_name='review.csv', start=checkpoint.start
+        ).exists()
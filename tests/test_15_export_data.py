@@ -0,0 +1,44 @@
+import csv
+import json
+
+import pytest
+from django.core.management import call_command
+
+from core.datasets import CSV_DIR, DATASETS
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ExportData:
+
+    def test_01_csv_export_matches_import_layout(self, tmp_path):
+        call_command('import_csv')
+        call_command('export_data', output_dir=tmp_path, chunk_size=7)
+
+        for dataset in DATASETS:
+            with open(CSV_DIR / dataset.file_name, newline='',
+                      encoding='utf-8') as source:
+                expected = list(csv.reader(source))
+            with open(tmp_path / dataset.file_name, newline='',
+                      encoding='utf-8') as exported:
+                rows = list(csv.reader(exported))
+            assert rows[0] == expected[0], (
+                f'Проверьте, что выгрузка `{dataset.file_name}` сохраняет '
+                'порядок колонок исходного файла.'
+            )
+            assert sorted(rows[1:]) == sorted(expected[1:]), (
+                f'Проверьте, что выгрузка `{dataset.file_name}` совпадает '
+                'с загруженными данными.'
+            )
+        assert not list(tmp_path.glob('*.part'))
+
+    def test_02_ndjson_export(self, tmp_path):
+        call_command('import_csv')
+        call_command('export_data', output_dir=tmp_path, format='ndjson')
+
+        with open(tmp_path / 'review.ndjson', encoding='utf-8') as exported:
+            records = [json.loads(line) for line in exported]
+        assert len(records) == 72
+        assert set(records[0]) == {
+            'id', 'title_id', 'text', 'author_id', 'score', 'pub_date'
+        }
+        assert records[0]['pub_date'].endswith('Z')
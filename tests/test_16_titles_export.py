@@ -0,0 +1,63 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from content.models import Category, Genre, Title
+from reviews.models import Review
+
+
+def read_ndjson(response):
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitlesExport:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def test_01_export_permissions(self, client, user_client,
+                                   moderator_client):
+        assert client.get(self.EXPORT_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(self.EXPORT_URL).status_code == (
+                HTTPStatus.FORBIDDEN
+            )
+
+    def test_02_export_streams_filtered_catalog(self, admin_client, user,
+                                                django_assert_max_num_queries):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(1203):
+            Title.objects.create(
+                name=f'Film {number}', year=2000, category=films
+            )
+        book = Title.objects.create(name='Book', year=2000, category=books)
+        book.genre.set([drama])
+        Review.objects.create(title=book, author=user, text='t', score=8)
+
+        response = admin_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        # Три порции по 500 объектов (сами объекты и их жанры)
+        # и запрос, вернувший пустую порцию.
+        with django_assert_max_num_queries(2 * 3 + 1):
+            titles = read_ndjson(response)
+        assert len(titles) == 1204
+
+        response = admin_client.get(self.EXPORT_URL, {'category': 'books'})
+        titles = read_ndjson(response)
+        assert titles == [{
+            'id': book.id,
+            'name': 'Book',
+            'year': 2000,
+            'description': None,
+            'rating': 8,
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+            'category': {'name': 'Книга', 'slug': 'books'},
+        }]
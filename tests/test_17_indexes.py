@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.db import connection
+
+from content.filters import TitlesFilter
+from content.models import Title
+from reviews.models import Comment, Review
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Планы запросов проверяются в формате SQLite.'
+)
+
+
+def get_plan(queryset):
+    return queryset.explain()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Indexes:
+
+    def assert_uses_index(self, queryset, index_name):
+        plan = get_plan(queryset)
+        assert index_name in plan, (
+            f'Проверьте, что запрос использует индекс `{index_name}`. '
+            f'План запроса:\n{plan}'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что сортировка выполняется по индексу, а не '
+            f'отдельным шагом. План запроса:\n{plan}'
+        )
+
+    def test_01_reviews_by_title(self):
+        queryset = Review.objects.filter(title_id=1).order_by('-pub_date')
+        self.assert_uses_index(queryset, 'review_title_pub_date_idx')
+
+    def test_02_reviews_keyset_page(self):
+        queryset = Review.objects.filter(
+            title_id=1,
+            pub_date__lt=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        ).order_by('-pub_date', '-id')[:5]
+        self.assert_uses_index(queryset, 'review_title_pub_date_idx')
+
+    def test_03_comments_by_review(self):
+        queryset = Comment.objects.filter(review_id=1).order_by('-pub_date')
+        self.assert_uses_index(queryset, 'comment_review_pub_date_idx')
+
+    def test_04_comments_keyset_page(self):
+        queryset = Comment.objects.filter(
+            review_id=1,
+            pub_date__lt=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        ).order_by('-pub_date', '-id')[:5]
+        self.assert_uses_index(queryset, 'comment_review_pub_date_idx')
+
+    def test_05_titles_by_year(self):
+        plan = get_plan(Title.objects.filter(year=2000).order_by())
+        assert 'content_title_year' in plan, (
+            'Проверьте, что фильтр по `year` использует индекс. '
+            f'План запроса:\n{plan}'
+        )
+
+    def test_06_titles_ordered_by_name(self):
+        self.assert_uses_index(
+            Title.objects.order_by('name')[:10], 'title_name_idx'
+        )
+
+    def test_07_titles_name_prefix(self):
+        queryset = Title.objects.filter(
+            name__gte='Ал', name__lt='Ал' + chr(0x10FFFF)
+        ).order_by('name')
+        self.assert_uses_index(queryset, 'title_name_idx')
+
+    def test_08_name_prefix_filter(self, client):
+        for name in ('Альфа', 'Алмаз', 'Бета', 'алый'):
+            Title.objects.create(name=name, year=2000)
+        response = client.get('/api/v1/titles/?name_prefix=Ал')
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Алмаз', 'Альфа'], (
+            'Проверьте, что фильтр `name_prefix` находит произведения по '
+            'началу названия.'
+        )
+
+    def test_09_name_prefix_without_binary_collation(self, monkeypatch):
+        # На других БД диапазон зависит от правил сравнения строк.
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        queryset = TitlesFilter(
+            {'name_prefix': 'Ал'}, queryset=Title.objects.all()
+        ).qs
+        sql = str(queryset.query)
+        assert 'LIKE' in sql and '<' not in sql, (
+            'Проверьте, что вне SQLite префикс ищется через `startswith`, '
+            'а не диапазоном.'
+        )
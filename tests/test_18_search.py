@@ -0,0 +1,156 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from content.models import Title
+from reviews.models import Comment, Review
+from search.backends import (
+    Fts5SearchBackend, InvertedIndexSearchBackend, get_backend
+)
+from search.models import SearchDocument
+
+SEARCH_URL = '/api/v1/search/'
+
+
+@pytest.fixture(params=['fts5', 'python'])
+def search_backend(request, settings):
+    settings.SEARCH_FTS5_ENABLED = request.param == 'fts5'
+    return request.param
+
+
+@pytest.fixture
+def catalog(search_backend, django_user_model):
+    author = django_user_model.objects.create_user(
+        username='author', email='author@yamdb.fake'
+    )
+    dune = Title.objects.create(
+        name='Дюна', year=1965,
+        description='Пустынная планета и пряность.'
+    )
+    solaris = Title.objects.create(
+        name='Солярис', year=1961,
+        description='Океан планеты Солярис изучают учёные.'
+    )
+    review = Review.objects.create(
+        title=dune, author=author, score=9,
+        text='Лучшая книга о пустыне и планете.'
+    )
+    comment = Comment.objects.create(
+        review=review, author=author, text='Согласен, про пряность отлично.'
+    )
+    return {
+        'dune': dune, 'solaris': solaris, 'review': review,
+        'comment': comment,
+    }
+
+
+def search(client, query, **params):
+    response = client.get(SEARCH_URL, {'q': query, **params})
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что поиск доступен без авторизации.'
+    )
+    return response.json()
+
+
+def found(data):
+    return [(item['type'], item['id']) for item in data['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Search:
+
+    def test_01_backend_selection(self, search_backend):
+        expected = {
+            'fts5': Fts5SearchBackend, 'python': InvertedIndexSearchBackend
+        }[search_backend]
+        assert isinstance(get_backend(), expected)
+
+    def test_02_search_all_kinds(self, client, catalog):
+        data = search(client, 'пряность')
+        assert data['count'] == 2
+        assert set(found(data)) == {
+            ('title', catalog['dune'].id),
+            ('comment', catalog['comment'].id),
+        }, (
+            'Проверьте, что поиск находит произведения, отзывы и '
+            'комментарии по их текстам.'
+        )
+        comment = next(
+            item for item in data['results'] if item['type'] == 'comment'
+        )
+        assert comment['title_id'] == catalog['dune'].id
+        assert comment['review_id'] == catalog['review'].id
+
+    def test_03_ranking_prefers_heading(self, client, catalog):
+        data = search(client, 'солярис')
+        assert found(data)[0] == ('title', catalog['solaris'].id)
+
+        data = search(client, 'планета')
+        assert found(data) == [('title', catalog['dune'].id)], (
+            'Проверьте, что поиск ищет слова целиком.'
+        )
+
+    def test_04_all_terms_required(self, client, catalog):
+        data = search(client, 'книга пустыне')
+        assert found(data) == [('review', catalog['review'].id)]
+        assert search(client, 'книга океан')['count'] == 0
+
+    def test_05_type_filter(self, client, catalog):
+        data = search(client, 'пряность', type='comment')
+        assert found(data) == [('comment', catalog['comment'].id)]
+
+    def test_06_index_follows_changes(self, client, catalog):
+        solaris = catalog['solaris']
+        solaris.name = 'Пикник на обочине'
+        solaris.save()
+        assert search(client, 'солярис')['count'] == 1
+        assert found(search(client, 'обочине')) == [('title', solaris.id)]
+
+        catalog['dune'].delete()
+        assert search(client, 'пряность')['count'] == 0
+        assert not SearchDocument.objects.filter(
+            title_id=catalog['dune'].id
+        ).exists(), (
+            'Проверьте, что удаление произведения убирает из индекса его '
+            'отзывы и комментарии.'
+        )
+
+    def test_07_pagination(self, client, search_backend):
+        for number in range(7):
+            Title.objects.create(name=f'Сага {number}', year=2000)
+        data = search(client, 'сага')
+        assert data['count'] == 7
+        assert len(data['results']) == 5
+        second = client.get(data['next']).json()
+        assert len(second['results']) == 2
+        ids = {item['id'] for item in data['results'] + second['results']}
+        assert len(ids) == 7
+
+    def test_08_query_is_required(self, client):
+        response = client.get(SEARCH_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_09_operators_are_not_parsed(self, client, catalog):
+        data = search(client, '"дюна" OR NEAR(*')
+        assert data['count'] == 0
+
+    def test_10_rebuild_command(self, client, catalog):
+        Title.objects.filter(pk=catalog['solaris'].pk).update(name='Сталкер')
+        assert search(client, 'сталкер')['count'] == 0
+        call_command('rebuild_search_index')
+        assert found(search(client, 'сталкер')) == [
+            ('title', catalog['solaris'].id)
+        ]
+        assert SearchDocument.objects.count() == 4
+
+    def test_11_cyrillic_and_diacritics(self, client, catalog):
+        hero = Title.objects.create(
+            name='Мой герой', year=2000,
+            description='Ёжик в тумане заходит в Café.'
+        )
+        for query in ('герой', 'Мой', 'МОЙ ГЕРОЙ', 'ёжик', 'ЁЖИК', 'cafe'):
+            assert found(search(client, query)) == [('title', hero.id)], (
+                'Проверьте, что поиск находит слова с й и ё и слова '
+                f'с латинской диакритикой: `{query}`.'
+            )
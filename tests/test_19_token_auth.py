@@ -0,0 +1,182 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.models import User
+from users.services.auth_version_service import auth_version_service
+from users.tokens import RoleAccessToken
+from content.models import Title
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Кэш Django, общий для всех процессов, как Redis."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }
+    }
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'users_user' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TokenAuth:
+
+    def test_01_admin_write_without_user_query(self, shared_cache, admin):
+        client = get_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/categories/', {'name': 'Фильмы', 'slug': 'films'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert user_queries(context) == [], (
+            'Проверьте, что пользователь запроса строится из токена без '
+            'обращения к таблице пользователей.'
+        )
+
+    def test_02_review_without_user_query(self, shared_cache, user):
+        title = Title.objects.create(name='Title', year=2000)
+        client = get_client(user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'Отзыв', 'score': 7}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        assert user_queries(context) == []
+
+    def test_03_role_change_outdates_token(self, user):
+        client = get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+
+        user.role = user.RoleChoices.ADMIN
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли старый токен отклоняется.'
+        )
+        response = get_client(user).get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_profile_change_keeps_token(self, user):
+        client = get_client(user)
+        user.bio = 'new bio'
+        user.save()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == 'new bio', (
+            'Проверьте, что `/users/me/` загружает полный профиль из БД.'
+        )
+
+    def test_05_deleted_user_token_rejected(self, user):
+        client = get_client(user)
+        user.delete()
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_06_cache_miss_falls_back_to_database(self, shared_cache,
+                                                  moderator):
+        client = get_client(moderator)
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(user_queries(context)) == 1
+
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/categories/')
+        assert user_queries(context) == []
+
+    def test_07_outdated_token_rejected_after_cache_miss(self, user):
+        client = get_client(user)
+        user.role = user.RoleChoices.MODERATOR
+        user.save()
+        cache.clear()
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_08_local_cache_checks_database(self, user, monkeypatch):
+        client = get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/categories/')
+        assert len(user_queries(context)) == 1, (
+            'Проверьте, что без общего хранилища пользователь токена '
+            'проверяется по БД.'
+        )
+
+        # Другой процесс со своим пустым кэшем меняет роль пользователя.
+        with monkeypatch.context() as other_process:
+            other_process.setattr(
+                'core.cache.cache', LocMemCache('other-process', {})
+            )
+            user.role = user.RoleChoices.ADMIN
+            user.save()
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что смена роли в другом процессе отклоняет '
+            'старый токен.'
+        )
+
+    def test_09_rolled_back_role_change_keeps_token(self, shared_cache,
+                                                    user):
+        client = get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        with transaction.atomic():
+            user.role = user.RoleChoices.ADMIN
+            user.save()
+            assert auth_version_service.get(user.pk) == '0', (
+                'Проверьте, что версия доступа попадает в кэш только '
+                'после фиксации транзакции.'
+            )
+            transaction.set_rollback(True)
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что откаченная смена роли не отклоняет токен.'
+        )
+
+    def test_10_queryset_update_outdates_token(self, shared_cache, user):
+        client = get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что `QuerySet.update(is_active=False)` отклоняет '
+            'выданные токены.'
+        )
+        User.objects.filter(pk=user.pk).update(bio='bio')
+        assert User.objects.get(pk=user.pk).auth_version == 1
+
+    def test_11_stale_read_does_not_overwrite_version(self, shared_cache,
+                                                      user):
+        client = get_client(user)
+        user.role = user.RoleChoices.MODERATOR
+        user.save()
+        # Запрос, прочитавший пользователя до смены роли.
+        auth_version_service.remember(user.pk, 0)
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что версия, прочитанная до смены роли, не '
+            'перезаписывает новую в кэше.'
+        )
@@ -0,0 +1,86 @@
+import pytest
+from django.conf import settings
+from redis import Redis
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from users.exceptions import CodeNotFoundError, InvalidCodeError
+from users.services.redis_config import redis_pool
+from users.services.verification_service import VerificationService
+
+
+class ScriptRedis:
+    """Redis, выполняющий только скрипт проверки кода, со счётчиком вызовов."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    def setex(self, key, ttl, value):
+        self.calls.append('setex')
+        self.data[key] = value
+
+    def register_script(self, script):
+        def check(keys, args):
+            self.calls.append('script')
+            stored = self.data.get(keys[0])
+            if stored is None:
+                return -1
+            if stored != args[0]:
+                return 0
+            del self.data[keys[0]]
+            return 1
+        return check
+
+
+def get_service(client):
+    service = VerificationService(client)
+    service.use_redis = True
+    return service
+
+
+class Test20VerificationRedis:
+
+    def test_01_pool_from_settings(self):
+        kwargs = redis_pool.connection_kwargs
+        assert redis_pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+        assert kwargs['socket_timeout'] == settings.REDIS_SOCKET_TIMEOUT
+        assert kwargs['socket_connect_timeout'] == (
+            settings.REDIS_SOCKET_CONNECT_TIMEOUT
+        )
+        assert kwargs['health_check_interval'] == (
+            settings.REDIS_HEALTH_CHECK_INTERVAL
+        )
+        assert kwargs['retry']._retries == settings.REDIS_RETRIES
+
+    def test_02_check_is_single_round_trip(self):
+        client = ScriptRedis()
+        service = get_service(client)
+        code = service.generate('user')
+        client.calls.clear()
+
+        with pytest.raises(InvalidCodeError):
+            service.check_code('0' * 7, 'user')
+        assert service.check_code(code, 'user') is True
+        assert client.calls == ['script', 'script'], (
+            'Проверьте, что проверка кода выполняется одним атомарным '
+            'запросом к Redis.'
+        )
+        with pytest.raises(CodeNotFoundError):
+            service.check_code(code, 'user')
+
+    def test_03_local_fallback_when_redis_is_down(self):
+        client = Redis(
+            host='127.0.0.1', port=1, socket_connect_timeout=0.1,
+            retry=Retry(NoBackoff(), 0)
+        )
+        service = get_service(client)
+        code = service.generate('user')
+        assert code, (
+            'Проверьте, что при недоступном Redis код сохраняется локально.'
+        )
+        with pytest.raises(InvalidCodeError):
+            service.check_code('0' * 7, 'user')
+        assert service.check_code(code, 'user') is True
+        with pytest.raises(CodeNotFoundError):
+            service.check_code(code, 'user')
@@ -0,0 +1,94 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from redis import Redis
+
+from users.exceptions import CodeNotFoundError, InvalidCodeError
+from users.constants import CODE_MATCHED, CODE_MISMATCH, CODE_MISSING
+from users.services.code_stores import MemoryCodeStore, SQLiteCodeStore
+from users.services.verification_service import VerificationService
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def check_in_process(args):
+    path, code = args
+    return SQLiteCodeStore(path, 10).check('user', code)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCodeStore(max_size=3)
+    return SQLiteCodeStore(tmp_path / 'codes.sqlite3', max_size=3)
+
+
+class Test21CodeStores:
+
+    def test_01_check_deletes_matched_code(self, store):
+        store.set('user', '123456', 300)
+        assert store.check('user', '000000') == CODE_MISMATCH
+        assert store.check('user', '123456') == CODE_MATCHED
+        assert store.check('user', '123456') == CODE_MISSING
+
+    def test_02_size_cap_evicts_least_recently_used(self, store):
+        for number in range(3):
+            store.set(f'user{number}', '111111', 300)
+        store.check('user0', '000000')
+        store.set('user3', '111111', 300)
+        assert store.check('user1', '111111') == CODE_MISSING, (
+            'Проверьте, что при переполнении вытесняется код, который '
+            'использовали дольше всего назад.'
+        )
+        for key in ('user0', 'user2', 'user3'):
+            assert store.check(key, '111111') == CODE_MATCHED
+
+    def test_03_one_match_under_concurrency(self, store):
+        store.set('user', '123456', 300)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: store.check('user', '123456'), range(16)
+            ))
+        assert results.count(CODE_MATCHED) == 1, (
+            'Проверьте, что код подтверждения можно использовать только '
+            'один раз.'
+        )
+
+    def test_04_memory_codes_expire(self):
+        clock = Clock()
+        store = MemoryCodeStore(max_size=10, clock=clock)
+        store.set('user', '123456', 300)
+        clock.now = 300
+        assert store.check('user', '123456') == CODE_MISSING
+        assert len(store) == 0
+
+    def test_05_sqlite_codes_expire(self, tmp_path):
+        store = SQLiteCodeStore(tmp_path / 'codes.sqlite3', max_size=10)
+        store.set('user', '123456', 0)
+        assert store.check('user', '123456') == CODE_MISSING
+
+    def test_06_sqlite_store_is_shared_between_processes(self, tmp_path):
+        path = tmp_path / 'codes.sqlite3'
+        SQLiteCodeStore(path, 10).set('user', '123456', 300)
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            results = pool.map(check_in_process, [(path, '123456')] * 8)
+        assert results.count(CODE_MATCHED) == 1
+        assert results.count(CODE_MISSING) == 7
+
+    def test_07_service_uses_local_store(self, store):
+        service = VerificationService(Redis(), local_store=store)
+        service.use_redis = False
+        code = service.generate('user')
+        with pytest.raises(InvalidCodeError):
+            service.check_code('0' * 7, 'user')
+        assert service.check_code(code, 'user') is True
+        with pytest.raises(CodeNotFoundError):
+            service.check_code(code, 'user')
@@ -0,0 +1,138 @@
+from datetime import timedelta
+from http import HTTPStatus
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.utils import timezone
+
+from users.models import EmailOutbox
+from users.services.email_outbox import OutboxSender
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, считающий подключения и отказывающий по адресу."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(to.startswith('broken') for to in message.to):
+                raise SMTPException('Mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def outbox_settings(settings):
+    settings.EMAIL_OUTBOX_ENABLED = True
+    settings.EMAIL_BACKEND = (
+        'tests.test_22_email_outbox.CountingBackend'
+    )
+    CountingBackend.opened = 0
+    return settings
+
+
+def signup(client, username):
+    return client.post(SIGNUP_URL, data={
+        'username': username, 'email': f'{username}@yamdb.fake'
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22EmailOutbox:
+
+    def test_01_signup_does_not_send(self, client, outbox_settings):
+        response = signup(client, 'reader')
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при включённой очереди письмо не отправляется '
+            'во время запроса регистрации.'
+        )
+        email = EmailOutbox.objects.get()
+        assert email.recipient == 'reader@yamdb.fake'
+        assert email.status == EmailOutbox.StatusChoices.PENDING
+
+    def test_02_batch_over_one_connection(self, client, outbox_settings):
+        for number in range(3):
+            signup(client, f'reader{number}')
+        call_command('send_outbox_emails')
+        assert len(mail.outbox) == 3
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно '
+            'подключение к почтовому серверу.'
+        )
+        assert not EmailOutbox.objects.exclude(
+            status=EmailOutbox.StatusChoices.SENT
+        ).exists()
+
+    def test_03_failed_email_is_retried(self, client, outbox_settings):
+        signup(client, 'reader')
+        signup(client, 'broken')
+        sender = OutboxSender(max_attempts=2, retry_delay=60)
+        assert sender.send_pending() == (1, 1)
+        broken = EmailOutbox.objects.get(recipient='broken@yamdb.fake')
+        assert broken.status == EmailOutbox.StatusChoices.PENDING
+        assert broken.attempts == 1
+        assert broken.next_attempt_at > timezone.now() + timedelta(
+            seconds=50
+        )
+        assert 'Mailbox unavailable' in broken.last_error
+
+        assert sender.send_pending() == (0, 0), (
+            'Проверьте, что повтор откладывается до `next_attempt_at`.'
+        )
+        EmailOutbox.objects.filter(pk=broken.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        assert sender.send_pending() == (0, 1)
+        broken.refresh_from_db()
+        assert broken.status == EmailOutbox.StatusChoices.FAILED
+        assert len(mail.outbox) == 1
+
+    def test_04_user_kept_when_mail_server_fails(
+        self, client, outbox_settings, django_user_model
+    ):
+        response = signup(client, 'broken')
+        assert response.status_code == HTTPStatus.OK
+        assert django_user_model.objects.filter(username='broken').exists()
+
+    def test_05_signup_is_atomic(self, client, outbox_settings,
+                                 django_user_model, monkeypatch):
+        def broken_enqueue(**kwargs):
+            raise DatabaseError('outbox is unavailable')
+
+        monkeypatch.setattr(
+            'users.services.verification_service.enqueue_email',
+            broken_enqueue
+        )
+        with pytest.raises(DatabaseError):
+            signup(client, 'reader')
+        assert not django_user_model.objects.filter(
+            username='reader'
+        ).exists(), (
+            'Проверьте, что пользователь и письмо в очереди сохраняются '
+            'в одной транзакции.'
+        )
+
+    def test_06_email_leased_once(self, client, outbox_settings):
+        signup(client, 'reader')
+        signup(client, 'writer')
+        now = timezone.now()
+        # Оба обработчика выбрали письма до того, как первый их занял.
+        selected = list(EmailOutbox.objects.all())
+        assert len(OutboxSender().lease(selected, now)) == 2
+        assert OutboxSender().lease(selected, now) == [], (
+            'Проверьте, что письмо, занятое другим обработчиком, '
+            'не отправляется повторно.'
+        )
+        assert OutboxSender().send_pending() == (0, 0)
+        assert len(mail.outbox) == 0
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+def user_selects(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and 'users_user' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23AuthQueries:
+
+    def signup(self, client, username, email):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                SIGNUP_URL, data={'username': username, 'email': email}
+            )
+        return response, context
+
+    def test_01_signup_new_user(self, client):
+        response, context = self.signup(client, 'reader', 'reader@yamdb.fake')
+        assert response.status_code == HTTPStatus.OK
+        assert len(user_selects(context)) == 1, (
+            'Проверьте, что регистрация проверяет конфликты одним запросом.'
+        )
+
+    @pytest.mark.parametrize('username, email, status, field', [
+        ('reader', 'reader@yamdb.fake', HTTPStatus.OK, None),
+        ('other', 'reader@yamdb.fake', HTTPStatus.BAD_REQUEST, 'email'),
+        ('reader', 'other@yamdb.fake', HTTPStatus.BAD_REQUEST, 'username'),
+        ('writer', 'reader@yamdb.fake', HTTPStatus.BAD_REQUEST, 'email'),
+    ])
+    def test_02_signup_conflicts(
+        self, client, django_user_model, username, email, status, field
+    ):
+        django_user_model.objects.create_user(
+            username='reader', email='reader@yamdb.fake'
+        )
+        django_user_model.objects.create_user(
+            username='writer', email='writer@yamdb.fake'
+        )
+        response, context = self.signup(client, username, email)
+        assert response.status_code == status
+        if field:
+            assert field in response.json()
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что все случаи конфликта при регистрации '
+            'определяются одним запросом.'
+        )
+
+    def test_03_token_fetches_user_once(self, client):
+        response, _ = self.signup(client, 'reader', 'reader@yamdb.fake')
+        assert response.status_code == HTTPStatus.OK
+        code = mail.outbox[-1].body.split()[-1]
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(TOKEN_URL, data={
+                'username': 'reader', 'confirmation_code': code
+            })
+        assert response.status_code == HTTPStatus.OK
+        assert 'token' in response.json()
+        assert len(user_selects(context)) == 1, (
+            'Проверьте, что при выдаче токена пользователь загружается '
+            'из БД один раз.'
+        )
+
+    def test_04_token_unknown_user(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(TOKEN_URL, data={
+                'username': 'nobody', 'confirmation_code': '123456'
+            })
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert len(context.captured_queries) == 1
@@ -0,0 +1,206 @@
+from http import HTTPStatus
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from api.throttling import (
+    MemoryRateLimiter,
+    RateLimiter,
+    RedisRateLimiter,
+    parse_rate,
+)
+from content.models import Title
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenRedis:
+
+    def register_script(self, script):
+        def run(keys, args):
+            raise ConnectionError('Redis is down')
+        return run
+
+
+class ScriptRedis:
+
+    def __init__(self, wait):
+        self.wait = wait
+        self.calls = []
+
+    def register_script(self, script):
+        def run(keys, args):
+            self.calls.append((keys, args))
+            return self.wait
+        return run
+
+
+def signup(client, username, ip='10.0.0.1'):
+    return client.post(
+        SIGNUP_URL,
+        data={'username': username, 'email': f'{username}@yamdb.fake'},
+        REMOTE_ADDR=ip
+    )
+
+
+class Test24RateLimiter:
+
+    def test_01_parse_rate(self):
+        assert parse_rate('5/min') == (5, 5 / 60)
+        assert parse_rate('10/s') == (10, 10)
+        assert parse_rate('24/day') == (24, 24 / 86400)
+
+    def test_02_memory_bucket_refills(self):
+        clock = FakeClock()
+        limiter = MemoryRateLimiter(10, clock=clock)
+        rate = parse_rate('2/min')
+        assert limiter.acquire('key', rate) == 0
+        assert limiter.acquire('key', rate) == 0
+        assert limiter.acquire('key', rate) == pytest.approx(30), (
+            'Проверьте, что при пустом ведре возвращается время до '
+            'появления следующего токена.'
+        )
+        clock.now = 30
+        assert limiter.acquire('key', rate) == 0, (
+            'Проверьте, что ведро наполняется со временем.'
+        )
+        assert limiter.acquire('key', rate) > 0
+
+    def test_03_memory_buckets_are_capped(self):
+        limiter = MemoryRateLimiter(2, clock=FakeClock())
+        rate = parse_rate('1/min')
+        limiter.acquire('first', rate)
+        limiter.acquire('second', rate)
+        limiter.acquire('third', rate)
+        assert limiter.acquire('first', rate) == 0, (
+            'Проверьте, что давно не использованные ведра вытесняются.'
+        )
+        assert limiter.acquire('third', rate) > 0
+
+    def test_04_redis_wait_in_seconds(self, settings):
+        settings.REDIS_ENABLED = True
+        client = ScriptRedis(wait=1500)
+        limiter = RateLimiter(client, 10)
+        assert limiter.acquire('key', parse_rate('1/min')) == 1.5
+        keys, args = client.calls[0]
+        assert keys == ['throttle:key']
+        assert args[:2] == [1, 1 / 60]
+        assert RedisRateLimiter(ScriptRedis(wait=0)).acquire(
+            'key', parse_rate('1/min')
+        ) == 0
+
+    def test_05_fallback_without_redis(self, settings):
+        settings.REDIS_ENABLED = True
+        limiter = RateLimiter(BrokenRedis(), 10)
+        rate = parse_rate('1/min')
+        assert limiter.acquire('key', rate) == 0
+        assert limiter.acquire('key', rate) > 0, (
+            'Проверьте, что при недоступном Redis лимит соблюдается '
+            'ведрами в памяти процесса.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Throttling:
+
+    def test_01_signup_limited_per_ip(self, client, settings):
+        settings.RATE_LIMITS = {'signup_ip': '2/min'}
+        assert signup(client, 'first').status_code == HTTPStatus.OK
+        assert signup(client, 'second').status_code == HTTPStatus.OK
+        response = signup(client, 'third')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота POST-запросов к `{SIGNUP_URL}` '
+            'с одного IP ограничена.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert signup(client, 'third', ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_02_rejected_by_ip_keeps_username_tokens(self, client, settings):
+        settings.RATE_LIMITS = {
+            'signup_ip': '1/min', 'signup_username': '2/min'
+        }
+        assert signup(client, 'reader').status_code == HTTPStatus.OK
+        assert signup(client, 'reader').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        assert signup(client, 'reader', ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что запрос, отклонённый по IP, не расходует '
+            'лимит по username.'
+        )
+        assert signup(client, 'reader', ip='10.0.0.3').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), (
+            f'Проверьте, что частота POST-запросов к `{SIGNUP_URL}` '
+            'для одного username ограничена независимо от IP.'
+        )
+
+    def test_03_token_brute_force(self, client, settings):
+        settings.RATE_LIMITS = {'token_username': '3/min'}
+        assert signup(client, 'reader').status_code == HTTPStatus.OK
+        statuses = [
+            client.post(TOKEN_URL, data={
+                'username': 'reader', 'confirmation_code': str(code)
+            }, REMOTE_ADDR=f'10.0.1.{code}').status_code
+            for code in range(4)
+        ]
+        assert statuses[:3] == [HTTPStatus.BAD_REQUEST] * 3
+        assert statuses[3] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода подтверждения для одного '
+            'пользователя ограничен.'
+        )
+
+    def test_04_review_limited_per_user(self, user_client, admin_client,
+                                        settings):
+        settings.RATE_LIMITS = {'review_user': '1/min'}
+        first = Title.objects.create(name='First', year=2000)
+        second = Title.objects.create(name='Second', year=2000)
+        data = {'text': 'Текст', 'score': 5}
+        response = user_client.post(
+            f'/api/v1/titles/{first.pk}/reviews/', data=data
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(
+            f'/api/v1/titles/{second.pk}/reviews/', data=data
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частота публикации отзывов одним '
+            'пользователем ограничена.'
+        )
+        response = user_client.get(f'/api/v1/titles/{second.pk}/reviews/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит не распространяется на чтение.'
+        )
+        response = admin_client.post(
+            f'/api/v1/titles/{second.pk}/reviews/', data=data
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_05_only_post_limited(self, user_client, user, settings):
+        settings.RATE_LIMITS = {'review_user': '1/min'}
+        title = Title.objects.create(name='Title', year=2000)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        review_url = f'{url}{response.json()["id"]}/'
+        for score in (6, 7):
+            response = user_client.patch(review_url, data={'score': score})
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что лимит распространяется только на '
+                'POST-запросы.'
+            )
+        response = user_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
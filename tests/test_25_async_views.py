@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from content.models import Category, Genre, Title
+from reviews.models import Comment, Review
+
+
+@pytest.fixture
+def catalog(user, admin):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = []
+    for number in range(7):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000 + number,
+            category=category
+        )
+        title.genre.set([drama, comedy] if number % 2 else [drama])
+        titles.append(title)
+    title = titles[0]
+    for number, author in enumerate((user, admin)):
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {number}', score=5
+        )
+        for comment_number in range(6):
+            Comment.objects.create(
+                review=review, author=user,
+                text=f'Комментарий {comment_number}'
+            )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25AsyncViews:
+
+    @pytest.mark.parametrize('query', [
+        '', '?page=2', '?page=last', '?genre=comedy', '?year=2003',
+        '?category=movie',
+    ])
+    def test_01_title_list_matches_sync(self, client, catalog, query):
+        sync_response = client.get(f'/api/v1/titles/{query}')
+        async_response = client.get(f'/api/v1/async/titles/{query}')
+        assert async_response.status_code == HTTPStatus.OK
+        sync_data = sync_response.json()
+        async_data = async_response.json()
+        assert async_data['count'] == sync_data['count']
+        assert async_data['results'] == sync_data['results'], (
+            'Проверьте, что асинхронный список произведений совпадает '
+            'с ответом `/api/v1/titles/`.'
+        )
+        for link in ('next', 'previous'):
+            assert async_data[link] == (
+                sync_data[link] and sync_data[link].replace(
+                    '/api/v1/', '/api/v1/async/'
+                )
+            ), (
+                'Проверьте, что ссылки на соседние страницы строит '
+                'пагинатор DRF, как в синхронном списке.'
+            )
+
+    def test_02_title_detail_matches_sync(self, client, catalog):
+        title = catalog[1]
+        sync_response = client.get(f'/api/v1/titles/{title.pk}/')
+        async_response = client.get(f'/api/v1/async/titles/{title.pk}/')
+        assert async_response.status_code == HTTPStatus.OK
+        assert async_response.json() == sync_response.json()
+
+    def test_03_review_and_comment_lists_match_sync(self, client, catalog):
+        title = catalog[0]
+        review = title.reviews.order_by('pk').first()
+        for path in (
+            f'titles/{title.pk}/reviews/',
+            f'titles/{title.pk}/reviews/{review.pk}/comments/',
+            f'titles/{title.pk}/reviews/{review.pk}/comments/?page=2',
+        ):
+            sync_data = client.get(f'/api/v1/{path}').json()
+            async_data = client.get(f'/api/v1/async/{path}').json()
+            assert async_data['count'] == sync_data['count']
+            assert async_data['results'] == sync_data['results'], (
+                f'Проверьте, что ответ `/api/v1/async/{path}` совпадает '
+                'с синхронным.'
+            )
+
+    def test_04_not_found(self, client, catalog):
+        title = catalog[0]
+        review = title.reviews.first()
+        for path in (
+            'titles/0/',
+            'titles/0/reviews/',
+            f'titles/{catalog[1].pk}/reviews/{review.pk}/comments/',
+            'titles/?page=100',
+            'titles/?page=abc',
+            'titles/?page=0',
+        ):
+            response = client.get(f'/api/v1/async/{path}')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `/api/v1/async/{path}` возвращает 404.'
+            )
+
+    def test_05_read_only(self, admin_client, catalog):
+        response = admin_client.post(
+            '/api/v1/async/titles/', data={'name': 'Новое'}
+        )
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+
+    def test_06_invalid_filter(self, client, catalog):
+        response = client.get('/api/v1/async/titles/?year=abc')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'year' in response.json()
+
+    def test_07_connections_closed_after_queries(self, client, catalog,
+                                                 monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            'api.async_views.close_old_connections',
+            lambda: calls.append(True)
+        )
+        title = catalog[0]
+        response = client.get(f'/api/v1/async/titles/{title.pk}/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(calls) == 4, (
+            'Проверьте, что до и после каждого запроса в потоке пула '
+            'вызывается `close_old_connections()`: так учитывается '
+            '`CONN_MAX_AGE`.'
+        )
@@ -0,0 +1,177 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.serializers import BaseSerializer
+
+from content.models import Category, Genre, Title
+from core.metrics import Histogram, registry
+from core.middleware import RequestMetricsMiddleware
+
+METRICS_URL = '/api/v1/metrics/'
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for number in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set([genre])
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for item in header.split(', '):
+        name, *params = item.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+class Test26Histogram:
+
+    def test_01_quantiles_and_buckets(self):
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        assert snapshot['count'] == 5
+        assert snapshot['sum'] == 560.5
+        assert snapshot['p50'] == 10
+        assert snapshot['p99'] == 500
+        assert snapshot['buckets'] == [
+            [1, 1], [10, 3], [100, 4], ['+Inf', 5]
+        ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26RequestMetrics:
+
+    def test_01_sampling_off(self, client, titles, settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 0
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без выборки метрики не собираются.'
+        )
+        assert registry.snapshot() == {}
+
+    def test_02_server_timing(self, client, titles, settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        settings.REQUEST_METRICS_SERVER_TIMING = True
+        settings.API_CACHE_ENABLED = False
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        timing = parse_server_timing(response['Server-Timing'])
+        assert set(timing) == {'db', 'view', 'render', 'total'}, (
+            'Проверьте, что заголовок `Server-Timing` содержит время SQL, '
+            'представления, рендеринга и общее время.'
+        )
+        assert timing['db']['desc'] == '"3 queries"'
+        assert float(timing['render']['dur']) > 0
+        assert (
+            float(timing['view']['dur']) + float(timing['render']['dur'])
+            <= float(timing['total']['dur'])
+        )
+
+    def test_03_routes_aggregated(self, client, admin_client, titles,
+                                  settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        title = Title.objects.first()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.pk}/')
+        admin_client.get('/api/v1/users/me/')
+        snapshot = registry.snapshot()
+        assert snapshot['titles-list:list']['total_ms']['count'] == 2, (
+            'Проверьте, что метрики собираются по имени маршрута и действию.'
+        )
+        assert snapshot['titles-detail:retrieve']['queries']['count'] == 1
+        assert 'users-me:me' in snapshot
+
+    def test_04_metrics_endpoint(self, client, user_client, admin_client,
+                                 settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        assert client.get(METRICS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(METRICS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что метрики доступны только администратору.'
+        response = admin_client.get(METRICS_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'metrics' in ' '.join(data), (
+            f'Проверьте, что `{METRICS_URL}` возвращает гистограммы '
+            'по маршрутам.'
+        )
+        histogram = next(iter(data.values()))['total_ms']
+        assert {'count', 'p50', 'p95', 'p99', 'buckets'} <= set(histogram)
+        assert admin_client.delete(METRICS_URL).status_code == (
+            HTTPStatus.NO_CONTENT
+        )
+        assert list(registry.snapshot()) == ['api/v1/metrics/:delete'], (
+            'Проверьте, что DELETE-запрос обнуляет метрики.'
+        )
+
+    def test_05_asgi_counts_executor_queries(self, titles, settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        settings.REQUEST_METRICS_SERVER_TIMING = True
+        settings.API_CACHE_ENABLED = False
+
+        async def get_response(request):
+            return None
+
+        assert asyncio.iscoroutinefunction(
+            RequestMetricsMiddleware(get_response)
+        ), 'Проверьте, что под ASGI мидлварь работает асинхронно.'
+
+        client = AsyncClient()
+
+        async def get(url):
+            return await client.get(url)
+
+        title = Title.objects.first()
+        for url, queries in (
+            # Количество, страница и жанры страницы в потоках пула.
+            ('/api/v1/async/titles/', 3),
+            # Произведение и его жанры.
+            (f'/api/v1/async/titles/{title.pk}/', 2),
+            # Синхронный вьюсет: количество, страница, жанры.
+            ('/api/v1/titles/', 3),
+        ):
+            response = async_to_sync(get)(url)
+            assert response.status_code == HTTPStatus.OK
+            timing = parse_server_timing(response['Server-Timing'])
+            assert timing['db']['desc'] == f'"{queries} queries"', (
+                'Проверьте, что под ASGI учитываются запросы из потоков '
+                f'пула асинхронных представлений: `{url}`.'
+            )
+
+    def test_06_server_timing_off_by_default(self, client, titles,
+                                             settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 1
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без `REQUEST_METRICS_SERVER_TIMING` клиенты '
+            'не получают число и время SQL-запросов.'
+        )
+        histograms = registry.snapshot()['titles-list:list']
+        assert histograms['render_ms']['count'] == 1
+
+    def test_07_serializers_not_patched(self):
+        assert BaseSerializer.data.fget.__module__ == (
+            'rest_framework.serializers'
+        ), 'Проверьте, что метрики не подменяют `BaseSerializer.data`.'
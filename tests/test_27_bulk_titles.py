@@ -0,0 +1,188 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from content import bulk
+from content.models import Category, Genre, Title
+from content.slugs import warm_slug_caches
+
+BULK_URL = '/api/v1/titles/bulk/'
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def slugs():
+    Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+def make_items(count, **fields):
+    return [
+        {
+            'name': f'Произведение {number}',
+            'year': 2000 + number,
+            'genre': ['drama', 'comedy'],
+            'category': 'movie',
+            **fields,
+        }
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27BulkTitles:
+
+    def test_01_permissions(self, client, user_client, slugs):
+        assert client.post(
+            BULK_URL, make_items(1), content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(BULK_URL, make_items(1), format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пакетная запись доступна только администратору.'
+        )
+        assert not Title.objects.exists()
+
+    def test_02_create(self, admin_client, slugs):
+        response = admin_client.post(BULK_URL, make_items(3), format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [201] * 3
+        assert results[0]['data']['name'] == 'Произведение 0'
+        assert sorted(results[0]['data']['genre']) == ['comedy', 'drama']
+        assert results[0]['data']['category'] == 'movie'
+        title = Title.objects.get(pk=results[2]['data']['id'])
+        assert title.year == 2002
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }, 'Проверьте, что связи с жанрами создаются пакетом.'
+
+    def test_03_queries_do_not_grow(self, admin_client, slugs):
+        warm_slug_caches()
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    BULK_URL, make_items(size), format='json'
+                )
+            assert response.status_code == HTTPStatus.CREATED
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов пакетной записи не зависит '
+            'от числа произведений.'
+        )
+
+    def test_04_item_errors(self, admin_client, slugs):
+        items = make_items(3)
+        items[0]['genre'] = ['drama', 'unknown']
+        items[1]['year'] = 3000
+        response = admin_client.post(BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            'Проверьте, что при ошибках части элементов возвращается 207.'
+        )
+        results = response.json()['results']
+        assert results[0]['status'] == 400
+        assert 'genre' in results[0]['errors']
+        assert results[1]['status'] == 400
+        assert 'year' in results[1]['errors']
+        assert results[2]['status'] == 201
+        assert Title.objects.count() == 1, (
+            'Проверьте, что элементы с ошибками не записываются.'
+        )
+
+    def test_05_invalid_body(self, admin_client):
+        for body in ({'name': 'Одно'}, []):
+            response = admin_client.post(BULK_URL, body, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_update(self, admin_client, slugs):
+        created = admin_client.post(
+            BULK_URL, make_items(2), format='json'
+        ).json()['results']
+        ids = [result['data']['id'] for result in created]
+        response = admin_client.patch(BULK_URL, [
+            {'id': ids[0], 'genre': ['comedy'], 'category': 'book'},
+            {'id': ids[1], 'name': 'Новое имя'},
+            {'id': 0, 'name': 'Нет такого'},
+            {'name': 'Без id'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            200, 200, 404, 400
+        ]
+        first = Title.objects.get(pk=ids[0])
+        assert list(first.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ], 'Проверьте, что PATCH заменяет жанры произведения.'
+        assert first.category.slug == 'book'
+        second = Title.objects.get(pk=ids[1])
+        assert second.name == 'Новое имя'
+        assert second.genre.count() == 2
+
+    def test_07_delete(self, admin_client, slugs):
+        created = admin_client.post(
+            BULK_URL, make_items(2), format='json'
+        ).json()['results']
+        ids = [result['data']['id'] for result in created]
+        response = admin_client.delete(
+            BULK_URL, [ids[0], 0, 'id'], format='json'
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [204, 404, 400]
+        assert list(Title.objects.values_list('pk', flat=True)) == [ids[1]]
+
+    def test_08_cache_and_search(self, client, admin_client, slugs,
+                                 settings):
+        settings.API_CACHE_ENABLED = True
+        assert client.get(TITLES_URL).json()['count'] == 0
+        items = make_items(1, name='Солярис')
+        response = admin_client.post(BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(TITLES_URL).json()['count'] == 1, (
+            'Проверьте, что пакетная запись сбрасывает кэш списка.'
+        )
+        found = client.get('/api/v1/search/', {'q': 'солярис'}).json()
+        assert [item['id'] for item in found['results']] == [
+            response.json()['results'][0]['data']['id']
+        ], 'Проверьте, что записанные пакетом произведения индексируются.'
+
+    def test_09_ids_are_not_reused(self, admin_client, slugs):
+        response = admin_client.post(BULK_URL, make_items(2), format='json')
+        last_id = response.json()['results'][1]['data']['id']
+        Title.objects.filter(pk=last_id).delete()
+        response = admin_client.post(BULK_URL, make_items(1), format='json')
+        new_id = response.json()['results'][0]['data']['id']
+        assert new_id > last_id, (
+            'Проверьте, что пакетное создание не выдаёт id удалённых '
+            'произведений.'
+        )
+        assert Title.objects.create(name='Одно', year=2000).pk > new_id
+
+    def test_10_concurrent_ids_retried(self, admin_client, slugs,
+                                       monkeypatch):
+        get_last_id = bulk.get_last_id
+        calls = []
+
+        def stale_last_id(model, using):
+            last_id = get_last_id(model, using)
+            calls.append(last_id)
+            # Первое чтение сделано до записи параллельного запроса.
+            return last_id - 1 if len(calls) == 1 else last_id
+
+        Title.objects.create(name='Параллельное', year=2000)
+        monkeypatch.setattr(bulk, 'get_last_id', stale_last_id)
+        response = admin_client.post(BULK_URL, make_items(2), format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что при совпадении id с параллельной записью '
+            'пакетное создание повторяется, а не завершается ошибкой.'
+        )
+        assert len(calls) == 2
+        assert Title.objects.count() == 3
+        assert set(Title.objects.filter(
+            name__startswith='Произведение'
+        ).values_list('genre__slug', flat=True)) == {'drama', 'comedy'}
@@ -0,0 +1,195 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from content.models import Category, Genre, Title
+from content.slugs import category_slugs, genre_slugs, warm_slug_caches
+from core.cache import get_store
+
+TITLES_URL = '/api/v1/titles/'
+SLUG_TABLES = ('"content_genre"', '"content_category"')
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Кэш Django, общий для всех процессов, как Redis."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }
+    }
+
+
+@pytest.fixture
+def catalog():
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    melodrama = Genre.objects.create(name='Мелодрама', slug='melodrama')
+    title = Title.objects.create(name='Сталкер', year=1979, category=movie)
+    title.genre.set([drama, melodrama])
+    return title
+
+
+def slug_queries(context):
+    """Запросы, ищущие жанры или категории по слагу."""
+    return [
+        query['sql'] for query in context.captured_queries
+        if any(f'WHERE {table}."slug"' in query['sql']
+               for table in SLUG_TABLES)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SlugCache:
+
+    def test_01_title_write_without_slug_queries(self, admin_client,
+                                                 catalog):
+        warm_slug_caches()
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(TITLES_URL, {
+                'name': 'Солярис', 'year': 1972,
+                'genre': ['drama', 'melodrama'], 'category': 'movie',
+            }, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert slug_queries(context) == [], (
+            'Проверьте, что слаги жанров и категорий при записи '
+            'произведения разрешаются без запросов к БД.'
+        )
+        title = Title.objects.get(pk=response.json()['id'])
+        assert title.category.slug == 'movie'
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'melodrama'
+        }
+
+    def test_02_unknown_slug(self, admin_client, catalog):
+        response = admin_client.post(TITLES_URL, {
+            'name': 'Солярис', 'year': 1972,
+            'genre': ['unknown'], 'category': 'movie',
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()
+
+    def test_03_invalidated_by_signals(self, admin_client, catalog):
+        warm_slug_caches()
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = admin_client.post(TITLES_URL, {
+            'name': 'Кин-дза-дза!', 'year': 1986,
+            'genre': ['comedy'], 'category': 'movie',
+        }, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что новый жанр сразу доступен по слагу.'
+        )
+        Category.objects.filter(slug='book').delete()
+        assert category_slugs.resolve(['book']) == {}
+
+    def test_04_version_shared_between_processes(self, shared_cache,
+                                                 catalog, settings):
+        settings.SLUG_CACHE_CHECK_INTERVAL = 0
+        assert genre_slugs.resolve(['drama'])
+        # Другой процесс переименовал жанр и сдвинул версию.
+        Genre.objects.filter(slug='drama').update(slug='tragedy')
+        assert genre_slugs.resolve(['drama']), (
+            'Без смены версии кэш не должен перечитываться.'
+        )
+        get_store().set(genre_slugs.version_key, 'other-process')
+        assert genre_slugs.resolve(['drama']) == {}
+        assert genre_slugs.resolve(['tragedy']), (
+            'Проверьте, что кэш перечитывается при смене общей версии.'
+        )
+
+    def test_05_filters(self, client, catalog):
+        warm_slug_caches()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(TITLES_URL, {'genre': 'DRAMA'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что фильтр по жанру ищет по части слага '
+            'и не дублирует произведения.'
+        )
+        count_sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        )
+        assert not any(table in count_sql for table in SLUG_TABLES), (
+            'Проверьте, что фильтры не присоединяют таблицы жанров '
+            'и категорий.'
+        )
+        for params, count in (
+            ({'category': 'mov'}, 1), ({'category': 'book'}, 0),
+            ({'genre': 'unknown'}, 0),
+        ):
+            assert client.get(TITLES_URL, params).json()['count'] == count
+
+    def test_06_other_process_without_shared_store(self, admin_client,
+                                                   catalog, settings):
+        warm_slug_caches()
+        # Другой процесс создал жанр; сигналы этого процесса не сработали.
+        Genre.objects.bulk_create([Genre(name='Комедия', slug='comedy')])
+        response = admin_client.post(TITLES_URL, {
+            'name': 'Кин-дза-дза!', 'year': 1986,
+            'genre': ['comedy'], 'category': 'movie',
+        }, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что неизвестный слаг проверяется по свежей '
+            'таблице перед отказом.'
+        )
+        settings.SLUG_CACHE_CHECK_INTERVAL = 0
+        Genre.objects.filter(slug='drama').update(slug='tragedy')
+        assert genre_slugs.resolve(['drama']) == {}, (
+            'Проверьте, что без общего хранилища кэш перечитывается '
+            'через `SLUG_CACHE_CHECK_INTERVAL` секунд.'
+        )
+
+    def test_07_invalidated_after_commit(self, shared_cache, catalog):
+        version = genre_slugs.get_version()
+        with transaction.atomic():
+            Genre.objects.create(name='Комедия', slug='comedy')
+            assert get_store().get(genre_slugs.version_key) == version, (
+                'Проверьте, что версия сдвигается только после фиксации '
+                'транзакции.'
+            )
+            assert genre_slugs.resolve(['comedy'])
+        committed = get_store().get(genre_slugs.version_key)
+        assert committed != version
+        assert genre_slugs.resolve(['comedy'])
+        with transaction.atomic():
+            Genre.objects.create(name='Трагедия', slug='tragedy')
+            transaction.set_rollback(True)
+        assert get_store().get(genre_slugs.version_key) == committed, (
+            'Проверьте, что откаченная запись не сдвигает версию.'
+        )
+        assert genre_slugs.resolve(['tragedy']) == {}
+
+    def test_08_deleted_by_other_process(self, admin_client, catalog):
+        Genre.objects.create(name='Комедия', slug='comedy')
+        Category.objects.create(name='Сериал', slug='series')
+        warm_slug_caches()
+        with connection.cursor() as cursor:
+            # Удаление в другом процессе: сигналы здесь не отправляются.
+            for table, slug in (('genre', 'comedy'),
+                                ('category', 'series')):
+                cursor.execute(
+                    f'DELETE FROM content_{table}stats WHERE {table}_id IN '
+                    f'(SELECT id FROM content_{table} WHERE slug = %s)',
+                    [slug]
+                )
+                cursor.execute(
+                    f'DELETE FROM content_{table} WHERE slug = %s', [slug]
+                )
+        response = admin_client.post(TITLES_URL, {
+            'name': 'Солярис', 'year': 1972,
+            'genre': ['drama', 'comedy'], 'category': 'series',
+        }, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что жанр или категория, удалённые после загрузки '
+            'кэша слагов, дают ошибку валидации, а не 500.'
+        )
+        assert set(response.json()) == {'genre', 'category'}
+        assert not Title.objects.filter(name='Солярис').exists()
+        assert genre_slugs.resolve(['comedy']) == {}, (
+            'Проверьте, что после такой ошибки кэш слагов сбрасывается.'
+        )
+        assert category_slugs.resolve(['series']) == {}
@@ -0,0 +1,171 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from content.models import (
+    Category, CategoryStats, Genre, GenreStats, Title, TitleGenre
+)
+from reviews.models import Review
+
+GENRES_URL = '/api/v1/genres/'
+CATEGORIES_URL = '/api/v1/categories/'
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(2)
+    ]
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    stalker = Title.objects.create(name='Сталкер', year=1979, category=movie)
+    stalker.genre.set([drama])
+    solaris = Title.objects.create(name='Солярис', year=1961, category=book)
+    solaris.genre.set([drama, comedy])
+    return {
+        'authors': authors, 'movie': movie, 'book': book, 'drama': drama,
+        'comedy': comedy, 'stalker': stalker, 'solaris': solaris,
+    }
+
+
+def snapshot():
+    return {
+        model.__name__: sorted(model.objects.values_list(
+            'pk', 'title_count', 'rating_sum', 'rating_count', 'rating'
+        ))
+        for model in (GenreStats, CategoryStats)
+    }
+
+
+def stats_of(group):
+    stats = type(group).objects.get(pk=group.pk).stats
+    return (stats.title_count, stats.rating_sum, stats.rating_count)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29GenreCategoryStats:
+
+    def test_01_counts_follow_titles(self, catalog):
+        assert stats_of(catalog['drama']) == (2, 0, 0)
+        assert stats_of(catalog['comedy']) == (1, 0, 0)
+        assert stats_of(catalog['movie']) == (1, 0, 0)
+
+        catalog['solaris'].genre.remove(catalog['drama'])
+        assert stats_of(catalog['drama']) == (1, 0, 0), (
+            'Проверьте, что агрегаты жанра следуют за связями с жанрами.'
+        )
+        solaris = Title.objects.get(pk=catalog['solaris'].pk)
+        solaris.category = catalog['movie']
+        solaris.save()
+        assert stats_of(catalog['movie']) == (2, 0, 0)
+        assert stats_of(catalog['book']) == (0, 0, 0), (
+            'Проверьте, что при смене категории пересчитываются обе.'
+        )
+        catalog['stalker'].delete()
+        assert stats_of(catalog['drama']) == (0, 0, 0)
+        assert stats_of(catalog['movie']) == (1, 0, 0)
+
+    def test_02_ratings_follow_reviews(self, catalog):
+        first, second = catalog['authors']
+        Review.objects.create(
+            title=catalog['stalker'], author=first, text='.', score=10
+        )
+        review = Review.objects.create(
+            title=catalog['solaris'], author=second, text='.', score=6
+        )
+        assert stats_of(catalog['drama']) == (2, 16, 2)
+        assert GenreStats.objects.get(pk=catalog['drama'].pk).rating == 8
+        assert stats_of(catalog['book']) == (1, 6, 1)
+
+        review.score = 2
+        review.save()
+        assert stats_of(catalog['comedy']) == (1, 2, 1)
+        review.delete()
+        assert stats_of(catalog['comedy']) == (1, 0, 0)
+        assert CategoryStats.objects.get(pk=catalog['book'].pk).rating is None
+
+    def test_03_incremental_matches_rebuild(self, catalog):
+        first, second = catalog['authors']
+        for author, score in ((first, 3), (second, 8)):
+            Review.objects.create(
+                title=catalog['solaris'], author=author, text='.',
+                score=score
+            )
+        catalog['stalker'].genre.add(catalog['comedy'])
+        catalog['solaris'].delete()
+        incremental = snapshot()
+        call_command('rebuild_stats')
+        assert snapshot() == incremental, (
+            'Проверьте, что инкрементальные агрегаты совпадают '
+            'с пересчитанными заново.'
+        )
+
+    def test_04_rebuild_command_repairs(self, catalog):
+        GenreStats.objects.update(title_count=100, rating_sum=5)
+        CategoryStats.objects.all().delete()
+        call_command('rebuild_stats')
+        assert stats_of(catalog['drama']) == (2, 0, 0)
+        assert stats_of(catalog['movie']) == (1, 0, 0), (
+            'Проверьте, что `rebuild_stats` создаёт недостающие агрегаты.'
+        )
+
+    def test_05_list_endpoints(self, client, catalog):
+        first, _ = catalog['authors']
+        Review.objects.create(
+            title=catalog['stalker'], author=first, text='.', score=9
+        )
+        data = client.get(GENRES_URL).json()
+        assert 'stats' not in data['results'][0], (
+            'Проверьте, что агрегаты выводятся только по запросу.'
+        )
+        data = client.get(GENRES_URL, {'stats': 'true'}).json()
+        drama = next(
+            genre for genre in data['results'] if genre['slug'] == 'drama'
+        )
+        assert drama['stats'] == {
+            'title_count': 2, 'rating': 9.0, 'rating_count': 1
+        }
+        data = client.get(CATEGORIES_URL, {'stats': '1'}).json()
+        movie = next(
+            category for category in data['results']
+            if category['slug'] == 'movie'
+        )
+        assert movie['stats']['rating'] == 9.0
+
+    def test_06_list_cache_follows_reviews(self, client, catalog, settings):
+        settings.API_CACHE_ENABLED = True
+        first, _ = catalog['authors']
+        params = {'stats': 'true', 'search': 'Драма'}
+        response = client.get(GENRES_URL, params)
+        assert response.json()['results'][0]['stats']['rating'] is None
+        Review.objects.create(
+            title=catalog['stalker'], author=first, text='.', score=7
+        )
+        response = client.get(GENRES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['stats']['rating'] == 7.0, (
+            'Проверьте, что закэшированный список с агрегатами '
+            'сбрасывается при записи отзывов.'
+        )
+
+    def test_07_duplicate_genre_link(self, catalog):
+        first, _ = catalog['authors']
+        stalker = catalog['stalker']
+        # Повторная связь, например из импорта в обход ORM.
+        TitleGenre.objects.bulk_create(
+            [TitleGenre(title=stalker, genre=catalog['drama'])]
+        )
+        Review.objects.create(title=stalker, author=first, text='.', score=7)
+        incremental = snapshot()
+        assert stats_of(catalog['drama']) == (2, 7, 1)
+        call_command('rebuild_stats')
+        assert snapshot() == incremental, (
+            'Проверьте, что повторная связь с жанром не учитывает отзывы '
+            'произведения дважды при пересчёте.'
+        )
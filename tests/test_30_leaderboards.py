@@ -0,0 +1,189 @@
+import datetime
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from content.models import Category, Genre, Title
+from content.slugs import warm_slug_caches
+from leaderboards.boards import rebuild_activity
+from leaderboards.constants import MAX_TRENDING_DAYS
+from leaderboards.models import LeaderboardEntry, TitleActivity
+from reviews.models import Review
+from reviews.signals import rating_changed
+
+TOP_URL = '/api/v1/titles/top/'
+TRENDING_URL = '/api/v1/titles/trending/'
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(4)
+    ]
+
+
+@pytest.fixture
+def catalog(authors):
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    # Один отзыв с высшей оценкой против многих высоких.
+    lucky = Title.objects.create(name='Один отзыв', year=2000, category=book)
+    lucky.genre.set([comedy])
+    solid = Title.objects.create(name='Много отзывов', year=2000,
+                                 category=movie)
+    solid.genre.set([drama, comedy])
+    weak = Title.objects.create(name='Слабое', year=1990, category=movie)
+    weak.genre.set([drama])
+    Review.objects.create(title=lucky, author=authors[0], text='.', score=10)
+    for author in authors:
+        Review.objects.create(title=solid, author=author, text='.', score=9)
+    for author in authors[:2]:
+        Review.objects.create(title=weak, author=author, text='.', score=2)
+    return {'lucky': lucky, 'solid': solid, 'weak': weak}
+
+
+def names(response):
+    assert response.status_code == HTTPStatus.OK
+    return [title['name'] for title in response.json()['results']]
+
+
+def entries():
+    return sorted(LeaderboardEntry.objects.values_list(
+        'board', 'title_id', 'score'
+    ))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Leaderboards:
+
+    def test_01_bayesian_ranking(self, client, catalog):
+        response = client.get(TOP_URL)
+        assert names(response) == [
+            'Много отзывов', 'Один отзыв', 'Слабое'
+        ], (
+            'Проверьте, что рейтинг взвешен и единственный отзыв '
+            'не выводит произведение на первое место.'
+        )
+        # (10 * 5.5 + 36) / (10 + 4)
+        assert response.json()['results'][0]['weighted_rating'] == 6.5
+
+    def test_02_group_boards(self, client, catalog):
+        assert names(client.get(TOP_URL, {'genre': 'drama'})) == [
+            'Много отзывов', 'Слабое'
+        ]
+        assert names(client.get(TOP_URL, {'category': 'book'})) == [
+            'Один отзыв'
+        ]
+        assert names(client.get(TOP_URL, {'year': 1990})) == ['Слабое']
+        assert names(client.get(TOP_URL, {'genre': 'unknown'})) == []
+        assert names(client.get(TOP_URL, {'limit': 1})) == ['Много отзывов']
+        for params in ({'genre': 'drama', 'year': 2000}, {'limit': 0}):
+            assert client.get(TOP_URL, params).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+
+    def test_03_top_reads_k_rows(self, client, catalog, settings,
+                                 django_assert_num_queries):
+        settings.API_CACHE_ENABLED = False
+        warm_slug_caches()
+        # Рейтинг, произведения страницы и их жанры.
+        with django_assert_num_queries(3):
+            response = client.get(TOP_URL, {'genre': 'comedy', 'limit': 1})
+        assert names(response) == ['Много отзывов']
+
+    def test_04_updates_follow_writes(self, client, catalog, authors):
+        weak = catalog['weak']
+        for author in authors[2:]:
+            Review.objects.create(title=weak, author=author, text='.',
+                                  score=10)
+        Review.objects.filter(title=catalog['solid']).first().delete()
+        solid = Title.objects.get(pk=catalog['solid'].pk)
+        solid.genre.remove(Genre.objects.get(slug='drama'))
+        solid.year = 1990
+        solid.save()
+        assert names(client.get(TOP_URL, {'genre': 'drama'})) == ['Слабое']
+        assert names(client.get(TOP_URL, {'year': 1990})) == [
+            'Много отзывов', 'Слабое'
+        ]
+        incremental = entries()
+        call_command('rebuild_leaderboards')
+        assert entries() == incremental, (
+            'Проверьте, что рейтинги, обновлённые по сигналам, совпадают '
+            'с построенными заново.'
+        )
+
+    def test_05_trending(self, client, catalog):
+        response = client.get(TRENDING_URL)
+        assert names(response) == ['Много отзывов', 'Слабое', 'Один отзыв']
+        assert response.json()['results'][0]['recent_review_count'] == 4
+        assert response.json()['results'][1]['recent_rating'] == 2.0
+
+        old_day = timezone.localdate() - datetime.timedelta(days=10)
+        TitleActivity.objects.create(
+            title=catalog['lucky'], day=old_day, review_count=50,
+            score_sum=500
+        )
+        assert names(client.get(TRENDING_URL))[0] == 'Много отзывов', (
+            'Проверьте, что отзывы вне окна не учитываются.'
+        )
+        assert names(client.get(TRENDING_URL, {'days': 30}))[0] == (
+            'Один отзыв'
+        )
+
+    def test_06_delete_title_with_reviews(self, client, catalog):
+        catalog['solid'].delete()
+        assert not LeaderboardEntry.objects.filter(
+            title_id=catalog['solid'].pk
+        ).exists()
+        assert names(client.get(TRENDING_URL)) == ['Слабое', 'Один отзыв']
+
+    def test_07_old_activity_pruned(self, catalog, authors):
+        today = timezone.localdate()
+        old_day = today - datetime.timedelta(days=MAX_TRENDING_DAYS + 1)
+        recent_day = today - datetime.timedelta(days=10)
+        for day in (old_day, recent_day):
+            TitleActivity.objects.create(
+                title=catalog['lucky'], day=day, review_count=1, score_sum=5
+            )
+        # Первый отзыв на произведение создаёт строку его дня.
+        title = Title.objects.create(name='Новое', year=2020)
+        Review.objects.create(title=title, author=authors[1], text='.',
+                              score=8)
+        assert not TitleActivity.objects.filter(day=old_day).exists(), (
+            'Проверьте, что при создании строки дня удаляется активность '
+            'старше `MAX_TRENDING_DAYS` дней.'
+        )
+        assert TitleActivity.objects.filter(day=recent_day).exists()
+
+        TitleActivity.objects.create(
+            title=catalog['weak'], day=old_day, review_count=1, score_sum=2
+        )
+        rebuild_activity([catalog['solid'].pk])
+        assert not TitleActivity.objects.filter(day=old_day).exists(), (
+            'Проверьте, что пересчёт активности тоже удаляет старые дни.'
+        )
+
+    def test_08_rating_changed_passes_alias(self, catalog, authors):
+        aliases = []
+
+        def remember_alias(sender, using, **kwargs):
+            aliases.append(using)
+
+        rating_changed.connect(remember_alias)
+        try:
+            review = Review.objects.create(
+                title=catalog['lucky'], author=authors[1], text='.', score=8
+            )
+            review.delete()
+        finally:
+            rating_changed.disconnect(remember_alias)
+        assert aliases == ['default', 'default'], (
+            'Проверьте, что сигнал `rating_changed` передаёт алиас БД.'
+        )
@@ -0,0 +1,198 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.utils import timezone
+
+from content.models import Category, CategoryStats, Genre, GenreStats, Title
+from leaderboards.models import LeaderboardEntry, TitleActivity
+from reviews.models import PendingRating, Review
+
+TITLES_URL = '/api/v1/titles/'
+TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Кэш Django, общий для всех процессов, как Redis."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }
+    }
+
+
+@pytest.fixture
+def deferred(settings, shared_cache):
+    settings.RATING_DEFERRED_ENABLED = True
+    settings.API_CACHE_ENABLED = True
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(3)
+    ]
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    stalker = Title.objects.create(name='Сталкер', year=1979, category=movie)
+    stalker.genre.set([drama])
+    solaris = Title.objects.create(name='Солярис', year=1972, category=movie)
+    return {'authors': authors, 'stalker': stalker, 'solaris': solaris}
+
+
+def rating_of(title):
+    title = Title.objects.get(pk=title.pk)
+    return (title.rating_sum, title.rating_count, title.rating)
+
+
+def snapshot():
+    return {
+        'stats': sorted(
+            GenreStats.objects.values_list('pk', 'rating_sum', 'rating')
+        ) + sorted(
+            CategoryStats.objects.values_list('pk', 'rating_sum', 'rating')
+        ),
+        'boards': sorted(LeaderboardEntry.objects.values_list(
+            'board', 'title_id', 'score'
+        )),
+        'activity': sorted(TitleActivity.objects.values_list(
+            'title_id', 'day', 'review_count', 'score_sum'
+        )),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31DeferredRatings:
+
+    def test_01_reviews_only_mark_titles(self, client, deferred, catalog):
+        stalker = catalog['stalker']
+        detail_url = TITLE_DETAIL_URL_TEMPLATE.format(title_id=stalker.pk)
+        assert client.get(detail_url).json()['rating_pending_since'] is None
+        for author, score in zip(catalog['authors'], (10, 6, 8)):
+            Review.objects.create(
+                title=stalker, author=author, text='.', score=score
+            )
+        assert rating_of(stalker) == (0, 0, None), (
+            'Проверьте, что при отложенном пересчёте отзыв не меняет '
+            'рейтинг произведения.'
+        )
+        assert list(PendingRating.objects.values_list(
+            'title_id', flat=True
+        )) == [stalker.pk], (
+            'Проверьте, что отзывы на одно произведение дают одну отметку.'
+        )
+        data = client.get(detail_url).json()
+        assert data['rating'] is None
+        assert data['rating_pending_since'] is not None, (
+            'Проверьте, что API сообщает, с какого времени рейтинг '
+            'ждёт пересчёта.'
+        )
+
+        call_command('recompute_ratings')
+        assert rating_of(stalker) == (24, 3, 8.0)
+        assert not PendingRating.objects.exists()
+        assert GenreStats.objects.get(pk=stalker.genre.get().pk).rating == 8
+        data = client.get(detail_url).json()
+        assert data['rating'] == 8, (
+            'Проверьте, что после пересчёта кэш произведения сброшен.'
+        )
+        assert data['rating_pending_since'] is None
+
+    def test_02_update_and_delete(self, deferred, catalog):
+        first, second, _ = catalog['authors']
+        review = Review.objects.create(
+            title=catalog['stalker'], author=first, text='.', score=4
+        )
+        Review.objects.create(
+            title=catalog['solaris'], author=second, text='.', score=9
+        )
+        call_command('recompute_ratings', batch_size=1)
+        assert not PendingRating.objects.exists(), (
+            'Проверьте, что команда обрабатывает все пачки.'
+        )
+
+        review.text = 'Без смены оценки'
+        review.save()
+        assert not PendingRating.objects.exists()
+        review.title = catalog['solaris']
+        review.save()
+        assert set(PendingRating.objects.values_list(
+            'title_id', flat=True
+        )) == {catalog['stalker'].pk, catalog['solaris'].pk}
+        call_command('recompute_ratings')
+        assert rating_of(catalog['stalker']) == (0, 0, None)
+        assert rating_of(catalog['solaris']) == (13, 2, 6.5)
+
+        review.delete()
+        call_command('recompute_ratings')
+        assert rating_of(catalog['solaris']) == (9, 1, 9.0)
+
+    def test_03_staleness_is_bounded(self, deferred, catalog, settings):
+        settings.RATING_MAX_STALENESS = 60
+        first, second, _ = catalog['authors']
+        stalker = catalog['stalker']
+        Review.objects.create(title=stalker, author=first, text='.', score=3)
+        PendingRating.objects.update(
+            marked_at=timezone.now() - datetime.timedelta(minutes=2)
+        )
+        Review.objects.create(title=stalker, author=second, text='.', score=5)
+        assert rating_of(stalker) == (8, 2, 4.0), (
+            'Проверьте, что рейтинг, ждущий пересчёта дольше '
+            '`RATING_MAX_STALENESS`, пересчитывается при записи отзыва.'
+        )
+        assert not PendingRating.objects.exists()
+
+    def test_04_matches_rebuild(self, deferred, catalog):
+        first, second, third = catalog['authors']
+        for author, score in ((first, 2), (second, 9)):
+            Review.objects.create(
+                title=catalog['stalker'], author=author, text='.',
+                score=score
+            )
+        Review.objects.create(
+            title=catalog['solaris'], author=third, text='.', score=7
+        )
+        catalog['solaris'].delete()
+        call_command('recompute_ratings')
+        assert not PendingRating.objects.exists()
+        deferred_state = snapshot()
+        assert deferred_state['activity'], (
+            'Проверьте, что пересчёт обновляет активность произведений.'
+        )
+        call_command('rebuild_stats')
+        call_command('rebuild_leaderboards')
+        assert snapshot() == deferred_state, (
+            'Проверьте, что отложенный пересчёт даёт те же агрегаты '
+            'и рейтинги, что и пересчёт заново.'
+        )
+
+    def test_05_field_hidden_when_disabled(self, client, catalog):
+        data = client.get(TITLES_URL).json()
+        assert 'rating_pending_since' not in data['results'][0]
+
+    def test_06_requires_shared_store(self, client, catalog, settings):
+        settings.RATING_DEFERRED_ENABLED = True
+        settings.API_CACHE_ENABLED = True
+        stalker = catalog['stalker']
+        detail_url = TITLE_DETAIL_URL_TEMPLATE.format(title_id=stalker.pk)
+        assert client.get(detail_url).json()['rating'] is None
+        with pytest.raises(SystemCheckError, match='reviews.E001'):
+            call_command('check')
+        with pytest.raises(SystemCheckError, match='reviews.E001'):
+            call_command('recompute_ratings', skip_checks=False)
+        Review.objects.create(
+            title=stalker, author=catalog['authors'][0], text='.', score=7
+        )
+        assert not PendingRating.objects.exists(), (
+            'Проверьте, что без общего хранилища рейтинг не откладывается: '
+            'пересчёт в другом процессе не сбросит кэш веб-процессов.'
+        )
+        data = client.get(detail_url).json()
+        assert data['rating'] == 7
+        assert 'rating_pending_since' not in data